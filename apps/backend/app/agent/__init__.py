@@ -4,6 +4,7 @@
 # * Else we fallback to a local Ollama model.
 # * If neither is available, we raise -> ProviderError.
 
+from .cache import embedding_cache, response_cache
 from .manager import AgentManager, EmbeddingManager
 
-__all__ = ["AgentManager", "EmbeddingManager"]
+__all__ = ["AgentManager", "EmbeddingManager", "embedding_cache", "response_cache"]
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+
+from typing import Dict, List, Set, Tuple
+
+from .exceptions import ProviderError
+from .providers.base import EmbeddingProvider
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching coalescer for embedding requests.
+
+    Single-text requests for the same provider that arrive within `window`
+    seconds of each other are merged into one `embed_many` call. A batch is
+    flushed early once it reaches `max_batch_size` texts (or the provider's
+    own limit, if lower). If the call fails, every request in the batch gets
+    the error.
+    """
+
+    def __init__(self, window: float = 0.005, max_batch_size: int = 64) -> None:
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._pending: Dict[EmbeddingProvider, List[Tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[EmbeddingProvider, asyncio.TimerHandle] = {}
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def submit(self, provider: EmbeddingProvider, text: str) -> List[float]:
+        """
+        Queue `text` for the next batch of `provider` and wait for its vector.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+
+        batch = self._pending.setdefault(provider, [])
+        batch.append((text, future))
+
+        if len(batch) >= min(self._max_batch_size, provider.max_batch_size):
+            self._flush(provider)
+        elif provider not in self._timers:
+            self._timers[provider] = loop.call_later(self._window, self._flush, provider)
+
+        return await future
+
+    def _flush(self, provider: EmbeddingProvider) -> None:
+        timer = self._timers.pop(provider, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(provider, None)
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run(provider, batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run(
+        self, provider: EmbeddingProvider, batch: List[Tuple[str, asyncio.Future]]
+    ) -> None:
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        logger.debug(f"embedding batch of {len(texts)} texts ({len(batch)} requests)")
+
+        try:
+            vectors = await provider.embed_many(texts)
+            if len(vectors) != len(texts):
+                raise ProviderError(
+                    f"Embedding provider returned {len(vectors)} vectors for {len(texts)} texts"
+                )
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_text = dict(zip(texts, vectors))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(by_text[text])
@@ -0,0 +1,334 @@
+import time
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+import numpy as np
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Content-addressed, two-tier cache for embedding vectors.
+
+    * Tier 1: in-process LRU holding the most recently used vectors.
+    * Tier 2: SQLite file holding every vector as a compact float32 blob,
+      so entries survive restarts and are shared between workers.
+
+    Keys are the SHA-256 of (provider, model, text), so the same text embedded
+    by a different model never collides.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 2048) -> None:
+        self._path = path
+        self._max_entries = max_entries
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(provider: str, model: str, text: str) -> str:
+        digest = hashlib.sha256()
+        for part in (provider, model, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not self._path:
+            return None
+        if self._conn is None:
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get_sync(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def _disk_get_many_sync(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return {}
+            found: Dict[str, np.ndarray] = {}
+            # stay well below SQLITE_MAX_VARIABLE_NUMBER
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def _disk_set_sync(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)",
+                [
+                    (key, int(vector.shape[0]), vector.tobytes())
+                    for key, vector in items.items()
+                ],
+            )
+            conn.commit()
+
+    async def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Return the cached vector for `key`, or None on a miss.
+        """
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return vector
+
+        try:
+            vector = await run_in_threadpool(self._disk_get_sync, key)
+        except sqlite3.Error as e:
+            logger.warning(f"embedding cache read failed: {e}")
+            vector = None
+
+        if vector is None:
+            self._stats["misses"] += 1
+            return None
+
+        self._stats["disk_hits"] += 1
+        self._remember(key, vector)
+        return vector
+
+    async def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Return the cached vectors among `keys`; misses are simply absent.
+
+        Memory misses are resolved against the disk tier in a single query.
+        """
+        found: Dict[str, np.ndarray] = {}
+        remaining: List[str] = []
+        for key in dict.fromkeys(keys):
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                found[key] = vector
+            else:
+                remaining.append(key)
+
+        if remaining:
+            try:
+                from_disk = await run_in_threadpool(self._disk_get_many_sync, remaining)
+            except sqlite3.Error as e:
+                logger.warning(f"embedding cache read failed: {e}")
+                from_disk = {}
+            for key, vector in from_disk.items():
+                self._remember(key, vector)
+            found.update(from_disk)
+            self._stats["disk_hits"] += len(from_disk)
+            self._stats["misses"] += len(remaining) - len(from_disk)
+
+        return found
+
+    async def set(self, key: str, vector: np.ndarray) -> None:
+        """
+        Store `vector` (float32, 1-D) under `key` in both tiers.
+        """
+        await self.set_many({key: vector})
+
+    async def set_many(self, items: Dict[str, np.ndarray]) -> None:
+        """
+        Store several vectors in both tiers with a single disk write.
+        """
+        for key, vector in items.items():
+            self._remember(key, vector)
+        try:
+            await run_in_threadpool(self._disk_set_sync, items)
+        except sqlite3.Error as e:
+            logger.warning(f"embedding cache write failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit/miss counters since process start, plus the current LRU size.
+        """
+        return {**self._stats, "memory_entries": len(self._memory)}
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of raw LLM responses for deterministic prompts.
+
+    Keys are the SHA-256 of (provider, model, strategy, generation options,
+    prompt). Once the stored responses exceed `max_bytes`, the least recently
+    read entries are evicted.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self._path = path
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        strategy: str,
+        options: Dict[str, Any],
+        prompt: str,
+    ) -> str:
+        digest = hashlib.sha256()
+        for part in (
+            provider,
+            model,
+            strategy,
+            json.dumps(options, sort_keys=True, default=str),
+            prompt,
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if not self._path:
+            return None
+        if self._conn is None:
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_responses_accessed_at"
+                " ON responses (accessed_at)"
+            )
+            self._conn.commit()
+            self._size = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+        return self._conn
+
+    def _get_sync(self, key: str) -> Optional[str]:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+                conn.commit()
+        return row[0] if row is not None else None
+
+    def _set_sync(self, key: str, response: str) -> None:
+        size = len(response.encode("utf-8"))
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            previous = conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, response, size, time.time()),
+            )
+            self._size += size - (previous[0] if previous else 0)
+
+            if self._size > self._max_bytes:
+                evicted = []
+                for old_key, old_size in conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at"
+                ):
+                    if self._size <= self._max_bytes:
+                        break
+                    evicted.append((old_key,))
+                    self._size -= old_size
+                conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+                self._stats["evictions"] += len(evicted)
+            conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached response for `key`, or None on a miss.
+        """
+        try:
+            response = await run_in_threadpool(self._get_sync, key)
+        except sqlite3.Error as e:
+            logger.warning(f"llm response cache read failed: {e}")
+            response = None
+
+        self._stats["hits" if response is not None else "misses"] += 1
+        return response
+
+    async def set(self, key: str, response: str) -> None:
+        """
+        Store `response` under `key`, evicting old entries if over budget.
+        """
+        try:
+            await run_in_threadpool(self._set_sync, key, response)
+        except sqlite3.Error as e:
+            logger.warning(f"llm response cache write failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit/miss/eviction counters since process start, plus stored bytes.
+        """
+        return {**self._stats, "bytes": self._size}
+
+
+embedding_cache = EmbeddingCache(
+    path=settings.EMBEDDING_CACHE_PATH,
+    max_entries=settings.EMBEDDING_CACHE_SIZE,
+)
+
+response_cache = ResponseCache(
+    path=settings.LLM_CACHE_PATH,
+    max_bytes=settings.LLM_CACHE_MAX_BYTES,
+)
@@ -1,12 +1,22 @@
 import os
-from typing import Dict, Any
+import numpy as np
+from typing import Any, AsyncIterator, Dict
 
+from app.core.config import settings
+from .cache import embedding_cache, response_cache
+from .batcher import EmbeddingBatcher
 from .exceptions import ProviderError
+from .registry import provider_registry
 from .strategies.wrapper import JSONWrapper, MDWrapper
 from .providers.ollama import OllamaProvider, OllamaEmbeddingProvider
 from .providers.openai import OpenAIProvider, OpenAIEmbeddingProvider
 from .providers.moonshot import MoonshotProvider, MoonshotEmbeddingProvider
 
+_embedding_batcher = EmbeddingBatcher(
+    window=settings.EMBEDDING_BATCH_WINDOW_MS / 1000,
+    max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+)
+
 
 class AgentManager:
     def __init__(self, strategy: str | None = None, model: str = "gemma3:4b") -> None:
@@ -29,23 +39,67 @@ class AgentManager:
         # 检查 OpenAI API 密钥
         openai_api_key = kwargs.get("openai_api_key", os.getenv("OPENAI_API_KEY"))
         if openai_api_key:
-            return OpenAIProvider(api_key=openai_api_key)
+            return provider_registry.get_or_create(
+                ("llm", "openai", openai_api_key),
+                lambda: OpenAIProvider(api_key=openai_api_key),
+            )
 
         # 默认使用 Ollama
         model = kwargs.get("model", self.model)
-        installed_ollama_models = await OllamaProvider.get_installed_models()
-        if model not in installed_ollama_models:
-            raise ProviderError(
-                f"Ollama Model '{model}' is not found. Run `ollama pull {model} or pick from any available models {installed_ollama_models}"
-            )
-        return OllamaProvider(model_name=model)
+        await provider_registry.ensure_ollama_model(model)
+        return provider_registry.get_or_create(
+            ("llm", "ollama", model, None),
+            lambda: OllamaProvider(model_name=model),
+        )
+
+    async def model_tag(self, **kwargs: Any) -> str:
+        """
+        Identifies the provider and model that `run` currently resolves to.
+        """
+        provider = await self._get_provider(**kwargs)
+        return f"{type(provider).__name__}:{getattr(provider, 'model', '')}"
 
-    async def run(self, prompt: str, **kwargs: Any) -> Dict[str, Any]:
+    async def run(self, prompt: str, cache: bool = False, **kwargs: Any) -> Dict[str, Any]:
         """
         Run the agent with the given prompt and generation arguments.
+
+        With `cache=True`, deterministic generations (temperature 0) are served
+        from the LLM response cache when the same provider, model, strategy,
+        options and prompt have been seen before. Only callers that want the
+        same answer for the same prompt, such as structured extraction, should
+        opt in; a retry loop would otherwise replay the response it is retrying.
         """
         provider = await self._get_provider(**kwargs)
-        return await self.strategy(prompt, provider, **kwargs)
+        options = provider._options(kwargs)
+        if not cache or options.get("temperature", 0) != 0:
+            return await self.strategy(prompt, provider, **kwargs)
+
+        key = response_cache.make_key(
+            type(provider).__name__,
+            getattr(provider, "model", ""),
+            type(self.strategy).__name__,
+            options,
+            prompt,
+        )
+        cached = await response_cache.get(key)
+        if cached is not None:
+            return self.strategy.parse(cached)
+
+        response = await provider(prompt, **kwargs)
+        # parse before caching so malformed responses are not replayed
+        result = self.strategy.parse(response)
+        await response_cache.set(key, response)
+        return result
+
+    async def stream(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream the raw response tokens for the given prompt as the provider
+        produces them. Pass the joined tokens to `self.strategy.parse` to get
+        the same result `run` would have returned.
+        """
+        provider = await self._get_provider(**kwargs)
+        async for token in provider.stream(prompt, **kwargs):
+            yield token
 
 
 class EmbeddingManager:
@@ -64,20 +118,79 @@ class EmbeddingManager:
         # 检查 OpenAI API 密钥
         openai_api_key = kwargs.get("openai_api_key", os.getenv("OPENAI_API_KEY"))
         if openai_api_key:
-            return OpenAIEmbeddingProvider(api_key=openai_api_key)
+            return provider_registry.get_or_create(
+                ("embedding", "openai", openai_api_key),
+                lambda: OpenAIEmbeddingProvider(api_key=openai_api_key),
+            )
         
         # 默认使用 Ollama
         model = kwargs.get("embedding_model", self._model)
-        installed_ollama_models = await OllamaProvider.get_installed_models()
-        if model not in installed_ollama_models:
-            raise ProviderError(
-                f"Ollama Model '{model}' is not found. Run `ollama pull {model} or pick from any available models {installed_ollama_models}"
-            )
-        return OllamaEmbeddingProvider(embedding_model=model)
+        await provider_registry.ensure_ollama_model(model)
+        return provider_registry.get_or_create(
+            ("embedding", "ollama", model, None),
+            lambda: OllamaEmbeddingProvider(embedding_model=model),
+        )
+
+    async def model_tag(self, **kwargs: Any) -> str:
+        """
+        Identifies the provider and model that `embed` currently resolves to,
+        so stored vectors can be invalidated when either changes.
+        """
+        provider = await self._get_embedding_provider(**kwargs)
+        return f"{type(provider).__name__}:{provider._model}"
 
     async def embed(self, text: str, **kwargs: Any) -> list[float]:
         """
         Get the embedding for the given text.
+
+        Vectors are served from the content-addressed embedding cache when the
+        same (provider, model, text) has been embedded before. Cache misses
+        from concurrent callers are coalesced into one provider request.
         """
         provider = await self._get_embedding_provider(**kwargs)
-        return await provider.embed(text)
+        key = embedding_cache.make_key(type(provider).__name__, provider._model, text)
+
+        cached = await embedding_cache.get(key)
+        if cached is not None:
+            return cached.tolist()
+
+        embedding = await _embedding_batcher.submit(provider, text)
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        await embedding_cache.set(key, vector)
+        return vector.tolist()
+
+    async def embed_many(self, texts: list[str], **kwargs: Any) -> list[list[float]]:
+        """
+        Get the embeddings for several texts, in input order.
+
+        Cached vectors are reused; the remaining texts are embedded with as
+        few batched provider requests as the provider's batch limit allows.
+        """
+        provider = await self._get_embedding_provider(**kwargs)
+        keys = [
+            embedding_cache.make_key(type(provider).__name__, provider._model, text)
+            for text in texts
+        ]
+        vectors = await embedding_cache.get_many(keys)
+
+        missing = {key: text for text, key in zip(texts, keys) if key not in vectors}
+        if missing:
+            pending = list(missing.values())
+            embeddings = []
+            for start in range(0, len(pending), provider.max_batch_size):
+                chunk = pending[start : start + provider.max_batch_size]
+                chunk_embeddings = await provider.embed_many(chunk)
+                if len(chunk_embeddings) != len(chunk):
+                    raise ProviderError(
+                        f"Embedding provider returned {len(chunk_embeddings)} vectors"
+                        f" for {len(chunk)} texts"
+                    )
+                embeddings.extend(chunk_embeddings)
+            fresh = {
+                key: np.asarray(embedding, dtype=np.float32).reshape(-1)
+                for key, embedding in zip(missing, embeddings)
+            }
+            await embedding_cache.set_many(fresh)
+            vectors.update(fresh)
+
+        return [vectors[key].tolist() for key in keys]
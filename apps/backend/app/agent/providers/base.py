@@ -1,4 +1,6 @@
-from typing import Any
+import asyncio
+
+from typing import Any, AsyncIterator, Dict
 from abc import ABC, abstractmethod
 
 
@@ -10,11 +12,39 @@ class Provider(ABC):
     @abstractmethod
     async def __call__(self, prompt: str, **generation_args: Any) -> str: ...
 
+    @staticmethod
+    def _options(generation_args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        The generation options actually sent to the model, after defaults.
+        """
+        return dict(generation_args)
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        """
+        Yield the response in chunks as the model produces them.
+
+        Providers with a streaming API override this; the default yields the
+        complete response as a single chunk.
+        """
+        yield await self(prompt, **generation_args)
+
 
 class EmbeddingProvider(ABC):
     """
     Abstract base class for embedding providers.
     """
 
+    # most texts a single `embed_many` request may carry
+    max_batch_size: int = 64
+
     @abstractmethod
     async def embed(self, text: str) -> list[float]: ...
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed several texts, returning one vector per text in input order.
+
+        Providers whose API accepts a list of inputs override this to make a
+        single request; the default falls back to concurrent `embed` calls.
+        """
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
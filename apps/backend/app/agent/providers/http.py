@@ -0,0 +1,42 @@
+import httpx
+
+from typing import Optional
+
+from app.core.config import settings
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def connection_limits() -> httpx.Limits:
+    """
+    Connection-pool limits applied to every outbound provider client.
+    """
+    return httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide `httpx.AsyncClient` shared by the HTTP-based
+    providers, creating it on first use.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=connection_limits(),
+            timeout=httpx.Timeout(settings.LLM_REQUEST_TIMEOUT),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """
+    Close the shared client; called once on application shutdown.
+    """
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
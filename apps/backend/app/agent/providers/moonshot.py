@@ -2,8 +2,7 @@ import os
 import logging
 import json
 
-from typing import Any, Dict
-from fastapi.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Dict, Tuple
 
 try:
     import httpx
@@ -12,6 +11,7 @@ except ImportError:
 
 from ..exceptions import ProviderError
 from .base import Provider, EmbeddingProvider
+from .http import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -26,54 +26,59 @@ class MoonshotProvider(Provider):
         self.instructions = ""
         self.base_url = "https://api.moonshot.cn/v1"
 
-    def _generate_sync(self, prompt: str, options: Dict[str, Any]) -> str:
+    def _build_request(
+        self, prompt: str, options: Dict[str, Any]
+    ) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        messages = []
+        if self.instructions:
+            messages.append({"role": "system", "content": self.instructions})
+        messages.append({"role": "user", "content": prompt})
+        
+        # 使用最基本的参数构建请求
+        data = {
+            "model": self.model,
+            "messages": messages
+        }
+        
+        # 仅添加明确支持的参数
+        if "temperature" in options and 0 <= options["temperature"] <= 2:
+            data["temperature"] = options["temperature"]
+        if "max_tokens" in options and options["max_tokens"] > 0:
+            data["max_tokens"] = min(options["max_tokens"], 4096)  # 限制最大值
+        return headers, data
+
+    async def _generate(self, prompt: str, options: Dict[str, Any]) -> str:
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
+            headers, data = self._build_request(prompt, options)
             
-            messages = []
-            if self.instructions:
-                messages.append({"role": "system", "content": self.instructions})
-            messages.append({"role": "user", "content": prompt})
+            logger.info(f"Moonshot API request: {json.dumps(data, ensure_ascii=False)}")
             
-            # 使用最基本的参数构建请求
-            data = {
-                "model": self.model,
-                "messages": messages
-            }
+            response = await get_http_client().post(
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=data,
+                timeout=60.0
+            )
             
-            # 仅添加明确支持的参数
-            if "temperature" in options and 0 <= options["temperature"] <= 2:
-                data["temperature"] = options["temperature"]
-            if "max_tokens" in options and options["max_tokens"] > 0:
-                data["max_tokens"] = min(options["max_tokens"], 4096)  # 限制最大值
+            logger.info(f"Moonshot API response status: {response.status_code}")
             
-            logger.info(f"Moonshot API request: {json.dumps(data, ensure_ascii=False)}")
+            if response.status_code != 200:
+                error_text = response.text
+                logger.error(f"Moonshot API error response: {error_text}")
+                raise ProviderError(f"Moonshot API returned {response.status_code}: {error_text}")
             
-            with httpx.Client() as client:
-                response = client.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=data,
-                    timeout=60.0
-                )
-                
-                logger.info(f"Moonshot API response status: {response.status_code}")
-                
-                if response.status_code != 200:
-                    error_text = response.text
-                    logger.error(f"Moonshot API error response: {error_text}")
-                    raise ProviderError(f"Moonshot API returned {response.status_code}: {error_text}")
-                
-                result = response.json()
-                logger.info(f"Moonshot API response: {json.dumps(result, ensure_ascii=False)}")
-                
-                if "choices" in result and len(result["choices"]) > 0:
-                    return result["choices"][0]["message"]["content"]
-                else:
-                    raise ProviderError("No response choices returned from Moonshot API")
+            result = response.json()
+            logger.info(f"Moonshot API response: {json.dumps(result, ensure_ascii=False)}")
+            
+            if "choices" in result and len(result["choices"]) > 0:
+                return result["choices"][0]["message"]["content"]
+            else:
+                raise ProviderError("No response choices returned from Moonshot API")
                     
         except httpx.HTTPError as e:
             logger.error(f"Moonshot HTTP error: {e}")
@@ -82,15 +87,58 @@ class MoonshotProvider(Provider):
             logger.error(f"Moonshot error: {e}")
             raise ProviderError(f"Moonshot - error generating response: {e}") from e
 
-    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+    @staticmethod
+    def _options(generation_args: Dict[str, Any]) -> Dict[str, Any]:
         opts = {
             "temperature": generation_args.get("temperature", 0.7),
             "top_p": generation_args.get("top_p", 0.9),
             "max_tokens": generation_args.get("max_length", 3000),  # 降低默认值
         }
         # 移除不支持的参数
-        opts = {k: v for k, v in opts.items() if v is not None}
-        return await run_in_threadpool(self._generate_sync, prompt, opts)
+        return {k: v for k, v in opts.items() if v is not None}
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        return await self._generate(prompt, self._options(generation_args))
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        """
+        Stream response tokens from the chat completions SSE endpoint.
+        """
+        headers, data = self._build_request(prompt, self._options(generation_args))
+        data["stream"] = True
+
+        try:
+            async with get_http_client().stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=data,
+                timeout=60.0
+            ) as response:
+                if response.status_code != 200:
+                    error_text = (await response.aread()).decode("utf-8", errors="replace")
+                    logger.error(f"Moonshot API error response: {error_text}")
+                    raise ProviderError(f"Moonshot API returned {response.status_code}: {error_text}")
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:"):].strip()
+                    if payload == "[DONE]":
+                        break
+                    choices = json.loads(payload).get("choices") or []
+                    content = choices[0].get("delta", {}).get("content") if choices else None
+                    if content:
+                        yield content
+
+        except ProviderError:
+            raise
+        except httpx.HTTPError as e:
+            logger.error(f"Moonshot HTTP error: {e}")
+            raise ProviderError(f"Moonshot - HTTP error: {e}") from e
+        except Exception as e:
+            logger.error(f"Moonshot error: {e}")
+            raise ProviderError(f"Moonshot - error streaming response: {e}") from e
 
 
 class MoonshotEmbeddingProvider(EmbeddingProvider):
@@ -106,7 +154,7 @@ class MoonshotEmbeddingProvider(EmbeddingProvider):
         self._model = embedding_model
         self.base_url = "https://api.moonshot.cn/v1"
 
-    def _embed_sync(self, text: str) -> list[float]:
+    async def embed(self, text: str) -> list[float]:
         try:
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
@@ -119,25 +167,53 @@ class MoonshotEmbeddingProvider(EmbeddingProvider):
                 "input": text
             }
             
-            with httpx.Client() as client:
-                response = client.post(
-                    f"{self.base_url}/embeddings",
-                    headers=headers,
-                    json=data,
-                    timeout=60.0
-                )
-                response.raise_for_status()
-                result = response.json()
-                
-                if "data" in result and len(result["data"]) > 0:
-                    return result["data"][0]["embedding"]
-                else:
-                    raise ProviderError("No embedding data returned from Moonshot API")
+            response = await get_http_client().post(
+                f"{self.base_url}/embeddings",
+                headers=headers,
+                json=data,
+                timeout=60.0
+            )
+            response.raise_for_status()
+            result = response.json()
+            
+            if "data" in result and len(result["data"]) > 0:
+                return result["data"][0]["embedding"]
+            else:
+                raise ProviderError("No embedding data returned from Moonshot API")
                     
         except httpx.HTTPError as e:
             raise ProviderError(f"Moonshot - HTTP error during embedding: {e}") from e
         except Exception as e:
             raise ProviderError(f"Moonshot - error generating embedding: {e}") from e
 
-    async def embed(self, text: str) -> list[float]:
-        return await run_in_threadpool(self._embed_sync, text)
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        try:
+            headers = {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+
+            data = {
+                "model": self._model,
+                "input": texts
+            }
+
+            response = await get_http_client().post(
+                f"{self.base_url}/embeddings",
+                headers=headers,
+                json=data,
+                timeout=60.0
+            )
+            response.raise_for_status()
+            result = response.json()
+
+            if "data" in result and len(result["data"]) == len(texts):
+                items = sorted(result["data"], key=lambda item: item.get("index", 0))
+                return [item["embedding"] for item in items]
+            else:
+                raise ProviderError("Incomplete embedding data returned from Moonshot API")
+
+        except httpx.HTTPError as e:
+            raise ProviderError(f"Moonshot - HTTP error during embedding: {e}") from e
+        except Exception as e:
+            raise ProviderError(f"Moonshot - error generating embedding: {e}") from e
@@ -1,55 +1,93 @@
 import logging
 import ollama
 
-from typing import Any, Dict, List, Optional
-from fastapi.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from ..exceptions import ProviderError
 from .base import Provider, EmbeddingProvider
+from .http import connection_limits
 
 logger = logging.getLogger(__name__)
 
 
+# clients that list the installed models, one per host, kept for reuse
+_list_clients: Dict[Optional[str], ollama.AsyncClient] = {}
+
+
+def _make_client(host: Optional[str] = None) -> ollama.AsyncClient:
+    return ollama.AsyncClient(host=host, limits=connection_limits())
+
+
+async def close_list_clients() -> None:
+    """
+    Close the model-listing clients; called once on application shutdown.
+    """
+    while _list_clients:
+        _, client = _list_clients.popitem()
+        # ollama's AsyncClient has no close(); it wraps an httpx.AsyncClient
+        await client._client.aclose()
+
+
 class OllamaProvider(Provider):
     def __init__(self, model_name: str = "gemma3:4b", host: Optional[str] = None):
         self.model = model_name
-        self._client = ollama.Client(host=host) if host else ollama.Client()
+        self._client = _make_client(host)
 
     @staticmethod
     async def get_installed_models(host: Optional[str] = None) -> List[str]:
         """
         List all installed models.
         """
+        client = _list_clients.get(host)
+        if client is None:
+            client = _list_clients[host] = _make_client(host)
+        response = await client.list()
+        return [model_class.model for model_class in response.models]
 
-        def _list_sync() -> List[str]:
-            client = ollama.Client(host=host) if host else ollama.Client()
-            return [model_class.model for model_class in client.list().models]
-
-        return await run_in_threadpool(_list_sync)
-
-    def _generate_sync(self, prompt: str, options: Dict[str, Any]) -> str:
+    async def _generate(self, prompt: str, options: Dict[str, Any]) -> str:
         """
         Generate a response from the model.
         """
         try:
-            response = self._client.generate(
+            response = await self._client.generate(
                 prompt=prompt,
                 model=self.model,
                 options=options,
             )
             return response["response"].strip()
         except Exception as e:
-            logger.error(f"ollama sync error: {e}")
+            logger.error(f"ollama error: {e}")
             raise ProviderError(f"Ollama - Error generating response: {e}")
 
-    async def __call__(self, prompt: str, **generation_args: Any) -> str:
-        opts = {
+    @staticmethod
+    def _options(generation_args: Dict[str, Any]) -> Dict[str, Any]:
+        return {
             "temperature": generation_args.get("temperature", 0),
             "top_p": generation_args.get("top_p", 0.9),
             "top_k": generation_args.get("top_k", 40),
             "num_ctx": generation_args.get("max_length", 20000),
         }
-        return await run_in_threadpool(self._generate_sync, prompt, opts)
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        return await self._generate(prompt, self._options(generation_args))
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        """
+        Stream response tokens from the model.
+        """
+        try:
+            parts = await self._client.generate(
+                prompt=prompt,
+                model=self.model,
+                options=self._options(generation_args),
+                stream=True,
+            )
+            async for part in parts:
+                if part["response"]:
+                    yield part["response"]
+        except Exception as e:
+            logger.error(f"ollama streaming error: {e}")
+            raise ProviderError(f"Ollama - Error streaming response: {e}")
 
 
 class OllamaEmbeddingProvider(EmbeddingProvider):
@@ -59,15 +97,14 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
         host: Optional[str] = None,
     ):
         self._model = embedding_model
-        self._client = ollama.Client(host=host) if host else ollama.Client()
+        self._client = _make_client(host)
 
     async def embed(self, text: str) -> List[float]:
         """
         Generate an embedding for the given text.
         """
         try:
-            response = await run_in_threadpool(
-                self._client.embed,
+            response = await self._client.embed(
                 input=text,
                 model=self._model,
             )
@@ -75,3 +112,17 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
         except Exception as e:
             logger.error(f"ollama embedding error: {e}")
             raise ProviderError(f"Ollama - Error generating embedding: {e}")
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts in one request.
+        """
+        try:
+            response = await self._client.embed(
+                input=texts,
+                model=self._model,
+            )
+            return response.embeddings
+        except Exception as e:
+            logger.error(f"ollama embedding error: {e}")
+            raise ProviderError(f"Ollama - Error generating embedding: {e}")
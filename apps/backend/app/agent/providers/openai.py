@@ -1,28 +1,35 @@
 import os
 import logging
 
-from openai import OpenAI
-from typing import Any, Dict
-from fastapi.concurrency import run_in_threadpool
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from typing import Any, AsyncIterator, Dict
 
 from ..exceptions import ProviderError
 from .base import Provider, EmbeddingProvider
+from .http import connection_limits
 
 logger = logging.getLogger(__name__)
 
 
+def _make_client(api_key: str) -> AsyncOpenAI:
+    return AsyncOpenAI(
+        api_key=api_key,
+        http_client=DefaultAsyncHttpxClient(limits=connection_limits()),
+    )
+
+
 class OpenAIProvider(Provider):
     def __init__(self, api_key: str | None = None, model: str = "gpt-4o"):
         api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ProviderError("OpenAI API key is missing")
-        self._client = OpenAI(api_key=api_key)
+        self._client = _make_client(api_key)
         self.model = model
         self.instructions = ""
 
-    def _generate_sync(self, prompt: str, options: Dict[str, Any]) -> str:
+    async def _generate(self, prompt: str, options: Dict[str, Any]) -> str:
         try:
-            response = self._client.responses.create(
+            response = await self._client.responses.create(
                 model=self.model,
                 instructions=self.instructions,
                 input=prompt,
@@ -32,17 +39,37 @@ class OpenAIProvider(Provider):
         except Exception as e:
             raise ProviderError(f"OpenAI - error generating response: {e}") from e
 
-    async def __call__(self, prompt: str, **generation_args: Any) -> str:
-        opts = {
+    @staticmethod
+    def _options(generation_args: Dict[str, Any]) -> Dict[str, Any]:
+        return {
             "temperature": generation_args.get("temperature", 0),
             "top_p": generation_args.get("top_p", 0.9),
             "top_k": generation_args.get("top_k", 40),
             "max_tokens": generation_args.get("max_length", 20000),
         }
-        return await run_in_threadpool(self._generate_sync, prompt, opts)
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        return await self._generate(prompt, self._options(generation_args))
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        try:
+            events = await self._client.responses.create(
+                model=self.model,
+                instructions=self.instructions,
+                input=prompt,
+                stream=True,
+                **self._options(generation_args),
+            )
+            async for event in events:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+        except Exception as e:
+            raise ProviderError(f"OpenAI - error streaming response: {e}") from e
 
 
 class OpenAIEmbeddingProvider(EmbeddingProvider):
+    max_batch_size = 2048
+
     def __init__(
         self,
         api_key: str | None = None,
@@ -51,14 +78,23 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
         api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ProviderError("OpenAI API key is missing")
-        self._client = OpenAI(api_key=api_key)
+        self._client = _make_client(api_key)
         self._model = embedding_model
 
     async def embed(self, text: str) -> list[float]:
         try:
-            response = await run_in_threadpool(
-                self._client.embeddings.create, input=text, model=self._model
+            response = await self._client.embeddings.create(
+                input=text, model=self._model
+            )
+            return response.data[0].embedding
+        except Exception as e:
+            raise ProviderError(f"OpenAI - error generating embedding: {e}") from e
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        try:
+            response = await self._client.embeddings.create(
+                input=texts, model=self._model
             )
-            return response["data"][0]["embedding"]
+            return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
         except Exception as e:
             raise ProviderError(f"OpenAI - error generating embedding: {e}") from e
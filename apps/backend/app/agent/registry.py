@@ -0,0 +1,89 @@
+import time
+import asyncio
+import logging
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+from .exceptions import ProviderError
+from .providers.ollama import OllamaProvider
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ProviderRegistry:
+    """
+    Process-wide registry of resolved providers.
+
+    * Each provider (and its underlying client) is built once per
+      (kind, provider, model, host) key and reused across requests.
+    * The list of installed Ollama models is cached per host and refreshed in
+      the background once it is older than `ttl` seconds, so validation never
+      costs a `/api/tags` round-trip on the request path.
+    """
+
+    def __init__(self, ttl: float = 300.0) -> None:
+        self._ttl = ttl
+        self._providers: Dict[Hashable, Any] = {}
+        self._ollama_models: Dict[Optional[str], Tuple[float, List[str]]] = {}
+        self._refresh_tasks: Dict[Optional[str], asyncio.Task] = {}
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """
+        Return the provider registered under `key`, building it on first use.
+        """
+        provider = self._providers.get(key)
+        if provider is None:
+            provider = factory()
+            self._providers[key] = provider
+        return provider
+
+    async def _fetch_ollama_models(self, host: Optional[str]) -> List[str]:
+        models = await OllamaProvider.get_installed_models(host)
+        self._ollama_models[host] = (time.monotonic(), models)
+        return models
+
+    async def _refresh_in_background(self, host: Optional[str]) -> None:
+        try:
+            await self._fetch_ollama_models(host)
+        except Exception as e:
+            logger.warning(f"refreshing installed ollama models failed: {e}")
+        finally:
+            self._refresh_tasks.pop(host, None)
+
+    async def get_ollama_models(self, host: Optional[str] = None) -> List[str]:
+        """
+        Installed Ollama models for `host`, served from the TTL cache.
+        """
+        entry = self._ollama_models.get(host)
+        if entry is None:
+            return await self._fetch_ollama_models(host)
+
+        fetched_at, models = entry
+        if time.monotonic() - fetched_at > self._ttl and host not in self._refresh_tasks:
+            self._refresh_tasks[host] = asyncio.create_task(
+                self._refresh_in_background(host)
+            )
+        return models
+
+    async def ensure_ollama_model(self, model: str, host: Optional[str] = None) -> None:
+        """
+        Raise ProviderError unless `model` is installed on the Ollama `host`.
+
+        A miss against the cached list triggers one synchronous refresh, so a
+        model pulled after the last refresh is picked up immediately.
+        """
+        installed_ollama_models = await self.get_ollama_models(host)
+        if model in installed_ollama_models:
+            return
+
+        installed_ollama_models = await self._fetch_ollama_models(host)
+        if model not in installed_ollama_models:
+            raise ProviderError(
+                f"Ollama Model '{model}' is not found. Run `ollama pull {model} or pick from any available models {installed_ollama_models}"
+            )
+
+
+provider_registry = ProviderRegistry(ttl=settings.PROVIDER_MODELS_TTL)
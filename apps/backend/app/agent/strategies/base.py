@@ -21,3 +21,13 @@ class Strategy(ABC):
             Dict[str, Any]: The generated response and any additional information.
         """
         ...
+
+    @abstractmethod
+    def parse(self, response: str) -> Any:
+        """
+        Turns a complete raw provider response into this strategy's output.
+
+        Used when the response was streamed token by token instead of being
+        produced by `__call__`.
+        """
+        ...
@@ -17,7 +17,9 @@ class JSONWrapper(Strategy):
         """
         Wrapper strategy to format the prompt as JSON with the help of LLM.
         """
-        response = await provider(prompt, **generation_args)
+        return self.parse(await provider(prompt, **generation_args))
+
+    def parse(self, response: str) -> Dict[str, Any]:
         response = response.replace("```", "").replace("json", "").strip()
         logger.info(f"provider response: {response}")
         try:
@@ -37,7 +39,9 @@ class MDWrapper(Strategy):
         Wrapper strategy to format the prompt as Markdown with the help of LLM.
         """
         logger.info(f"prompt given to provider: \n{prompt}")
-        response = await provider(prompt, **generation_args)
+        return self.parse(await provider(prompt, **generation_args))
+
+    def parse(self, response: str) -> str:
         logger.info(f"provider response: {response}")
         try:
             response = (
@@ -2,13 +2,15 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, status, Depends
 
-from app.core import get_db_session
+from app.core import get_db_read_session
+from app.agent import embedding_cache, response_cache
+from app.services import document_converter
 
 health_check = APIRouter()
 
 
 @health_check.get("/ping", tags=["Health check"], status_code=status.HTTP_200_OK)
-async def ping(db: AsyncSession = Depends(get_db_session)):
+async def ping(db: AsyncSession = Depends(get_db_read_session)):
     """
     health check endpoint
     """
@@ -19,4 +21,10 @@ async def ping(db: AsyncSession = Depends(get_db_session)):
         import logging
         logging.error("Database health check failed", exc_info=True)
         db_status = "unreachable"
-    return {"message": "pong", "database": db_status}
+    return {
+        "message": "pong",
+        "database": db_status,
+        "embedding_cache": embedding_cache.stats(),
+        "llm_cache": response_cache.stats(),
+        "document_converter": document_converter.stats(),
+    }
@@ -6,8 +6,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, HTTPException, Depends, Request, status, Query
 from fastapi.responses import JSONResponse
 
-from app.core import get_db_session
-from app.services import JobService, JobNotFoundError
+from app.core import get_db_session, get_db_read_session
+from app.services import JobService, JobNotFoundError, JobParsingError
 from app.schemas.pydantic.job import JobUploadRequest
 
 job_router = APIRouter()
@@ -47,7 +47,7 @@ async def upload_job(
 
     try:
         job_service = JobService(db)
-        job_ids = await job_service.create_and_store_job(payload.model_dump())
+        job_ids, failures = await job_service.create_and_store_job(payload.model_dump())
 
     except AssertionError as e:
         raise HTTPException(
@@ -64,6 +64,7 @@ async def upload_job(
     return {
         "message": "data successfully processed",
         "job_id": job_ids,
+        "failed": failures,
         "request": {
             "request_id": request_id,
             "payload": payload,
@@ -78,7 +79,7 @@ async def upload_job(
 async def get_job(
     request: Request,
     job_id: str = Query(..., description="Job ID to fetch data for"),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_read_session),
 ):
     """
     Retrieves job data from both job_model and processed_job model by job_id.
@@ -132,3 +133,64 @@ async def get_job(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error fetching job data",
         )
+
+
+@job_router.get(
+    "/matches",
+    summary="Find the top-K stored resumes that best fit a job",
+)
+async def match_resumes(
+    request: Request,
+    job_id: str = Query(..., description="Job ID to find matching resumes for"),
+    top_k: int = Query(10, ge=1, le=1000, description="Number of resumes to return"),
+    db: AsyncSession = Depends(get_db_read_session),
+):
+    """
+    Ranks stored resumes against a job using the resume vector index.
+
+    Args:
+        job_id: The ID of the job to match resumes against
+        top_k: Maximum number of resumes to return
+
+    Returns:
+        Resume ids ranked by cosine similarity to the job keywords
+
+    Raises:
+        HTTPException: If the job is not found or has not been parsed.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        job_service = JobService(db)
+        matches = await job_service.match_resumes(job_id=job_id, top_k=top_k)
+
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": {
+                    "job_id": job_id,
+                    "resumes": matches,
+                },
+            },
+            headers=headers,
+        )
+
+    except JobNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except JobParsingError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error matching resumes: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error matching resumes",
+        )
@@ -1,9 +1,11 @@
+import json
 import logging
 import traceback
 
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
 from fastapi import (
     APIRouter,
     File,
@@ -15,20 +17,53 @@ from fastapi import (
     Query,
 )
 
-from app.core import get_db_session
+from app.core import get_db_session, get_db_read_session, settings
+from app.core.database import AsyncSessionLocal
 from app.services import (
+    task_queue,
+    document_converter,
+    BulkResumeUpload,
     ResumeService,
     ScoreImprovementService,
     ResumeNotFoundError,
     ResumeParsingError,
     JobNotFoundError,
+    DocumentConversionError,
+    DocumentConversionTimeoutError,
+    DocumentTooLargeError,
+    ConverterBusyError,
+    ConverterUnavailableError,
 )
-from app.schemas.pydantic import ResumeImprovementRequest
+from app.schemas.pydantic import ResumeImprovementRequest, ResumeScoreRequest
 
 resume_router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose content may still read the request body.
+
+    Starlette's StreamingResponse consumes `receive()` to watch for a client
+    disconnect on servers older than ASGI spec 2.4, which would swallow body
+    chunks; here a disconnect surfaces through the body stream or the send.
+    It ends the response quietly and closes the content, which cancels the
+    work still producing it.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except (OSError, ClientDisconnect):
+            logger.info("Client disconnected during a streamed response")
+            aclose = getattr(self.body_iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            return
+        if self.background is not None:
+            await self.background()
+
+
 @resume_router.post(
     "/upload",
     summary="Upload a resume in PDF or DOCX format and store it into DB in HTML/Markdown format",
@@ -36,13 +71,34 @@ logger = logging.getLogger(__name__)
 async def upload_resume(
     request: Request,
     file: UploadFile = File(...),
+    background: bool = Query(
+        False,
+        description="Return immediately with a task id and process the file in the background",
+    ),
+    dedupe: bool = Query(
+        True,
+        description="Return the existing resume when the same file or text was uploaded before",
+    ),
     db: AsyncSession = Depends(get_db_session),
 ):
     """
     Accepts a PDF or DOCX file, converts it to HTML/Markdown, and stores it in the database.
 
+    With `background=true` the resume id and a task id are returned right away;
+    progress is available from `/api/v1/tasks/{task_id}` and its `/events` stream.
+    The returned resume id is provisional: if the extracted text turns out to
+    match an existing resume, no resume is stored under it and the finished
+    task's result carries the existing `resume_id` with `duplicate: true` (and
+    the provisional id as `requested_resume_id`).
+
+    Re-uploading a file whose bytes or extracted text match an already processed
+    resume returns that resume with `duplicate: true`; pass `dedupe=false` to
+    store and process it again.
+
     Raises:
-        HTTPException: If the file type is not supported or if the file is empty.
+        HTTPException: If the file type is not supported, the file is empty or
+            too large (413), the converter is saturated (429) or down (503), or
+            the conversion timed out (504).
     """
     request_id = getattr(request.state, "request_id", str(uuid4()))
 
@@ -64,13 +120,89 @@ async def upload_resume(
             detail="Empty file. Please upload a valid file.",
         )
 
+    try:
+        document_converter.check_size(len(file_bytes))
+    except DocumentTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
+
+    if background:
+        if dedupe:
+            existing_id = await ResumeService(db).find_duplicate(
+                file_hash=ResumeService.hash_file(file_bytes)
+            )
+            if existing_id:
+                return {
+                    "message": f"File {file.filename} was already processed",
+                    "request_id": request_id,
+                    "resume_id": existing_id,
+                    "duplicate": True,
+                    "status": "success",
+                }
+
+        resume_id = str(uuid4())
+        task_id = await task_queue.submit(
+            db,
+            kind="resume_upload",
+            payload={
+                "resume_id": resume_id,
+                "filename": file.filename,
+                "file_type": file.content_type,
+                "content_type": "md",
+                "dedupe": dedupe,
+            },
+            input_data=file_bytes,
+        )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "message": (
+                    f"File {file.filename} accepted for processing. If it duplicates an"
+                    " existing resume, the task result's resume_id names that resume."
+                ),
+                "request_id": request_id,
+                "resume_id": resume_id,
+                "task_id": task_id,
+                "status": "pending",
+            },
+        )
+
     try:
         resume_service = ResumeService(db)
-        resume_id = await resume_service.convert_and_store_resume(
+        resume_id, duplicate = await resume_service.convert_and_store_resume(
             file_bytes=file_bytes,
             file_type=file.content_type,
             filename=file.filename,
             content_type="md",
+            dedupe=dedupe,
+        )
+    except ConverterBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": "5"},
+        )
+    except ConverterUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "10"},
+        )
+    except DocumentConversionTimeoutError as e:
+        # the converter gave up, the document is not known to be invalid
+        logger.warning(f"Converting file {file.filename} timed out: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e),
+            headers={"Retry-After": "30"},
+        )
+    except DocumentConversionError as e:
+        logger.warning(f"Error converting file {file.filename}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
         )
     except Exception as e:
         logger.error(
@@ -85,10 +217,58 @@ async def upload_resume(
         "message": f"File {file.filename} successfully processed as MD and stored in the DB",
         "request_id": request_id,
         "resume_id": resume_id,
+        "duplicate": duplicate,
         "status": "success",
     }
 
 
+@resume_router.post(
+    "/upload/bulk",
+    summary="Upload many resumes, or ZIP archives of resumes, in one request",
+)
+async def upload_resumes_bulk(
+    request: Request,
+    dedupe: bool = Query(
+        True,
+        description="Return the existing resume when the same file or text was uploaded before",
+    ),
+):
+    """
+    Accepts a multipart/form-data body with any number of PDF/DOCX file parts
+    and/or ZIP archives containing them, and processes them concurrently.
+
+    The body is parsed as it arrives and files are converted while the upload
+    is still in progress. The response is newline-delimited JSON, streamed
+    while the body is still being received: one line per file (`index`,
+    `filename`, `status` of success/duplicate/failed, and `resume_id` or
+    `error`) in completion order, followed by a summary line whose status is
+    `completed`, or `aborted` with an `error` if the body was malformed or
+    cut off.
+
+    Raises:
+        HTTPException: If the request is not multipart/form-data.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    content_type = request.headers.get("content-type", "")
+    try:
+        BulkResumeUpload.parse_boundary(content_type)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    async def ndjson():
+        upload = BulkResumeUpload(workers=settings.BULK_UPLOAD_WORKERS, dedupe=dedupe)
+        async for result in upload.run(request.stream(), content_type):
+            yield json.dumps(result) + "\n"
+
+    return _DuplexStreamingResponse(
+        content=ndjson(),
+        media_type="application/x-ndjson",
+        headers=headers,
+    )
+
+
 @resume_router.post(
     "/improve",
     summary="Score and improve a resume against a job description",
@@ -100,10 +280,16 @@ async def score_and_improve(
     stream: bool = Query(
         False, description="Enable streaming response using Server-Sent Events"
     ),
+    force: bool = Query(
+        False, description="Recompute even if a fresh stored result exists"
+    ),
 ):
     """
     Scores and improves a resume against a job description.
 
+    Repeat requests are answered from the stored result of an earlier run
+    with the same models and prompts while it is fresh, unless `force=true`.
+
     Raises:
         HTTPException: If the resume or job is not found.
     """
@@ -123,21 +309,28 @@ async def score_and_improve(
             raise JobNotFoundError(
                 message="invalid value passed in `job_id` field, please try again with valid job_id."
             )
-        score_improvement_service = ScoreImprovementService(db=db)
-
         if stream:
+            # the request session is closed before the response body is sent,
+            # so the stream opens (and releases) its own
+            async def events():
+                async with AsyncSessionLocal() as session:
+                    async for event in ScoreImprovementService(db=session).run_and_stream(
+                        resume_id=resume_id,
+                        job_id=job_id,
+                        force=force,
+                    ):
+                        yield event
+
             return StreamingResponse(
-                content=score_improvement_service.run_and_stream(
-                    resume_id=resume_id,
-                    job_id=job_id,
-                ),
+                content=events(),
                 media_type="text/event-stream",
                 headers=headers,
             )
         else:
-            improvements = await score_improvement_service.run(
+            improvements = await ScoreImprovementService(db=db).run(
                 resume_id=resume_id,
                 job_id=job_id,
+                force=force,
             )
             return JSONResponse(
                 content={
@@ -172,6 +365,55 @@ async def score_and_improve(
         )
 
 
+@resume_router.post(
+    "/score",
+    summary="Rank many jobs against a resume by similarity score, without LLM rewrites",
+)
+async def score_jobs(
+    request: Request,
+    payload: ResumeScoreRequest,
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Scores a resume against the given jobs, or every job linked to it, and
+    returns them ranked by cosine similarity.
+
+    Raises:
+        HTTPException: If the resume or any of the jobs is not found.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        score_improvement_service = ScoreImprovementService(db=db)
+        ranking = await score_improvement_service.score_jobs(
+            resume_id=str(payload.resume_id),
+            job_ids=[str(job_id) for job_id in payload.job_ids],
+        )
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": {
+                    "resume_id": str(payload.resume_id),
+                    "jobs": ranking,
+                },
+            },
+            headers=headers,
+        )
+    except (ResumeNotFoundError, JobNotFoundError) as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+
+
 @resume_router.get(
     "",
     summary="Get resume data from both resume and processed_resume models",
@@ -179,7 +421,7 @@ async def score_and_improve(
 async def get_resume(
     request: Request,
     resume_id: str = Query(..., description="Resume ID to fetch data for"),
-    db: AsyncSession = Depends(get_db_session),
+    db: AsyncSession = Depends(get_db_read_session),
 ):
     """
     Retrieves resume data from both resume_model and processed_resume model by resume_id.
@@ -243,37 +485,87 @@ async def get_resume_list(
     request: Request,
     page: int = Query(1, ge=1, description="Page number (starting from 1)"),
     page_size: int = Query(10, ge=1, le=100, description="Number of items per page"),
-    search: str = Query(None, description="Search by filename or content"),
-    db: AsyncSession = Depends(get_db_session),
+    search: str = Query(None, description="Full-text search over filename, content and keywords"),
+    cursor: str = Query(None, description="`next_cursor` of the previous page"),
+    db: AsyncSession = Depends(get_db_read_session),
 ):
     """
     Retrieves a paginated list of uploaded resumes.
 
+    Pages can be walked with `cursor` (the `next_cursor` of the previous page)
+    instead of `page`; cursor pages stay fast however deep they go, but carry
+    no total count. `page` remains supported for existing clients.
+
+    With `search`, resumes are matched against the full-text index and ranked
+    by relevance (BM25 on SQLite); search pages are walked with `cursor` only.
+
     Args:
         page: Page number (starting from 1)
         page_size: Number of items per page (1-100)
-        search: Optional search term to filter by filename or content
+        search: Optional search terms; all must match, each as a prefix
+        cursor: Cursor returned as `next_cursor` by the previous page
 
     Returns:
         Paginated list of resumes with metadata
 
     Raises:
-        HTTPException: If there's an error fetching the resume list.
+        HTTPException: If the cursor is invalid or there's an error fetching the resume list.
     """
     request_id = getattr(request.state, "request_id", str(uuid4()))
     headers = {"X-Request-ID": request_id}
 
     try:
         resume_service = ResumeService(db)
+
+        if search:
+            resumes, total_count, next_cursor = await resume_service.search_resumes(
+                search=search,
+                limit=page_size,
+                cursor=cursor,
+            )
+            return JSONResponse(
+                content={
+                    "request_id": request_id,
+                    "data": {
+                        "resumes": resumes,
+                        "pagination": {
+                            "page_size": page_size,
+                            "total_count": total_count,
+                            "has_next": next_cursor is not None,
+                            "next_cursor": next_cursor,
+                        },
+                    },
+                },
+                headers=headers,
+            )
         
+        if cursor:
+            resumes, _, next_cursor = await resume_service.get_resume_list(
+                limit=page_size,
+                cursor=cursor,
+            )
+            return JSONResponse(
+                content={
+                    "request_id": request_id,
+                    "data": {
+                        "resumes": resumes,
+                        "pagination": {
+                            "page_size": page_size,
+                            "has_next": next_cursor is not None,
+                            "next_cursor": next_cursor,
+                        },
+                    },
+                },
+                headers=headers,
+            )
+
         # 计算偏移量
         offset = (page - 1) * page_size
         
         # 获取简历列表和总数
-        resumes, total_count = await resume_service.get_resume_list(
+        resumes, total_count, next_cursor = await resume_service.get_resume_list(
             offset=offset,
             limit=page_size,
-            search=search
         )
         
         # 计算分页信息
@@ -292,17 +584,22 @@ async def get_resume_list(
                         "total_count": total_count,
                         "total_pages": total_pages,
                         "has_next": has_next,
-                        "has_prev": has_prev
+                        "has_prev": has_prev,
+                        "next_cursor": next_cursor,
                     }
                 },
             },
             headers=headers,
         )
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except Exception as e:
         logger.error(f"Error fetching resume list: {str(e)} - traceback: {traceback.format_exc()}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error fetching resume list",
         )
-
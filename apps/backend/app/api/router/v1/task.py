@@ -0,0 +1,108 @@
+import json
+import asyncio
+import logging
+import traceback
+
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core import get_db_read_session
+from app.core.database import AsyncReadSessionLocal
+from app.services import task_queue, TaskNotFoundError, TERMINAL_STATUSES
+
+task_router = APIRouter()
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 0.5
+
+
+@task_router.get(
+    "/{task_id}",
+    summary="Get the status of a background task",
+)
+async def get_task(
+    task_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db_read_session),
+):
+    """
+    Returns the current status, stage and result of a background task.
+
+    Raises:
+        HTTPException: If the task is not found.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        task = await task_queue.get(db, task_id)
+    except TaskNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error fetching task: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error fetching task",
+        )
+
+    return JSONResponse(
+        content={
+            "request_id": request_id,
+            "data": task,
+        },
+        headers=headers,
+    )
+
+
+@task_router.get(
+    "/{task_id}/events",
+    summary="Stream progress of a background task using Server-Sent Events",
+)
+async def stream_task_events(
+    task_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db_read_session),
+):
+    """
+    Emits an event every time the task's status or stage changes and closes
+    the stream once the task has succeeded or failed.
+
+    Raises:
+        HTTPException: If the task is not found.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        await task_queue.get(db, task_id)
+    except TaskNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+
+    async def events():
+        last = None
+        while True:
+            async with AsyncReadSessionLocal() as session:
+                task = await task_queue.get(session, task_id)
+            current = (task["status"], task["stage"])
+            if current != last:
+                yield f"data: {json.dumps(task)}\n\n"
+                last = current
+            if task["status"] in TERMINAL_STATUSES or await request.is_disconnected():
+                return
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    return StreamingResponse(
+        content=events(),
+        media_type="text/event-stream",
+        headers=headers,
+    )
@@ -8,23 +8,33 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from .api import health_check, v1_router, RequestIDMiddleware
+from .agent.providers.http import close_http_client
+from .agent.providers.ollama import close_list_clients
 from .core import (
     settings,
     async_engine,
+    async_read_engine,
     setup_logging,
     custom_http_exception_handler,
     validation_exception_handler,
     unhandled_exception_handler,
 )
-from .models import Base
+from .migrations import ensure_schema_current
+from .services import task_queue, document_converter
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await ensure_schema_current(async_engine, auto_migrate=settings.DB_AUTO_MIGRATE)
+    await document_converter.start()
+    await task_queue.start()
     yield
+    await task_queue.stop()
+    document_converter.shutdown()
+    await close_http_client()
+    await close_list_clients()
     await async_engine.dispose()
+    await async_read_engine.dispose()
 
 
 def create_app() -> FastAPI:
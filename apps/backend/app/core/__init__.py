@@ -1,4 +1,10 @@
-from .database import init_models, async_engine, get_db_session, get_sync_db_session
+from .database import (
+    async_engine,
+    async_read_engine,
+    get_db_session,
+    get_db_read_session,
+    get_sync_db_session,
+)
 from .config import settings, setup_logging
 from .exceptions import (
     custom_http_exception_handler,
@@ -9,10 +15,11 @@ from .exceptions import (
 
 __all__ = [
     "settings",
-    "init_models",
     "async_engine",
+    "async_read_engine",
     "setup_logging",
     "get_db_session",
+    "get_db_read_session",
     "get_sync_db_session",
     "custom_http_exception_handler",
     "validation_exception_handler",
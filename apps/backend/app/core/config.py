@@ -13,7 +13,45 @@ class Settings(BaseSettings):
     ASYNC_DATABASE_URL: Optional[str]
     SESSION_SECRET_KEY: Optional[str]
     DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 256
+    DB_AUTO_MIGRATE: bool = True
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_TEMP_STORE: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+    SQLITE_READ_POOL_SIZE: int = 4
     PYTHONDONTWRITEBYTECODE: int = 1
+    EMBEDDING_CACHE_PATH: Optional[str] = "./embedding_cache.db"
+    EMBEDDING_CACHE_SIZE: int = 2048
+    LLM_CACHE_PATH: Optional[str] = "./llm_cache.db"
+    LLM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    RESUME_INDEX_PATH: str = "./resume_index"
+    PROVIDER_MODELS_TTL: float = 300.0
+    IMPROVEMENT_CANDIDATES: int = 1
+    IMPROVEMENT_CONCURRENCY: int = 3
+    IMPROVEMENT_CANDIDATE_TEMPERATURE: float = 0.7
+    IMPROVEMENT_TARGET_SCORE: Optional[float] = None
+    IMPROVEMENT_RESULT_TTL: Optional[float] = 7 * 24 * 3600.0
+    TASK_WORKERS: int = 2
+    TASK_LEASE_SECONDS: float = 60.0
+    DOCUMENT_CONVERTER_WORKERS: int = 2
+    DOCUMENT_CONVERTER_QUEUE_SIZE: int = 8
+    DOCUMENT_MAX_BYTES: int = 10 * 1024 * 1024
+    DOCUMENT_CONVERSION_TIMEOUT: float = 60.0
+    BULK_UPLOAD_WORKERS: int = 4
+    BULK_UPLOAD_MAX_ARCHIVE_BYTES: int = 512 * 1024 * 1024
+    JOB_EXTRACTION_CONCURRENCY: int = 4
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_REQUEST_TIMEOUT: float = 120.0
 
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, ".env"),
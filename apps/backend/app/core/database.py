@@ -4,7 +4,7 @@ from functools import lru_cache
 from typing import AsyncGenerator, Generator, Optional
 
 from sqlalchemy import event, create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -14,7 +14,6 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from .config import settings
-from ..models.base import Base
 
 
 class _DatabaseSettings:
@@ -23,6 +22,21 @@ class _DatabaseSettings:
     SYNC_DATABASE_URL: str = settings.SYNC_DATABASE_URL
     ASYNC_DATABASE_URL: str = settings.ASYNC_DATABASE_URL
     DB_ECHO: bool = settings.DB_ECHO
+    DB_POOL_SIZE: int = settings.DB_POOL_SIZE
+    DB_MAX_OVERFLOW: int = settings.DB_MAX_OVERFLOW
+    DB_POOL_TIMEOUT: float = settings.DB_POOL_TIMEOUT
+    DB_POOL_RECYCLE: int = settings.DB_POOL_RECYCLE
+    DB_STATEMENT_CACHE_SIZE: int = settings.DB_STATEMENT_CACHE_SIZE
+    SQLITE_PRAGMAS = (
+        ("journal_mode", "WAL"),
+        ("foreign_keys", "ON"),
+        ("synchronous", settings.SQLITE_SYNCHRONOUS),
+        ("cache_size", -settings.SQLITE_CACHE_SIZE_KB),
+        ("mmap_size", settings.SQLITE_MMAP_SIZE),
+        ("busy_timeout", settings.SQLITE_BUSY_TIMEOUT_MS),
+        ("temp_store", settings.SQLITE_TEMP_STORE),
+    )
+    SQLITE_READ_POOL_SIZE: int = settings.SQLITE_READ_POOL_SIZE
 
     DB_CONNECT_ARGS = (
         {"check_same_thread": False} if SYNC_DATABASE_URL.startswith("sqlite") else {}
@@ -32,22 +46,69 @@ class _DatabaseSettings:
 settings = _DatabaseSettings()
 
 
-def _configure_sqlite(engine: Engine) -> None:
+def _is_file_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def _engine_options(url: str) -> dict:
+    """
+    Pool and driver options for the database behind `url`.
+
+    Server databases get a bounded, recycled connection pool shared by every
+    request of this process; with asyncpg, prepared statements are cached per
+    connection (set DB_STATEMENT_CACHE_SIZE=0 behind PgBouncer in transaction
+    mode). SQLite keeps SQLAlchemy's defaults; the async writer narrows its
+    pool to one connection in `_make_async_engine`.
+    """
+    if url.startswith("sqlite"):
+        return {"connect_args": settings.DB_CONNECT_ARGS}
+
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if make_url(url).drivername == "postgresql+asyncpg":
+        options["connect_args"] = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return options
+
+
+def _async_url(url: str) -> str:
+    """
+    Applies DB_STATEMENT_CACHE_SIZE to SQLAlchemy's own asyncpg statement
+    cache, which is configured through the URL.
     """
-    For SQLite:
+    parsed = make_url(url)
+    if parsed.drivername != "postgresql+asyncpg":
+        return url
+    return parsed.update_query_dict(
+        {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)}
+    ).render_as_string(hide_password=False)
 
-    * Enable WAL mode (better concurrent writes).
+
+def _configure_sqlite(engine: Engine, read_only: bool = False) -> None:
+    """
+    For SQLite, on every new pooled connection:
+
+    * Enable WAL mode (readers never block the writer).
     * Enforce foreign-key constraints.
+    * Apply the SQLITE_* performance settings: `synchronous`, page cache
+      size, memory-mapped I/O, busy timeout and temp store.
+    * With `read_only`, refuse writes (`query_only`).
     * Safe noop for non-SQLite engines.
     """
     if engine.dialect.name != "sqlite":
         return
 
-    @event.listens_for(engine, "connect", once=True)
+    @event.listens_for(engine, "connect")
     def _set_sqlite_pragma(dbapi_conn, _):
         cursor = dbapi_conn.cursor()
-        cursor.execute("PRAGMA journal_mode=WAL;")
-        cursor.execute("PRAGMA foreign_keys=ON;")
+        for name, value in settings.SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {name}={value};")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON;")
         cursor.close()
 
 
@@ -58,8 +119,8 @@ def _make_sync_engine() -> Engine:
         settings.SYNC_DATABASE_URL,
         echo=settings.DB_ECHO,
         pool_pre_ping=True,
-        connect_args=settings.DB_CONNECT_ARGS,
         future=True,
+        **_engine_options(settings.SYNC_DATABASE_URL),
     )
     _configure_sqlite(engine)
     return engine
@@ -67,24 +128,61 @@ def _make_sync_engine() -> Engine:
 
 @lru_cache(maxsize=1)
 def _make_async_engine() -> AsyncEngine:
-    """Create (or return) the global asynchronous Engine."""
+    """
+    Create (or return) the global asynchronous Engine.
+
+    On a SQLite file this is the single writer: its pool holds one
+    connection, so writes from concurrent requests queue in the pool (up to
+    DB_POOL_TIMEOUT) instead of failing with "database is locked".
+    """
+    options = _engine_options(settings.ASYNC_DATABASE_URL)
+    if _is_file_sqlite(settings.ASYNC_DATABASE_URL):
+        options.update(pool_size=1, max_overflow=0, pool_timeout=settings.DB_POOL_TIMEOUT)
     engine = create_async_engine(
-        settings.ASYNC_DATABASE_URL,
+        _async_url(settings.ASYNC_DATABASE_URL),
         echo=settings.DB_ECHO,
         pool_pre_ping=True,
-        connect_args=settings.DB_CONNECT_ARGS,
         future=True,
+        **options,
     )
     _configure_sqlite(engine.sync_engine)
     return engine
 
 
+@lru_cache(maxsize=1)
+def _make_async_read_engine() -> AsyncEngine:
+    """
+    Create (or return) the Engine for read-only sessions.
+
+    On a SQLite file this is a pool of at most SQLITE_READ_POOL_SIZE
+    read-only connections that read from WAL snapshots next to the writer;
+    further readers wait up to DB_POOL_TIMEOUT for one. Every other
+    database reads through the global engine.
+    """
+    if not _is_file_sqlite(settings.ASYNC_DATABASE_URL):
+        return _make_async_engine()
+
+    engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL,
+        echo=settings.DB_ECHO,
+        pool_pre_ping=True,
+        future=True,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        **_engine_options(settings.ASYNC_DATABASE_URL),
+    )
+    _configure_sqlite(engine.sync_engine, read_only=True)
+    return engine
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Session factories
 # ──────────────────────────────────────────────────────────────────────────────
 
 sync_engine: Engine = _make_sync_engine()
 async_engine: AsyncEngine = _make_async_engine()
+async_read_engine: AsyncEngine = _make_async_read_engine()
 
 SessionLocal: sessionmaker[Session] = sessionmaker(
     bind=sync_engine,
@@ -98,6 +196,11 @@ AsyncSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
     expire_on_commit=False,
 )
 
+AsyncReadSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    bind=async_read_engine,
+    expire_on_commit=False,
+)
+
 
 def get_sync_db_session() -> Generator[Session, None, None]:
     """
@@ -127,6 +230,11 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
-async def init_models(Base: Base) -> None:
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+async def get_db_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Yield a session for endpoints that only read. On SQLite it uses the
+    read-only pool and never takes the writer connection.
+    """
+    async with AsyncReadSessionLocal() as session:
+        yield session
+
@@ -14,6 +14,7 @@ async def custom_http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail, "request_id": request_id},
+        headers=getattr(exc, "headers", None),
     )
 
 
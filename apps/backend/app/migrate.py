@@ -0,0 +1,44 @@
+"""
+Applies pending database schema migrations.
+
+    python -m app.migrate            # upgrade to the latest version
+    python -m app.migrate --to 3     # upgrade up to version 3
+    python -m app.migrate --check    # exit 1 if migrations are pending
+"""
+
+import sys
+import asyncio
+import argparse
+
+from .core import async_engine, setup_logging
+from .migrations import HEAD_VERSION, current_version, migrate
+
+
+async def _run(target: int | None, check: bool) -> int:
+    try:
+        async with async_engine.connect() as conn:
+            version = await current_version(conn)
+        print(f"schema version {version}, latest {HEAD_VERSION}")
+        if check:
+            return 0 if version >= HEAD_VERSION else 1
+
+        async with async_engine.begin() as conn:
+            applied = await migrate(conn, target=target)
+        print(f"applied {', '.join(map(str, applied))}" if applied else "nothing to apply")
+        return 0
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.migrate", description=__doc__.splitlines()[1])
+    parser.add_argument("--to", type=int, dest="target", help="stop after this version")
+    parser.add_argument("--check", action="store_true", help="only report whether migrations are pending")
+    args = parser.parse_args()
+
+    setup_logging()
+    sys.exit(asyncio.run(_run(args.target, args.check)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from .versions import MIGRATIONS, HEAD_VERSION
+from .runner import (
+    SchemaOutdatedError,
+    schema_version,
+    current_version,
+    migrate,
+    ensure_schema_current,
+)
+
+__all__ = [
+    "MIGRATIONS",
+    "HEAD_VERSION",
+    "SchemaOutdatedError",
+    "schema_version",
+    "current_version",
+    "migrate",
+    "ensure_schema_current",
+]
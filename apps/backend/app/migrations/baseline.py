@@ -0,0 +1,138 @@
+"""
+Frozen snapshot of the schema that predates versioned migrations.
+
+Migration 1 creates these tables, and every later change is a migration of
+its own. Never edit this file to follow the models; add a migration instead.
+"""
+from sqlalchemy.types import JSON
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    text,
+)
+
+baseline = MetaData()
+
+
+def _timestamp(name: str, index: bool = False) -> Column:
+    return Column(
+        name,
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+        index=index,
+    )
+
+
+Table(
+    "users",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String, unique=True, index=True, nullable=False),
+    Column("name", String, nullable=False),
+)
+
+Table(
+    "resumes",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("resume_id", String, unique=True, nullable=False),
+    Column("content", Text, nullable=False),
+    Column("content_type", String, nullable=False),
+    _timestamp("created_at", index=True),
+)
+
+Table(
+    "processed_resumes",
+    baseline,
+    Column(
+        "resume_id",
+        String,
+        ForeignKey("resumes.resume_id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    ),
+    Column("personal_data", JSON, nullable=False),
+    Column("experiences", JSON, nullable=True),
+    Column("projects", JSON, nullable=True),
+    Column("skills", JSON, nullable=True),
+    Column("research_work", JSON, nullable=True),
+    Column("achievements", JSON, nullable=True),
+    Column("education", JSON, nullable=True),
+    Column("extracted_keywords", JSON, nullable=True),
+    _timestamp("processed_at", index=True),
+)
+
+Table(
+    "jobs",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("job_id", String, unique=True, nullable=False),
+    Column("resume_id", String, ForeignKey("resumes.resume_id"), nullable=False),
+    Column("content", Text, nullable=False),
+    _timestamp("created_at", index=True),
+)
+
+Table(
+    "processed_jobs",
+    baseline,
+    Column(
+        "job_id",
+        String,
+        ForeignKey("jobs.job_id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    ),
+    Column("job_title", String, nullable=False),
+    Column("company_profile", Text, nullable=True),
+    Column("location", String, nullable=True),
+    Column("date_posted", String, nullable=True),
+    Column("employment_type", String, nullable=True),
+    Column("job_summary", Text, nullable=False),
+    Column("key_responsibilities", JSON, nullable=True),
+    Column("qualifications", JSON, nullable=True),
+    Column("compensation_and_benfits", JSON, nullable=True),
+    Column("application_info", JSON, nullable=True),
+    Column("extracted_keywords", JSON, nullable=True),
+    _timestamp("processed_at", index=True),
+)
+
+Table(
+    "job_resume",
+    baseline,
+    Column(
+        "processed_job_id",
+        String,
+        ForeignKey("processed_jobs.job_id"),
+        primary_key=True,
+    ),
+    Column(
+        "processed_resume_id",
+        String,
+        ForeignKey("processed_resumes.resume_id"),
+        primary_key=True,
+    ),
+)
+
+Table(
+    "tasks",
+    baseline,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("task_id", String, unique=True, nullable=False),
+    Column("kind", String, nullable=False),
+    Column("status", String, nullable=False, index=True),
+    Column("stage", String, nullable=True),
+    Column("payload", JSON, nullable=True),
+    Column("input_data", LargeBinary, nullable=True),
+    Column("result", JSON, nullable=True),
+    Column("error", Text, nullable=True),
+    _timestamp("created_at", index=True),
+    _timestamp("updated_at"),
+)
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Table, inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def add_column(conn: AsyncConnection, column: Column) -> bool:
+    """
+    Adds a nullable model column to its existing table unless it is already
+    there. Returns whether the column was added.
+    """
+    table = column.table
+
+    def _add(sync_conn) -> bool:
+        existing = {c["name"] for c in inspect(sync_conn).get_columns(table.name)}
+        if column.name in existing:
+            return False
+
+        quote = sync_conn.dialect.identifier_preparer.quote
+        sync_conn.execute(
+            text(
+                f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)}"
+                f" {column.type.compile(dialect=sync_conn.dialect)}"
+            )
+        )
+        return True
+
+    return await conn.run_sync(_add)
+
+
+async def create_indexes(conn: AsyncConnection, table: Table, *names: str) -> None:
+    """
+    Creates the named indexes declared on `table` that do not exist yet.
+    """
+    indexes = {index.name: index for index in table.indexes}
+    for name in names:
+        await conn.run_sync(indexes[name].create, checkfirst=True)
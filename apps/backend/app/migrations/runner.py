@@ -0,0 +1,120 @@
+import logging
+
+from typing import List, Optional
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    inspect,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from .versions import HEAD_VERSION, MIGRATIONS
+
+logger = logging.getLogger(__name__)
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=True),
+    Column(
+        "applied_at",
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+    ),
+)
+
+
+class SchemaOutdatedError(RuntimeError):
+    def __init__(self, version: int, head: int = HEAD_VERSION):
+        super().__init__(
+            f"Database schema is at version {version}, the application needs {head}."
+            " Run `python -m app.migrate` or set DB_AUTO_MIGRATE=true."
+        )
+        self.version = version
+        self.head = head
+
+
+async def current_version(conn: AsyncConnection) -> int:
+    """
+    Highest applied migration, 0 for a database that was never migrated.
+    """
+    exists = await conn.run_sync(
+        lambda sync_conn: inspect(sync_conn).has_table(schema_version.name)
+    )
+    if not exists:
+        return 0
+    return await conn.scalar(select(func.max(schema_version.c.version))) or 0
+
+
+async def _lock(conn: AsyncConnection) -> None:
+    """
+    Serializes concurrent migrators (several workers starting at once) for
+    the rest of the transaction.
+    """
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('schema_version'))"))
+    await conn.execute(CreateTable(schema_version, if_not_exists=True))
+    if conn.dialect.name == "sqlite":
+        # a write opens the transaction (pysqlite only issues BEGIN before DML)
+        # and takes the database write lock, so the DDL below is transactional
+        await conn.execute(
+            schema_version.update()
+            .where(schema_version.c.version < 0)
+            .values(version=schema_version.c.version)
+        )
+
+
+async def migrate(conn: AsyncConnection, target: Optional[int] = None) -> List[int]:
+    """
+    Applies every migration after the current version up to `target` (the
+    latest by default) inside the caller's transaction. Returns the versions
+    applied.
+    """
+    await _lock(conn)
+    version = await current_version(conn)
+
+    applied = []
+    for number, description, upgrade in MIGRATIONS:
+        if number <= version or (target is not None and number > target):
+            continue
+        logger.info(f"Applying schema migration {number}: {description}")
+        await upgrade(conn)
+        await conn.execute(
+            insert(schema_version).values(version=number, description=description)
+        )
+        applied.append(number)
+    return applied
+
+
+async def ensure_schema_current(engine: AsyncEngine, auto_migrate: bool = False) -> int:
+    """
+    Start-up check: one query when the schema is current. An outdated schema
+    is migrated with `auto_migrate`, otherwise `SchemaOutdatedError` is raised.
+    Returns the schema version in use.
+    """
+    async with engine.connect() as conn:
+        version = await current_version(conn)
+
+    if version > HEAD_VERSION:
+        logger.warning(
+            f"Database schema version {version} is newer than this release ({HEAD_VERSION})"
+        )
+    if version >= HEAD_VERSION:
+        return version
+    if not auto_migrate:
+        raise SchemaOutdatedError(version)
+
+    async with engine.begin() as conn:
+        await migrate(conn)
+    return HEAD_VERSION
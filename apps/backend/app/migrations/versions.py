@@ -0,0 +1,176 @@
+import logging
+
+from typing import Awaitable, Callable, List, Tuple
+from sqlalchemy import inspect, select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.models import (
+    Resume,
+    Job,
+    ProcessedJob,
+    Task,
+    ImprovementResult,
+    job_resume_association,
+)
+from app.services.json_fields import load_json_field, migrate_legacy_json
+from app.services.resume_search import resume_search
+from .baseline import baseline
+from .helpers import add_column, create_indexes
+
+logger = logging.getLogger(__name__)
+
+Migration = Tuple[int, str, Callable[[AsyncConnection], Awaitable[None]]]
+
+
+async def _create_tables(conn: AsyncConnection) -> None:
+    # creates the frozen baseline tables that are missing; existing tables are
+    # left alone, and both are brought up to date by the migrations below
+    await conn.run_sync(baseline.create_all)
+
+
+async def _resume_hashes(conn: AsyncConnection) -> None:
+    resumes = Resume.__table__.c
+    for column in (resumes.filename, resumes.file_hash, resumes.content_hash):
+        await add_column(conn, column)
+    await create_indexes(
+        conn,
+        Resume.__table__,
+        "ix_resumes_file_hash",
+        "ix_resumes_content_hash",
+        "ix_resumes_created_at_id",
+    )
+
+
+async def _stored_embeddings(conn: AsyncConnection) -> None:
+    resumes, processed_jobs = Resume.__table__.c, ProcessedJob.__table__.c
+    for column in (
+        resumes.embedding,
+        resumes.embedding_model,
+        processed_jobs.keywords_text,
+        processed_jobs.keywords_embedding,
+        processed_jobs.embedding_model,
+    ):
+        await add_column(conn, column)
+
+    # embeddings are computed lazily on first use; the keyword text is not
+    result = await conn.execute(
+        select(ProcessedJob.job_id, ProcessedJob.extracted_keywords).where(
+            ProcessedJob.keywords_text.is_(None)
+        )
+    )
+    for job_id, extracted_keywords in result.all():
+        keywords = load_json_field(extracted_keywords, "extracted_keywords") or []
+        if keywords:
+            await conn.execute(
+                update(ProcessedJob)
+                .where(ProcessedJob.job_id == job_id)
+                .values(keywords_text=", ".join(keywords))
+            )
+
+
+async def _native_json(conn: AsyncConnection) -> None:
+    await migrate_legacy_json(conn)
+
+
+async def _resume_search(conn: AsyncConnection) -> None:
+    await resume_search.ensure_schema(conn)
+
+
+async def _lookup_indexes(conn: AsyncConnection) -> None:
+    await create_indexes(conn, Job.__table__, "ix_jobs_resume_id_created_at")
+    await create_indexes(
+        conn, job_resume_association, "ix_job_resume_processed_resume_id"
+    )
+
+    # link the processed jobs and resumes stored before the table was filled
+    await conn.execute(
+        text(
+            "INSERT INTO job_resume (processed_job_id, processed_resume_id)"
+            " SELECT pj.job_id, pr.resume_id FROM processed_jobs pj"
+            " JOIN jobs j ON j.job_id = pj.job_id"
+            " JOIN processed_resumes pr ON pr.resume_id = j.resume_id"
+            " WHERE NOT EXISTS (SELECT 1 FROM job_resume jr"
+            "   WHERE jr.processed_job_id = pj.job_id AND jr.processed_resume_id = pr.resume_id)"
+        )
+    )
+
+
+async def _improvement_results(conn: AsyncConnection) -> None:
+    await conn.run_sync(ImprovementResult.__table__.create, checkfirst=True)
+
+
+async def _task_leases(conn: AsyncConnection) -> None:
+    tasks = Task.__table__.c
+    for column in (tasks.claimed_by, tasks.lease_expires_at):
+        await add_column(conn, column)
+
+
+async def _job_resume_cascade(conn: AsyncConnection) -> None:
+    foreign_keys = await conn.run_sync(
+        lambda sync_conn: inspect(sync_conn).get_foreign_keys(job_resume_association.name)
+    )
+    if foreign_keys and all(
+        (fk.get("options") or {}).get("ondelete", "").upper() == "CASCADE"
+        for fk in foreign_keys
+    ):
+        return
+
+    # links whose job or resume is gone would violate the rebuilt constraints
+    await conn.execute(
+        text(
+            "DELETE FROM job_resume WHERE NOT EXISTS"
+            " (SELECT 1 FROM processed_jobs pj WHERE pj.job_id = job_resume.processed_job_id)"
+            " OR NOT EXISTS"
+            " (SELECT 1 FROM processed_resumes pr WHERE pr.resume_id = job_resume.processed_resume_id)"
+        )
+    )
+
+    if conn.dialect.name == "postgresql":
+        for fk in foreign_keys:
+            await conn.execute(text(f'ALTER TABLE job_resume DROP CONSTRAINT "{fk["name"]}"'))
+        await conn.execute(
+            text(
+                "ALTER TABLE job_resume"
+                " ADD FOREIGN KEY (processed_job_id) REFERENCES processed_jobs (job_id) ON DELETE CASCADE,"
+                " ADD FOREIGN KEY (processed_resume_id) REFERENCES processed_resumes (resume_id) ON DELETE CASCADE"
+            )
+        )
+        return
+
+    # SQLite cannot alter constraints: rebuild the table from the model and copy the rows
+    await conn.execute(text("DROP INDEX IF EXISTS ix_job_resume_processed_resume_id"))
+    await conn.execute(text("ALTER TABLE job_resume RENAME TO job_resume_old"))
+    await conn.run_sync(job_resume_association.create)
+    await conn.execute(
+        text(
+            "INSERT INTO job_resume (processed_job_id, processed_resume_id)"
+            " SELECT processed_job_id, processed_resume_id FROM job_resume_old"
+        )
+    )
+    await conn.execute(text("DROP TABLE job_resume_old"))
+
+
+async def _resume_search_rowids(conn: AsyncConnection) -> None:
+    # resume_fts entries were keyed by the unindexed resume_id column; rebuild
+    # them keyed by rowid = resumes.id
+    if conn.dialect.name == "sqlite":
+        await conn.execute(text("DROP TABLE IF EXISTS resume_fts"))
+    await resume_search.ensure_schema(conn)
+
+
+# (version, description, upgrade) in the order they are applied. Never edit
+# or renumber a released entry; append a new one instead.
+MIGRATIONS: List[Migration] = [
+    (1, "create tables", _create_tables),
+    (2, "resume filename, file/content hashes and keyset index", _resume_hashes),
+    (3, "stored resume and job-keyword embeddings", _stored_embeddings),
+    (4, "convert double-encoded JSON columns to native JSON", _native_json),
+    (5, "full-text resume search index", _resume_search),
+    (6, "job lookup indexes and job_resume backfill", _lookup_indexes),
+    (7, "stored score-improvement results", _improvement_results),
+    (8, "task owner and lease", _task_leases),
+    (9, "cascade job_resume foreign keys on delete", _job_resume_cascade),
+    (10, "key full-text resume entries by resume rowid", _resume_search_rowids),
+]
+
+HEAD_VERSION = MIGRATIONS[-1][0]
@@ -2,6 +2,8 @@ from .base import Base
 from .resume import ProcessedResume, Resume
 from .user import User
 from .job import ProcessedJob, Job
+from .task import Task
+from .improvement import ImprovementResult
 from .association import job_resume_association
 
 __all__ = [
@@ -11,5 +13,7 @@ __all__ = [
     "ProcessedJob",
     "User",
     "Job",
+    "Task",
+    "ImprovementResult",
     "job_resume_association",
 ]
@@ -1,5 +1,5 @@
 from .base import Base
-from sqlalchemy import Column, String, Table, ForeignKey
+from sqlalchemy import Column, String, Table, ForeignKey, Index
 
 
 job_resume_association = Table(
@@ -8,13 +8,15 @@ job_resume_association = Table(
     Column(
         "processed_job_id",
         String,
-        ForeignKey("processed_jobs.job_id"),
+        ForeignKey("processed_jobs.job_id", ondelete="CASCADE"),
         primary_key=True,
     ),
     Column(
         "processed_resume_id",
         String,
-        ForeignKey("processed_resumes.resume_id"),
+        ForeignKey("processed_resumes.resume_id", ondelete="CASCADE"),
         primary_key=True,
     ),
+    # the primary key serves job -> resumes, this one resume -> jobs
+    Index("ix_job_resume_processed_resume_id", "processed_resume_id", "processed_job_id"),
 )
@@ -0,0 +1,41 @@
+from sqlalchemy.types import JSON
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, UniqueConstraint, text, func
+
+from .base import Base
+
+
+class ImprovementResult(Base):
+    """
+    Outcome of a score-improvement run, reused for repeat requests until it
+    goes stale or any input that shaped it changes.
+    """
+
+    __tablename__ = "improvement_results"
+    __table_args__ = (
+        UniqueConstraint(
+            "resume_id",
+            "job_id",
+            "llm_model",
+            "embedding_model",
+            "prompt_version",
+            name="uq_improvement_results_key",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(
+        String, ForeignKey("resumes.resume_id", ondelete="CASCADE"), nullable=False
+    )
+    job_id = Column(String, ForeignKey("jobs.job_id", ondelete="CASCADE"), nullable=False)
+    # provider:model tags of the generating and embedding models
+    llm_model = Column(String, nullable=False)
+    embedding_model = Column(String, nullable=False)
+    # digest of the prompts and schema used
+    prompt_version = Column(String(64), nullable=False)
+    result = Column(JSON, nullable=False)
+    computed_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -1,6 +1,6 @@
 from sqlalchemy.types import JSON
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, DateTime, text
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, DateTime, Index, LargeBinary, text
 
 from .base import Base
 from .association import job_resume_association
@@ -26,6 +26,11 @@ class ProcessedJob(Base):
     compensation_and_benfits = Column(JSON, nullable=True)
     application_info = Column(JSON, nullable=True)
     extracted_keywords = Column(JSON, nullable=True)
+    # comma-joined `extracted_keywords` and its float32 embedding, tagged with
+    # the model that produced it
+    keywords_text = Column(Text, nullable=True)
+    keywords_embedding = Column(LargeBinary, nullable=True)
+    embedding_model = Column(String, nullable=True)
     processed_at = Column(
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
@@ -48,6 +53,10 @@ class ProcessedJob(Base):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # a resume's jobs in submission order
+        Index("ix_jobs_resume_id_created_at", "resume_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(String, unique=True, nullable=False)
@@ -1,6 +1,6 @@
 from sqlalchemy.types import JSON
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, text
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, Index, LargeBinary, text
 
 from .base import Base
 from .association import job_resume_association
@@ -43,11 +43,21 @@ class ProcessedResume(Base):
 
 class Resume(Base):
     __tablename__ = "resumes"
+    __table_args__ = (
+        # keyset pagination of the resume list
+        Index("ix_resumes_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     resume_id = Column(String, unique=True, nullable=False)
     content = Column(Text, nullable=False)
     content_type = Column(String, nullable=False)
+    filename = Column(String, nullable=True)
+    file_hash = Column(String(64), nullable=True, index=True)
+    content_hash = Column(String(64), nullable=True, index=True)
+    # float32 embedding of `content`, tagged with the model that produced it
+    embedding = Column(LargeBinary, nullable=True)
+    embedding_model = Column(String, nullable=True)
     created_at = Column(
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
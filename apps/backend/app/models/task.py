@@ -0,0 +1,36 @@
+from sqlalchemy.types import JSON
+from sqlalchemy import Column, String, Text, Integer, LargeBinary, DateTime, text, func
+
+from .base import Base
+
+
+class Task(Base):
+    __tablename__ = "tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(String, unique=True, nullable=False)
+    kind = Column(String, nullable=False)
+    # pending -> running -> succeeded | failed
+    status = Column(String, nullable=False, index=True)
+    stage = Column(String, nullable=True)
+    payload = Column(JSON, nullable=True)
+    # raw input (e.g. uploaded file bytes), cleared once the task finishes
+    input_data = Column(LargeBinary, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    # worker holding a running task; it keeps extending the lease while the
+    # task runs, so a task whose lease has expired was orphaned by a dead worker
+    claimed_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+        index=True,
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,82 @@
+"""
+Re-embeds stored resumes and rebuilds the resume vector index.
+
+    python -m app.reindex              # embed resumes with a missing or stale embedding, then rebuild
+    python -m app.reindex --no-embed   # only rebuild the index from the stored embeddings
+
+Run it after changing the embedding model: the index only holds vectors of
+the current model, and resumes are otherwise re-embedded one at a time when
+they are next scored.
+"""
+
+import sys
+import asyncio
+import argparse
+
+from sqlalchemy import or_, select
+
+from .agent import EmbeddingManager
+from .core import async_engine, async_read_engine, setup_logging
+from .core.database import AsyncSessionLocal
+from .models import Resume
+from .services.embedding_store import ensure_embeddings
+from .services.resume_index import resume_index
+
+
+async def _embed_stale(embedding_manager: EmbeddingManager, model: str, batch_size: int) -> int:
+    embedded, last_id = 0, 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            resumes = (
+                await db.scalars(
+                    select(Resume)
+                    .where(
+                        Resume.id > last_id,
+                        or_(
+                            Resume.embedding.is_(None),
+                            Resume.embedding_model.is_distinct_from(model),
+                        ),
+                    )
+                    .order_by(Resume.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not resumes:
+                return embedded
+
+            last_id = resumes[-1].id
+            await ensure_embeddings(
+                embedding_manager,
+                [(resume, "embedding", resume.content) for resume in resumes],
+            )
+            await db.commit()
+            embedded += len(resumes)
+            print(f"embedded {embedded} resume(s)")
+
+
+async def _run(embed: bool, batch_size: int) -> int:
+    try:
+        embedding_manager = EmbeddingManager()
+        model = await embedding_manager.model_tag()
+        if embed:
+            await _embed_stale(embedding_manager, model, batch_size)
+        indexed = await resume_index.rebuild(model)
+        print(f"resume index holds {indexed} resume(s) embedded with {model}")
+        return 0
+    finally:
+        await async_engine.dispose()
+        await async_read_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.reindex", description=__doc__.splitlines()[1])
+    parser.add_argument("--no-embed", action="store_false", dest="embed", help="do not compute missing embeddings")
+    parser.add_argument("--batch-size", type=int, default=64, help="resumes embedded per request")
+    args = parser.parse_args()
+
+    setup_logging()
+    sys.exit(asyncio.run(_run(args.embed, args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
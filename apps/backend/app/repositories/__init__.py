@@ -0,0 +1,7 @@
+from .job import JobRepository
+from .resume import ResumeRepository
+
+__all__ = [
+    "JobRepository",
+    "ResumeRepository",
+]
@@ -0,0 +1,58 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Job, ProcessedJob
+
+JobRow = Tuple[Job, Optional[ProcessedJob]]
+
+
+class JobRepository:
+    """
+    Reads jobs together with their processed data.
+
+    Every method issues a single SELECT with an outer join, so a job whose
+    extraction failed comes back with `None` in place of its processed row.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _joined(self):
+        return select(Job, ProcessedJob).outerjoin(
+            ProcessedJob, ProcessedJob.job_id == Job.job_id
+        )
+
+    async def get_with_processed(
+        self, job_id: str
+    ) -> Tuple[Optional[Job], Optional[ProcessedJob]]:
+        """
+        Returns (job, processed_job); (None, None) when it does not exist.
+        """
+        result = await self.db.execute(self._joined().where(Job.job_id == job_id))
+        row = result.first()
+        if row is None:
+            return None, None
+        return row[0], row[1]
+
+    async def get_many_with_processed(self, job_ids: Iterable[str]) -> Dict[str, JobRow]:
+        """
+        Returns {job_id: (job, processed_job)} for the ids that exist.
+        """
+        job_ids = list(dict.fromkeys(job_ids))
+        if not job_ids:
+            return {}
+        result = await self.db.execute(self._joined().where(Job.job_id.in_(job_ids)))
+        return {job.job_id: (job, processed) for job, processed in result.all()}
+
+    async def list_for_resume(self, resume_id: str) -> List[JobRow]:
+        """
+        Every job submitted against the resume, oldest first.
+        """
+        result = await self.db.execute(
+            self._joined()
+            .where(Job.resume_id == resume_id)
+            .order_by(Job.created_at, Job.id)
+        )
+        return [(job, processed) for job, processed in result.all()]
@@ -0,0 +1,67 @@
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Resume, ProcessedResume
+
+ResumeRow = Tuple[Resume, Optional[ProcessedResume]]
+
+
+class ResumeRepository:
+    """
+    Reads resumes together with their processed data.
+
+    Every method issues a single SELECT with an outer join, so a resume that
+    was never (or not yet) processed comes back with `None` in its place.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _joined(self):
+        return select(Resume, ProcessedResume).outerjoin(
+            ProcessedResume, ProcessedResume.resume_id == Resume.resume_id
+        )
+
+    async def get_with_processed(
+        self, resume_id: str
+    ) -> Tuple[Optional[Resume], Optional[ProcessedResume]]:
+        """
+        Returns (resume, processed_resume); (None, None) when it does not exist.
+        """
+        result = await self.db.execute(
+            self._joined().where(Resume.resume_id == resume_id)
+        )
+        row = result.first()
+        if row is None:
+            return None, None
+        return row[0], row[1]
+
+    async def get_many_with_processed(
+        self, resume_ids: Iterable[str]
+    ) -> Dict[str, ResumeRow]:
+        """
+        Returns {resume_id: (resume, processed_resume)} for the ids that exist.
+        """
+        resume_ids = list(dict.fromkeys(resume_ids))
+        if not resume_ids:
+            return {}
+        result = await self.db.execute(
+            self._joined().where(Resume.resume_id.in_(resume_ids))
+        )
+        return {resume.resume_id: (resume, processed) for resume, processed in result.all()}
+
+    async def exists(self, resume_id: str) -> bool:
+        return (
+            await self.db.scalar(select(Resume.id).where(Resume.resume_id == resume_id))
+        ) is not None
+
+    async def is_processed(self, resume_id: str) -> bool:
+        return (
+            await self.db.scalar(
+                select(ProcessedResume.resume_id).where(
+                    ProcessedResume.resume_id == resume_id
+                )
+            )
+        ) is not None
@@ -0,0 +1,11 @@
+from uuid import UUID
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class ResumeScoreRequest(BaseModel):
+    resume_id: UUID = Field(..., description="DB UUID reference to the resume")
+    job_ids: List[UUID] = Field(
+        default_factory=list,
+        description="DB UUID references to the jobs to score; empty scores every job linked to the resume",
+    )
@@ -1,19 +1,40 @@
 from .job_service import JobService
 from .resume_service import ResumeService
 from .score_improvement_service import ScoreImprovementService
+from .task_queue import task_queue, TERMINAL_STATUSES
+from .document_converter import document_converter
+from .bulk_upload import BulkResumeUpload
+from .resume_search import resume_search
 from .exceptions import (
     ResumeNotFoundError,
     ResumeParsingError,
     JobNotFoundError,
     JobParsingError,
+    TaskNotFoundError,
+    DocumentConversionError,
+    DocumentTooLargeError,
+    DocumentConversionTimeoutError,
+    ConverterBusyError,
+    ConverterUnavailableError,
 )
 
 __all__ = [
     "JobService",
+    "BulkResumeUpload",
     "ResumeService",
     "JobParsingError",
     "JobNotFoundError",
     "ResumeParsingError",
     "ResumeNotFoundError",
     "ScoreImprovementService",
+    "TaskNotFoundError",
+    "DocumentConversionError",
+    "DocumentTooLargeError",
+    "DocumentConversionTimeoutError",
+    "ConverterBusyError",
+    "ConverterUnavailableError",
+    "TERMINAL_STATUSES",
+    "task_queue",
+    "resume_search",
+    "document_converter",
 ]
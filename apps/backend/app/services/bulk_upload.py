@@ -0,0 +1,389 @@
+import os
+import asyncio
+import logging
+import zipfile
+import tempfile
+import traceback
+
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from .exceptions import DocumentConversionError
+from .resume_service import ResumeService
+
+logger = logging.getLogger(__name__)
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+ZIP_TYPES = ("application/zip", "application/x-zip-compressed")
+_TYPES_BY_EXTENSION = {".pdf": PDF, ".docx": DOCX}
+
+
+def _resume_type(filename: str, declared: Optional[str] = None) -> Optional[str]:
+    """
+    MIME type of a resume file, trusting the declared type when it is one we
+    accept and falling back to the extension (clients often send
+    application/octet-stream).
+    """
+    if declared in (PDF, DOCX):
+        return declared
+    return _TYPES_BY_EXTENSION.get(os.path.splitext(filename)[1].lower())
+
+
+@dataclass
+class _Part:
+    headers: Dict[str, bytes] = field(default_factory=dict)
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    data: bytearray = field(default_factory=bytearray)
+    spool: Optional[Any] = None
+    size: int = 0
+
+    @property
+    def is_zip(self) -> bool:
+        return self.content_type in ZIP_TYPES or (
+            self.filename or ""
+        ).lower().endswith(".zip")
+
+
+@dataclass
+class _Upload:
+    index: int
+    filename: str
+    file_type: str
+    file_bytes: bytes
+    file_hash: str
+
+
+class BulkResumeUpload:
+    """
+    Ingests a multipart request carrying many resume files and/or ZIP archives.
+
+    The request body is parsed while it streams in, so only the part currently
+    being received is held in memory (ZIP archives are spooled to disk, up to
+    `max_archive_bytes` compressed and uncompressed). Each finished file is
+    handed to a fixed pool of `workers` which convert, extract and index it
+    with their own database session. The hand-off and result queues are
+    bounded, so reading the body slows down when processing or the client
+    reading the results falls behind.
+
+    With `dedupe`, identical files within the request are processed once:
+    later copies wait for the first and are reported as its duplicates.
+
+    `run()` reads the body in the background and yields per-file outcomes in
+    completion order while the upload is still in progress.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        dedupe: bool = True,
+        max_file_bytes: int = settings.DOCUMENT_MAX_BYTES,
+        max_archive_bytes: int = settings.BULK_UPLOAD_MAX_ARCHIVE_BYTES,
+    ) -> None:
+        self._dedupe = dedupe
+        self._max_file_bytes = max_file_bytes
+        self._max_archive_bytes = max_archive_bytes
+        self._uploads: asyncio.Queue[Optional[_Upload]] = asyncio.Queue(maxsize=workers * 2)
+        self._results: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=workers * 2)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(workers)]
+        self._ingest: Optional[asyncio.Task] = None
+        self._count = 0
+        # by file hash: (index, filename) of the copies of a file being
+        # processed, and the outcome of each file already processed
+        self._copies: Dict[str, List[Tuple[int, str]]] = {}
+        self._outcomes: Dict[str, Dict[str, Any]] = {}
+
+    def _next_index(self) -> int:
+        self._count += 1
+        return self._count - 1
+
+    @staticmethod
+    def parse_boundary(content_type: str) -> bytes:
+        """
+        The multipart boundary of a request's Content-Type header.
+
+        Raises:
+            ValueError: If the request is not multipart/form-data
+        """
+        mime, options = parse_options_header(content_type)
+        boundary = options.get(b"boundary")
+        if mime != b"multipart/form-data" or not boundary:
+            raise ValueError("Expected a multipart/form-data request body")
+        return boundary
+
+    async def ingest(self, body: AsyncIterator[bytes], content_type: str) -> None:
+        """
+        Parses the multipart `body` and queues every resume it contains.
+
+        Raises:
+            ValueError: If the request is not multipart/form-data or is malformed
+        """
+        boundary = self.parse_boundary(content_type)
+
+        finished: List[_Part] = []
+        current: Optional[_Part] = None
+        header_field = bytearray()
+        header_value = bytearray()
+
+        def on_part_begin() -> None:
+            nonlocal current
+            current = _Part()
+
+        def on_header_field(data: bytes, start: int, end: int) -> None:
+            header_field.extend(data[start:end])
+
+        def on_header_value(data: bytes, start: int, end: int) -> None:
+            header_value.extend(data[start:end])
+
+        def on_header_end() -> None:
+            current.headers[bytes(header_field).lower().decode("latin-1")] = bytes(header_value)
+            header_field.clear()
+            header_value.clear()
+
+        def on_headers_finished() -> None:
+            _, disposition = parse_options_header(current.headers.get("content-disposition", b""))
+            if b"filename" in disposition:
+                current.filename = os.path.basename(
+                    disposition[b"filename"].decode("utf-8", errors="replace")
+                )
+            if "content-type" in current.headers:
+                current.content_type = parse_options_header(
+                    current.headers["content-type"]
+                )[0].decode("latin-1")
+            if current.filename and current.is_zip:
+                current.spool = tempfile.SpooledTemporaryFile(max_size=self._max_file_bytes)
+
+        def on_part_data(data: bytes, start: int, end: int) -> None:
+            if not current.filename:
+                return
+            current.size += end - start
+            if current.spool is not None:
+                if current.size <= self._max_archive_bytes:
+                    current.spool.write(data[start:end])
+            elif current.size <= self._max_file_bytes:
+                current.data.extend(data[start:end])
+            else:
+                # keep counting for the error message, stop buffering
+                current.data = bytearray()
+
+        def on_part_end() -> None:
+            if current.filename:
+                finished.append(current)
+
+        parser = MultipartParser(
+            boundary,
+            callbacks={
+                "on_part_begin": on_part_begin,
+                "on_header_field": on_header_field,
+                "on_header_value": on_header_value,
+                "on_header_end": on_header_end,
+                "on_headers_finished": on_headers_finished,
+                "on_part_data": on_part_data,
+                "on_part_end": on_part_end,
+            },
+        )
+
+        async for chunk in body:
+            parser.write(chunk)
+            while finished:
+                await self._queue_part(finished.pop(0))
+        parser.finalize()
+        while finished:
+            await self._queue_part(finished.pop(0))
+
+    async def _queue_part(self, part: _Part) -> None:
+        if part.spool is not None:
+            try:
+                await self._queue_archive(part)
+            finally:
+                part.spool.close()
+            return
+
+        await self._queue_file(part.filename, part.content_type, part.size, bytes(part.data))
+
+    async def _queue_file(
+        self, filename: str, declared_type: Optional[str], size: int, file_bytes: bytes
+    ) -> None:
+        index = self._next_index()
+        file_type = _resume_type(filename, declared_type)
+        if file_type is None:
+            await self._fail(index, filename, "Invalid file type. Only PDF and DOCX files are allowed.")
+        elif size > self._max_file_bytes:
+            await self._fail(
+                index, filename, f"Document of {size} bytes exceeds the limit of {self._max_file_bytes} bytes."
+            )
+        elif not file_bytes:
+            await self._fail(index, filename, "Empty file.")
+        else:
+            file_hash = ResumeService.hash_file(file_bytes)
+            if self._dedupe and file_hash in self._outcomes:
+                await self._results.put(
+                    self._copy_result(self._outcomes[file_hash], index, filename)
+                )
+            elif self._dedupe and file_hash in self._copies:
+                self._copies[file_hash].append((index, filename))
+            else:
+                self._copies[file_hash] = []
+                await self._uploads.put(
+                    _Upload(index, filename, file_type, file_bytes, file_hash)
+                )
+
+    async def _queue_archive(self, part: _Part) -> None:
+        if part.size > self._max_archive_bytes:
+            await self._fail(
+                self._next_index(),
+                part.filename,
+                f"Archive of {part.size} bytes exceeds the limit of {self._max_archive_bytes} bytes.",
+            )
+            return
+        try:
+            archive = zipfile.ZipFile(part.spool)
+        except zipfile.BadZipFile as e:
+            await self._fail(self._next_index(), part.filename, f"Invalid ZIP archive: {e}")
+            return
+
+        with archive:
+            # reads never go past an entry's declared size, so this bounds what
+            # the archive can expand to
+            unpacked = sum(
+                info.file_size
+                for info in archive.infolist()
+                if not info.is_dir()
+                and info.file_size <= self._max_file_bytes
+                and _resume_type(info.filename)
+            )
+            if unpacked > self._max_archive_bytes:
+                await self._fail(
+                    self._next_index(),
+                    part.filename,
+                    f"Archive expands to {unpacked} bytes, more than the limit of"
+                    f" {self._max_archive_bytes} bytes.",
+                )
+                return
+
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                if info.is_dir() or not name or name.startswith("."):
+                    continue
+                file_bytes = b""
+                if info.file_size <= self._max_file_bytes and _resume_type(name):
+                    file_bytes = await run_in_threadpool(archive.read, info)
+                await self._queue_file(
+                    f"{part.filename}/{info.filename}", None, info.file_size, file_bytes
+                )
+
+    async def _fail(self, index: int, filename: str, error: str) -> None:
+        await self._results.put(
+            {"index": index, "filename": filename, "status": "failed", "error": error}
+        )
+
+    @staticmethod
+    def _copy_result(result: Dict[str, Any], index: int, filename: str) -> Dict[str, Any]:
+        """
+        The outcome of a copy of an already processed file in the same request.
+        """
+        if result["status"] == "failed":
+            return {"index": index, "filename": filename, "status": "failed", "error": result["error"]}
+        return {
+            "index": index,
+            "filename": filename,
+            "status": "duplicate",
+            "resume_id": result["resume_id"],
+        }
+
+    async def _work(self) -> None:
+        while True:
+            upload = await self._uploads.get()
+            if upload is None:
+                return
+            result = await self._process(upload)
+            # record the outcome before yielding, so copies that arrive from
+            # now on use it instead of waiting on the list popped here
+            self._outcomes[upload.file_hash] = result
+            copies = self._copies.pop(upload.file_hash, [])
+            await self._results.put(result)
+            for index, filename in copies:
+                await self._results.put(self._copy_result(result, index, filename))
+
+    async def _process(self, upload: _Upload) -> Dict[str, Any]:
+        result = {"index": upload.index, "filename": upload.filename}
+        try:
+            async with AsyncSessionLocal() as db:
+                resume_id, duplicate = await ResumeService(db).convert_and_store_resume(
+                    file_bytes=upload.file_bytes,
+                    file_type=upload.file_type,
+                    filename=upload.filename,
+                    content_type="md",
+                    dedupe=self._dedupe,
+                    wait_for_converter=True,
+                )
+        except DocumentConversionError as e:
+            return {**result, "status": "failed", "error": str(e)}
+        except Exception as e:
+            logger.error(
+                f"Error processing file {upload.filename}: {e} - traceback: {traceback.format_exc()}"
+            )
+            return {**result, "status": "failed", "error": f"Error processing file: {e}"}
+
+        return {
+            **result,
+            "status": "duplicate" if duplicate else "success",
+            "resume_id": resume_id,
+        }
+
+    async def _read_body(self, body: AsyncIterator[bytes], content_type: str) -> Optional[str]:
+        """
+        Runs `ingest` and then lets the workers finish. Returns why the body
+        could not be read to the end, None if it was.
+        """
+        error = None
+        try:
+            await self.ingest(body, content_type)
+        except Exception as e:
+            logger.warning(f"Bulk upload body could not be read: {e}")
+            error = str(e)
+        for _ in self._workers:
+            await self._uploads.put(None)
+        return error
+
+    async def run(
+        self, body: AsyncIterator[bytes], content_type: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Reads `body` in the background and yields one result per file as it
+        completes, then a summary whose status is `completed`, or `aborted`
+        (with an `error`) if the body was malformed or cut off.
+        """
+        self._ingest = asyncio.create_task(self._read_body(body, content_type))
+        workers = asyncio.gather(*self._workers)
+
+        counts = {"success": 0, "duplicate": 0, "failed": 0}
+        try:
+            while not (workers.done() and self._results.empty()):
+                getter = asyncio.ensure_future(self._results.get())
+                await asyncio.wait({getter, workers}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                result = getter.result()
+                counts[result["status"]] += 1
+                yield result
+            error = await self._ingest
+        finally:
+            self.cancel()
+
+        summary = {"status": "completed", "total": self._count, **counts}
+        if error is not None:
+            summary.update(status="aborted", error=error)
+        yield summary
+
+    def cancel(self) -> None:
+        if self._ingest is not None:
+            self._ingest.cancel()
+        for worker in self._workers:
+            worker.cancel()
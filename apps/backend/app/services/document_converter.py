@@ -0,0 +1,243 @@
+import io
+import asyncio
+import logging
+
+from typing import Dict, Optional, Set
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from markitdown import MarkItDown, StreamInfo
+
+from app.core.config import settings
+from .exceptions import (
+    DocumentConversionError,
+    DocumentTooLargeError,
+    DocumentConversionTimeoutError,
+    ConverterBusyError,
+    ConverterUnavailableError,
+)
+
+logger = logging.getLogger(__name__)
+
+_EXTENSIONS = {
+    "application/pdf": ".pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": ".docx",
+}
+
+# one converter per worker process, built by the worker initializer
+_markitdown: Optional[MarkItDown] = None
+
+
+def _init_worker() -> None:
+    global _markitdown
+    _markitdown = MarkItDown(enable_plugins=False)
+
+
+def _warm_up() -> bool:
+    return _markitdown is not None
+
+
+def _convert_in_process(file_bytes: bytes, mimetype: str, filename: str) -> str:
+    if _markitdown is None:
+        _init_worker()
+
+    stream_info = StreamInfo(
+        mimetype=mimetype,
+        extension=_EXTENSIONS.get(mimetype),
+        filename=filename,
+    )
+    result = _markitdown.convert_stream(io.BytesIO(file_bytes), stream_info=stream_info)
+    return result.text_content
+
+
+class DocumentConverter:
+    """
+    Converts uploaded PDF/DOCX bytes to Markdown in a set of worker processes.
+
+    The bytes are handed to MarkItDown's stream API as an in-memory buffer, so
+    nothing is written to disk, and pdfminer's CPU-bound parsing never runs on
+    the event loop.
+
+    * Every worker is a single-process executor that builds its MarkItDown
+      instance once, when it starts, and runs one conversion at a time.
+    * At most `max_workers + max_queue` conversions are admitted at a time;
+      further requests fail fast with `ConverterBusyError` unless they ask to
+      wait for a slot.
+    * Documents larger than `max_bytes` are rejected before being queued.
+    * A conversion running longer than `timeout` seconds is abandoned and
+      the process running it is killed and replaced, since a stuck worker
+      cannot be interrupted. Conversions in other workers carry on.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 8,
+        max_bytes: int = 10 * 1024 * 1024,
+        timeout: float = 60.0,
+    ) -> None:
+        self._max_workers = max_workers
+        self._max_queue = max_queue
+        self._max_bytes = max_bytes
+        self._timeout = timeout
+        self._workers: Set[ProcessPoolExecutor] = set()
+        # idle workers; None stands for one to be spawned on first use
+        self._idle: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._closed = False
+        self._active = 0
+        self._stats = {"converted": 0, "rejected": 0, "timeouts": 0, "failed": 0}
+
+    def _idle_workers(self) -> asyncio.Queue:
+        if self._closed:
+            raise ConverterUnavailableError()
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for _ in range(self._max_workers):
+                self._idle.put_nowait(None)
+        return self._idle
+
+    def _spawn(self) -> ProcessPoolExecutor:
+        worker = ProcessPoolExecutor(max_workers=1, initializer=_init_worker)
+        self._workers.add(worker)
+        return worker
+
+    def _kill(self, worker: ProcessPoolExecutor) -> None:
+        """
+        Terminates a worker's process and discards the worker.
+
+        `shutdown()` alone would let a stuck process keep running (and holding
+        a CPU) until its conversion finishes, which may be never. Python 3.14
+        has `terminate_workers()` for this; before that the only handle on the
+        process is the executor's private `_processes` map. If neither exists
+        the worker is only shut down.
+        """
+        self._workers.discard(worker)
+        terminate_workers = getattr(worker, "terminate_workers", None)
+        if terminate_workers is not None:
+            terminate_workers()
+            return
+
+        processes = getattr(worker, "_processes", None)
+        if processes is None:
+            logger.warning("Cannot terminate converter worker process, shutting it down only")
+        for process in list((processes or {}).values()):
+            process.terminate()
+        worker.shutdown(wait=False, cancel_futures=True)
+
+    async def start(self) -> None:
+        """
+        Spawns every worker process up front so the first uploads do not pay
+        for process start-up and MarkItDown initialization.
+        """
+        self._closed = False
+        loop = asyncio.get_running_loop()
+        idle = self._idle_workers()
+        workers = [idle.get_nowait() or self._spawn() for _ in range(idle.qsize())]
+        try:
+            await asyncio.gather(
+                *(loop.run_in_executor(worker, _warm_up) for worker in workers)
+            )
+        finally:
+            for worker in workers:
+                idle.put_nowait(worker)
+        logger.info(f"Document converter ready with {self._max_workers} worker(s)")
+
+    def check_size(self, size: int) -> None:
+        """
+        Raises:
+            DocumentTooLargeError: If `size` exceeds the configured limit
+        """
+        if size > self._max_bytes:
+            raise DocumentTooLargeError(size=size, limit=self._max_bytes)
+
+    async def convert(
+        self,
+        file_bytes: bytes,
+        mimetype: str,
+        filename: str = "",
+        wait: bool = False,
+    ) -> str:
+        """
+        Returns the Markdown text of the document.
+
+        With `wait`, the call queues for a free slot instead of failing when
+        the converter is saturated; background tasks use this.
+
+        Raises:
+            DocumentTooLargeError: If the document exceeds the size limit
+            ConverterBusyError: If the queue is full and `wait` is False
+            ConverterUnavailableError: If the converter is shut down or its worker crashed
+            DocumentConversionTimeoutError: If conversion exceeds the timeout
+            DocumentConversionError: If MarkItDown fails on the document
+        """
+        self.check_size(len(file_bytes))
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_workers + self._max_queue)
+        if not wait and self._slots.locked():
+            self._stats["rejected"] += 1
+            raise ConverterBusyError()
+
+        async with self._slots:
+            self._active += 1
+            try:
+                return await self._submit(file_bytes, mimetype, filename or "")
+            finally:
+                self._active -= 1
+
+    async def _submit(self, file_bytes: bytes, mimetype: str, filename: str) -> str:
+        loop = asyncio.get_running_loop()
+        idle = self._idle_workers()
+        worker = await idle.get() or self._spawn()
+        try:
+            future = loop.run_in_executor(
+                worker, _convert_in_process, file_bytes, mimetype, filename
+            )
+            text_content = await asyncio.wait_for(future, timeout=self._timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            logger.warning(
+                f"Converting {filename or 'document'} exceeded {self._timeout}s, replacing its worker process"
+            )
+            self._kill(worker)
+            worker = None
+            raise DocumentConversionTimeoutError(timeout=self._timeout)
+        except (BrokenProcessPool, RuntimeError) as e:
+            # RuntimeError: submitted to a worker that was shut down meanwhile
+            self._stats["failed"] += 1
+            self._kill(worker)
+            worker = None
+            raise ConverterUnavailableError() from e
+        except Exception as e:
+            self._stats["failed"] += 1
+            raise DocumentConversionError(f"Could not convert {filename or 'document'}: {e}") from e
+        finally:
+            if not self._closed:
+                idle.put_nowait(worker)
+
+        self._stats["converted"] += 1
+        return text_content
+
+    def shutdown(self) -> None:
+        self._closed = True
+        self._idle = None
+        for worker in list(self._workers):
+            worker.shutdown(wait=False, cancel_futures=True)
+        self._workers.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters since process start, plus conversions currently admitted.
+        """
+        return {
+            **self._stats,
+            "active": self._active,
+            "capacity": self._max_workers + self._max_queue,
+        }
+
+
+document_converter = DocumentConverter(
+    max_workers=settings.DOCUMENT_CONVERTER_WORKERS,
+    max_queue=settings.DOCUMENT_CONVERTER_QUEUE_SIZE,
+    max_bytes=settings.DOCUMENT_MAX_BYTES,
+    timeout=settings.DOCUMENT_CONVERSION_TIMEOUT,
+)
@@ -0,0 +1,72 @@
+import numpy as np
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+from app.agent import EmbeddingManager
+from .json_fields import load_json_field
+
+
+def pack_vector(vector) -> bytes:
+    """
+    Serializes an embedding as a compact float32 blob.
+    """
+    return np.asarray(vector, dtype=np.float32).reshape(-1).tobytes()
+
+
+def unpack_vector(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    if blob is None:
+        return None
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+def join_keywords(extracted_keywords) -> str:
+    """
+    Turns a stored `extracted_keywords` column into the comma-separated
+    string that is embedded.
+    """
+    return ", ".join(load_json_field(extracted_keywords, "extracted_keywords") or [])
+
+
+def job_keywords(processed_job) -> str:
+    """
+    The job's keywords as embedded at ingest time, rebuilt from the extracted
+    keywords for jobs stored before `keywords_text` existed.
+    """
+    if processed_job is None:
+        return ""
+    return processed_job.keywords_text or join_keywords(processed_job.extracted_keywords)
+
+
+async def ensure_embeddings(
+    embedding_manager: EmbeddingManager,
+    rows: Sequence[Tuple[Any, str, str]],
+) -> List[np.ndarray]:
+    """
+    Returns the stored embedding of each (row, vector_attribute, text).
+
+    A row's vector is reused when it was computed by the embedding model that
+    is currently configured (its `embedding_model` tag). Missing or stale
+    vectors are computed in one batch and written back onto the rows; the
+    caller commits.
+    """
+    model = await embedding_manager.model_tag()
+    vectors: List[Optional[np.ndarray]] = []
+    missing: List[int] = []
+    for index, (row, attribute, _) in enumerate(rows):
+        blob = getattr(row, attribute)
+        if blob is not None and row.embedding_model == model:
+            vectors.append(unpack_vector(blob))
+        else:
+            vectors.append(None)
+            missing.append(index)
+
+    if missing:
+        embeddings = await embedding_manager.embed_many([rows[i][2] for i in missing])
+        for index, embedding in zip(missing, embeddings):
+            row, attribute, _ = rows[index]
+            vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+            setattr(row, attribute, vector.tobytes())
+            row.embedding_model = model
+            vectors[index] = vector
+
+    return vectors
@@ -65,3 +65,70 @@ class JobParsingError(Exception):
             message = "Parsed job not found."
         super().__init__(message)
         self.resume_id = job_id
+
+
+class TaskNotFoundError(Exception):
+    """
+    Exception raised when a background task is not found in the database.
+    """
+
+    def __init__(self, task_id: Optional[str] = None, message: Optional[str] = None):
+        if task_id and not message:
+            message = f"Task with ID {task_id} not found."
+        elif not message:
+            message = "Task not found."
+        super().__init__(message)
+        self.task_id = task_id
+
+
+class DocumentConversionError(Exception):
+    """
+    Exception raised when an uploaded document cannot be converted to text.
+    """
+
+    def __init__(self, message: Optional[str] = None):
+        super().__init__(message or "Document conversion failed.")
+
+
+class DocumentTooLargeError(DocumentConversionError):
+    """
+    Exception raised when an uploaded document exceeds the conversion size limit.
+    """
+
+    def __init__(self, size: Optional[int] = None, limit: Optional[int] = None, message: Optional[str] = None):
+        if size is not None and limit is not None and not message:
+            message = f"Document of {size} bytes exceeds the limit of {limit} bytes."
+        super().__init__(message or "Document too large.")
+        self.size = size
+        self.limit = limit
+
+
+class DocumentConversionTimeoutError(DocumentConversionError):
+    """
+    Exception raised when converting a document takes longer than allowed.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, message: Optional[str] = None):
+        if timeout is not None and not message:
+            message = f"Document conversion did not finish within {timeout:g} seconds."
+        super().__init__(message or "Document conversion timed out.")
+        self.timeout = timeout
+
+
+class ConverterBusyError(DocumentConversionError):
+    """
+    Exception raised when the conversion queue is full and the upload should be
+    retried later.
+    """
+
+    def __init__(self, message: Optional[str] = None):
+        super().__init__(message or "Too many documents are being converted, please retry shortly.")
+
+
+class ConverterUnavailableError(DocumentConversionError):
+    """
+    Exception raised when the converter is shut down or a conversion worker crashed.
+    """
+
+    def __init__(self, message: Optional[str] = None):
+        super().__init__(message or "Document conversion is temporarily unavailable.")
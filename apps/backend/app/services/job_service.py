@@ -1,30 +1,50 @@
 import uuid
 import json
+import asyncio
 import logging
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import ValidationError
-from sqlalchemy import select
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.agent import AgentManager
+from app.agent import AgentManager, EmbeddingManager
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 from app.prompt import prompt_factory
 from app.schemas.json import json_schema_factory
-from app.models import Job, Resume, ProcessedJob
+from app.models import Job, ProcessedJob, job_resume_association
+from app.repositories import JobRepository, ResumeRepository
 from app.schemas.pydantic import StructuredJobModel
-from .exceptions import JobNotFoundError
+from .exceptions import JobNotFoundError, JobParsingError
+from .resume_index import resume_index
+from .json_fields import load_json_field
+from .embedding_store import ensure_embeddings, job_keywords
 
 logger = logging.getLogger(__name__)
 
 
 class JobService:
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self, db: AsyncSession, max_concurrency: int = settings.JOB_EXTRACTION_CONCURRENCY
+    ):
         self.db = db
+        self.max_concurrency = max_concurrency
         self.json_agent_manager = AgentManager(model="gemma3:4b")
+        self.embedding_manager = EmbeddingManager()
 
-    async def create_and_store_job(self, job_data: dict) -> List[str]:
+    async def create_and_store_job(
+        self, job_data: dict
+    ) -> Tuple[List[str], List[Dict[str, Any]]]:
         """
-        Stores job data in the database and returns a list of job IDs.
+        Stores job data in the database and returns the list of job IDs along
+        with the per-item extraction failures.
+
+        Structured extraction runs concurrently for every description (at most
+        `max_concurrency` LLM calls at a time), then all Job and ProcessedJob
+        rows are written in a single transaction. A description whose
+        extraction fails is still stored as a raw job and reported in the
+        failures instead of aborting the batch.
         """
         resume_id = str(job_data.get("resume_id"))
 
@@ -32,46 +52,110 @@ class JobService:
             raise AssertionError(
                 f"resume corresponding to resume_id: {resume_id} not found"
             )
+        resume_processed = await ResumeRepository(self.db).is_processed(resume_id)
+        # end the read transaction so the connection is free while the LLM runs
+        await self.db.commit()
+
+        job_descriptions = job_data.get("job_descriptions", [])
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def extract(job_description: str) -> Dict[str, Any] | None:
+            async with semaphore:
+                return await self._extract_structured_json(job_description)
+
+        structured_jobs = await asyncio.gather(
+            *(extract(job_description) for job_description in job_descriptions),
+            return_exceptions=True,
+        )
 
         job_ids = []
-        for job_description in job_data.get("job_descriptions", []):
+        failures = []
+        processed_jobs = []
+        for index, (job_description, structured_job) in enumerate(
+            zip(job_descriptions, structured_jobs)
+        ):
             job_id = str(uuid.uuid4())
-            job = Job(
-                job_id=job_id,
-                resume_id=str(resume_id),
-                content=job_description,
+            self.db.add(
+                Job(
+                    job_id=job_id,
+                    resume_id=str(resume_id),
+                    content=job_description,
+                )
             )
-            self.db.add(job)
 
-            await self._extract_and_store_structured_job(
-                job_id=job_id, job_description_text=job_description
-            )
+            # BaseException: a cancelled extraction comes back as CancelledError
+            if isinstance(structured_job, BaseException):
+                logger.error(f"Structured job extraction for job {job_id} failed: {structured_job}")
+                failures.append(
+                    {"index": index, "job_id": job_id, "error": str(structured_job) or type(structured_job).__name__}
+                )
+            elif not structured_job:
+                logger.info("Structured job extraction failed.")
+                failures.append(
+                    {"index": index, "job_id": job_id, "error": "structured extraction returned invalid data"}
+                )
+            else:
+                processed_job = self._build_processed_job(job_id, structured_job)
+                self.db.add(processed_job)
+                processed_jobs.append(processed_job)
+
             logger.info(f"Job ID: {job_id}")
             job_ids.append(job_id)
 
+        if processed_jobs and resume_processed:
+            await self.db.flush()
+            await self.db.execute(
+                insert(job_resume_association),
+                [
+                    {"processed_job_id": processed_job.job_id, "processed_resume_id": resume_id}
+                    for processed_job in processed_jobs
+                ],
+            )
+
         await self.db.commit()
-        return job_ids
+
+        await self._embed_keywords(processed_jobs)
+        return job_ids, failures
+
+    async def _embed_keywords(self, processed_jobs: List[ProcessedJob]) -> None:
+        """
+        Stores the keyword embedding of every new job, computed in one batch,
+        so scoring does not have to. Failures are logged and never fail the
+        upload; scoring then computes the embedding on first use.
+
+        Called after the jobs are committed: the embedding request runs with
+        no transaction open and the vectors are written in a short one of
+        their own, so the writer connection is never held across it.
+        """
+        rows = [
+            (processed_job, "keywords_embedding", processed_job.keywords_text)
+            for processed_job in processed_jobs
+            if processed_job.keywords_text
+        ]
+        if not rows:
+            return
+        try:
+            await ensure_embeddings(self.embedding_manager, rows)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Embedding job keywords failed: {e}")
 
     async def _is_resume_available(self, resume_id: str) -> bool:
         """
         Checks if a resume exists in the database.
         """
-        query = select(Resume).where(Resume.resume_id == resume_id)
-        result = await self.db.scalar(query)
-        return result is not None
+        return await ResumeRepository(self.db).exists(resume_id)
 
-    async def _extract_and_store_structured_job(
-        self, job_id, job_description_text: str
-    ):
+    def _build_processed_job(
+        self, job_id: str, structured_job: Dict[str, Any]
+    ) -> ProcessedJob:
         """
-        extract and store structured job data in the database
+        build the processed job row from structured job data
         """
-        structured_job = await self._extract_structured_json(job_description_text)
-        if not structured_job:
-            logger.info("Structured job extraction failed.")
-            return None
-
-        processed_job = ProcessedJob(
+        # company_profile and location are text columns holding JSON; the JSON
+        # columns take native values and empty sections are stored as NULL
+        return ProcessedJob(
             job_id=job_id,
             job_title=structured_job.get("job_title"),
             company_profile=json.dumps(structured_job.get("company_profile"))
@@ -83,35 +167,14 @@ class JobService:
             date_posted=structured_job.get("date_posted"),
             employment_type=structured_job.get("employment_type"),
             job_summary=structured_job.get("job_summary"),
-            key_responsibilities=json.dumps(
-                {"key_responsibilities": structured_job.get("key_responsibilities", [])}
-            )
-            if structured_job.get("key_responsibilities")
-            else None,
-            qualifications=json.dumps(structured_job.get("qualifications", []))
-            if structured_job.get("qualifications")
-            else None,
-            compensation_and_benfits=json.dumps(
-                structured_job.get("compensation_and_benfits", [])
-            )
-            if structured_job.get("compensation_and_benfits")
-            else None,
-            application_info=json.dumps(structured_job.get("application_info", []))
-            if structured_job.get("application_info")
-            else None,
-            extracted_keywords=json.dumps(
-                {"extracted_keywords": structured_job.get("extracted_keywords", [])}
-            )
-            if structured_job.get("extracted_keywords")
-            else None,
+            key_responsibilities=structured_job.get("key_responsibilities") or None,
+            qualifications=structured_job.get("qualifications") or None,
+            compensation_and_benfits=structured_job.get("compensation_and_benfits") or None,
+            application_info=structured_job.get("application_info") or None,
+            extracted_keywords=structured_job.get("extracted_keywords") or None,
+            keywords_text=", ".join(structured_job.get("extracted_keywords") or []) or None,
         )
 
-        self.db.add(processed_job)
-        await self.db.flush()
-        await self.db.commit()
-
-        return job_id
-
     async def _extract_structured_json(
         self, job_description_text: str
     ) -> Dict[str, Any] | None:
@@ -125,7 +188,7 @@ class JobService:
             job_description_text,
         )
         logger.info(f"Structured Job Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        raw_output = await self.json_agent_manager.run(prompt=prompt, cache=True)
 
         try:
             structured_job: StructuredJobModel = StructuredJobModel.model_validate(
@@ -150,17 +213,11 @@ class JobService:
         Raises:
             JobNotFoundError: If the job is not found
         """
-        job_query = select(Job).where(Job.job_id == job_id)
-        job_result = await self.db.execute(job_query)
-        job = job_result.scalars().first()
+        job, processed_job = await JobRepository(self.db).get_with_processed(job_id)
 
         if not job:
             raise JobNotFoundError(job_id=job_id)
 
-        processed_query = select(ProcessedJob).where(ProcessedJob.job_id == job_id)
-        processed_result = await self.db.execute(processed_query)
-        processed_job = processed_result.scalars().first()
-
         combined_data = {
             "job_id": job.job_id,
             "raw_job": {
@@ -180,12 +237,68 @@ class JobService:
                 "date_posted": processed_job.date_posted,
                 "employment_type": processed_job.employment_type,
                 "job_summary": processed_job.job_summary,
-                "key_responsibilities": json.loads(processed_job.key_responsibilities).get("key_responsibilities", []) if processed_job.key_responsibilities else None,
-                "qualifications": json.loads(processed_job.qualifications).get("qualifications", []) if processed_job.qualifications else None,
-                "compensation_and_benfits": json.loads(processed_job.compensation_and_benfits).get("compensation_and_benfits", []) if processed_job.compensation_and_benfits else None,
-                "application_info": json.loads(processed_job.application_info).get("application_info", []) if processed_job.application_info else None,
-                "extracted_keywords": json.loads(processed_job.extracted_keywords).get("extracted_keywords", []) if processed_job.extracted_keywords else None,
+                "key_responsibilities": load_json_field(processed_job.key_responsibilities, "key_responsibilities"),
+                "qualifications": load_json_field(processed_job.qualifications, "qualifications"),
+                "compensation_and_benfits": load_json_field(processed_job.compensation_and_benfits, "compensation_and_benfits"),
+                "application_info": load_json_field(processed_job.application_info, "application_info"),
+                "extracted_keywords": load_json_field(processed_job.extracted_keywords, "extracted_keywords"),
                 "processed_at": processed_job.processed_at.isoformat() if processed_job.processed_at else None,
             }
 
         return combined_data
+
+    async def match_resumes(self, job_id: str, top_k: int = 10) -> List[Dict]:
+        """
+        Finds the stored resumes that best fit a job.
+
+        The job's keyword embedding stored at ingest time (computed now if it
+        is missing or stale) is looked up in the resume vector index.
+
+        Raises:
+            JobNotFoundError: If the job is not found
+            JobParsingError: If the job has no extracted keywords to match on
+        """
+        job, processed_job = await JobRepository(self.db).get_with_processed(job_id)
+
+        if not job:
+            raise JobNotFoundError(job_id=job_id)
+        if not processed_job:
+            raise JobParsingError(job_id=job_id)
+
+        keywords = job_keywords(processed_job)
+        if not keywords:
+            raise JobParsingError(
+                message=f"Job with ID {job_id} has no extracted keywords to match on."
+            )
+
+        # End the read transaction before the embedding request
+        await self.db.commit()
+        [embedding] = await ensure_embeddings(
+            self.embedding_manager, [(processed_job, "keywords_embedding", keywords)]
+        )
+        if self.db.is_modified(processed_job):
+            await self._save_keywords_embedding(processed_job)
+        model = await self.embedding_manager.model_tag()
+        matches = await resume_index.search(embedding, top_k=top_k, model=model)
+
+        return [
+            {"resume_id": resume_id, "score": score, "rank": rank}
+            for rank, (resume_id, score) in enumerate(matches, start=1)
+        ]
+
+    async def _save_keywords_embedding(self, processed_job: ProcessedJob) -> None:
+        """
+        Persists a keyword embedding computed at match time in a short write
+        transaction of its own, so matching can run on a read-only session.
+        """
+        self.db.expunge(processed_job)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(ProcessedJob)
+                .where(ProcessedJob.job_id == processed_job.job_id)
+                .values(
+                    keywords_embedding=processed_job.keywords_embedding,
+                    embedding_model=processed_job.embedding_model,
+                )
+            )
+            await db.commit()
@@ -0,0 +1,79 @@
+import json
+import logging
+
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import Text, cast, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.models import ProcessedResume, ProcessedJob
+
+logger = logging.getLogger(__name__)
+
+# JSON columns that older releases filled with json.dumps() output, sometimes
+# wrapped as {"<column>": value}
+LEGACY_JSON_COLUMNS: Dict[Any, Tuple[str, ...]] = {
+    ProcessedResume: (
+        "personal_data",
+        "experiences",
+        "projects",
+        "skills",
+        "research_work",
+        "achievements",
+        "education",
+        "extracted_keywords",
+    ),
+    ProcessedJob: (
+        "key_responsibilities",
+        "qualifications",
+        "compensation_and_benfits",
+        "application_info",
+        "extracted_keywords",
+    ),
+}
+
+
+def load_json_field(value: Any, key: Optional[str] = None) -> Any:
+    """
+    Returns the value of a JSON column as stored natively.
+
+    Rows written by older releases hold a JSON-encoded string, possibly
+    wrapping the value as {key: value}; both are unwrapped here so readers see
+    the same shape whichever way the row was written.
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return value
+    if key and isinstance(value, dict) and set(value) == {key}:
+        return value[key]
+    return value
+
+
+async def migrate_legacy_json(conn: AsyncConnection) -> int:
+    """
+    Rewrites legacy double-encoded JSON values in place as native JSON.
+    Idempotent; returns the number of rows changed.
+    """
+    changed = 0
+    for model, columns in LEGACY_JSON_COLUMNS.items():
+        primary_key = model.__mapper__.primary_key[0]
+        # a double-encoded value is a JSON string, i.e. its text starts with a quote
+        legacy = or_(*(cast(getattr(model, column), Text).like('"%') for column in columns))
+        result = await conn.execute(
+            select(primary_key, *(getattr(model, column) for column in columns)).where(legacy)
+        )
+        for row in result.all():
+            values = {
+                column: load_json_field(value, column)
+                for column, value in zip(columns, row[1:])
+                if isinstance(value, str)
+            }
+            await conn.execute(
+                update(model).where(primary_key == row[0]).values(**values)
+            )
+            changed += 1
+
+    if changed:
+        logger.info(f"Converted {changed} row(s) from double-encoded to native JSON")
+    return changed
@@ -0,0 +1,29 @@
+import json
+import base64
+
+from typing import Any, List
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Opaque keyset-pagination cursor holding the sort key of the last row.
+    """
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Inverse of `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed or does not hold `size` values
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,527 @@
+import os
+import json
+import logging
+import threading
+import numpy as np
+
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.core.database import async_engine, async_read_engine
+from app.models import Resume
+
+logger = logging.getLogger(__name__)
+
+# pgvector's default and upper bound for hnsw.ef_search
+HNSW_DEFAULT_EF_SEARCH = 40
+HNSW_MAX_EF_SEARCH = 1000
+
+try:
+    import fcntl
+
+    def _lock_file(f, exclusive: bool) -> None:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _unlock_file(f) -> None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+except ImportError:  # Windows has no shared locks: readers lock exclusively too
+    import msvcrt
+
+    def _lock_file(f, exclusive: bool) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ResumeVectorIndex:
+    """
+    Persistent brute-force vector index over resume embeddings.
+
+    Stored in a directory as three files:
+
+    * `vectors.f32` - row-major float32 matrix of L2-normalized embeddings,
+      memory-mapped for search and appended to in place.
+    * `ids.txt`     - resume_id of each row, one per line.
+    * `meta.json`   - dimension and embedding-model tag of the matrix.
+    * `index.lock`  - lock file serializing access between processes.
+
+    Adding a resume appends one row; re-adding an existing resume overwrites
+    its row. When the embedding model changes the index is reset, since
+    vectors from different models are not comparable.
+
+    The first search for a model in a process adds the embeddings of that
+    model stored on the resumes (`Resume.embedding`) that the index is
+    missing, so resumes stored before the index existed or before it was
+    reset are found too. `rebuild` starts over from the stored embeddings.
+
+    Several processes (uvicorn workers, `python -m app.reindex`) can share
+    one directory: writes hold an exclusive lock on `index.lock`, searches a
+    shared one, and each reloads the ids and matrix size from disk under the
+    lock whenever another process has changed the files.
+    """
+
+    def __init__(self, path: str, engine: Optional[AsyncEngine] = None) -> None:
+        self._path = path
+        self._engine = engine
+        self._backfilled: Set[Optional[str]] = set()
+        self._lock = threading.Lock()
+        self._loaded: Optional[Tuple[int, ...]] = None
+        self._dim: Optional[int] = None
+        self._model: Optional[str] = None
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.memmap] = None
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self._path, "vectors.f32")
+
+    @property
+    def _ids_path(self) -> str:
+        return os.path.join(self._path, "ids.txt")
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self._path, "meta.json")
+
+    @property
+    def _lock_path(self) -> str:
+        return os.path.join(self._path, "index.lock")
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """
+        Holds the in-process lock and the cross-process file lock, with the
+        in-memory state reloaded from disk if another process changed it.
+        """
+        os.makedirs(self._path, exist_ok=True)
+        with self._lock, open(self._lock_path, "a+") as lock_file:
+            _lock_file(lock_file, exclusive)
+            try:
+                self._load()
+                yield
+                self._loaded = self._stamp()
+            finally:
+                _unlock_file(lock_file)
+
+    def _stamp(self) -> Tuple[int, ...]:
+        """
+        Identifies the on-disk state: `_reset` rewrites meta.json and every
+        append grows the files, while row overwrites are seen through the
+        shared memory map.
+        """
+        stamp: List[int] = []
+        for path in (self._meta_path, self._ids_path, self._vectors_path):
+            try:
+                stat = os.stat(path)
+                stamp += [stat.st_ino, stat.st_mtime_ns, stat.st_size]
+            except FileNotFoundError:
+                stamp += [-1, -1, -1]
+        return tuple(stamp)
+
+    def _load(self) -> None:
+        stamp = self._stamp()
+        if self._loaded == stamp:
+            return
+        self._loaded = stamp
+        self._matrix = None
+        self._dim, self._model = None, None
+        self._ids, self._rows = [], {}
+
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        self._dim, self._model = meta["dim"], meta.get("model")
+
+        ids: List[str] = []
+        if os.path.exists(self._ids_path):
+            with open(self._ids_path) as f:
+                ids = [line.strip() for line in f if line.strip()]
+
+        # a crash between the two appends can leave one side longer
+        stored_rows = 0
+        if os.path.exists(self._vectors_path):
+            stored_rows = os.path.getsize(self._vectors_path) // (4 * self._dim)
+        self._ids = ids[:stored_rows]
+        self._rows = {resume_id: row for row, resume_id in enumerate(self._ids)}
+        self._remap()
+
+    def _remap(self) -> None:
+        if not self._ids:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(
+            self._vectors_path,
+            dtype=np.float32,
+            mode="r",
+            shape=(len(self._ids), self._dim),
+        )
+
+    def _reset(self, dim: int, model: Optional[str]) -> None:
+        os.makedirs(self._path, exist_ok=True)
+        self._matrix = None
+        for path in (self._vectors_path, self._ids_path):
+            if os.path.exists(path):
+                os.remove(path)
+        with open(self._meta_path, "w") as f:
+            json.dump({"dim": dim, "model": model}, f)
+        self._dim, self._model = dim, model
+        self._ids, self._rows = [], {}
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _clear(self) -> None:
+        self._matrix = None
+        for path in (self._vectors_path, self._ids_path, self._meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._dim, self._model = None, None
+        self._ids, self._rows = [], {}
+
+    def _add_many_sync(
+        self,
+        rows: Iterable[Tuple[str, object]],
+        model: Optional[str],
+        replace: bool = True,
+        reset: bool = False,
+    ) -> int:
+        """
+        Adds (resume_id, embedding) rows in one append. Existing rows are
+        overwritten when `replace` is set; `reset` empties the index first.
+        Returns the number of rows appended.
+        """
+        latest = {resume_id: self._normalize(embedding) for resume_id, embedding in rows}
+        with self._locked(exclusive=True):
+            if not latest:
+                if reset:
+                    self._clear()
+                return 0
+
+            dim = next(iter(latest.values())).shape[0]
+            if reset or self._dim != dim or self._model != model:
+                if self._ids and not reset:
+                    logger.info(
+                        f"embedding model changed ({self._model} -> {model}), resetting resume index"
+                    )
+                self._reset(dim, model)
+
+            latest = {resume_id: vector for resume_id, vector in latest.items() if vector.shape[0] == dim}
+            updates = {
+                self._rows[resume_id]: vector
+                for resume_id, vector in latest.items()
+                if resume_id in self._rows
+            }
+            fresh = [(resume_id, vector) for resume_id, vector in latest.items() if resume_id not in self._rows]
+
+            if updates and replace:
+                writable = np.memmap(
+                    self._vectors_path,
+                    dtype=np.float32,
+                    mode="r+",
+                    shape=(len(self._ids), self._dim),
+                )
+                for row, vector in updates.items():
+                    writable[row] = vector
+                writable.flush()
+
+            if fresh:
+                with open(self._vectors_path, "ab") as f:
+                    f.write(np.stack([vector for _, vector in fresh]).tobytes())
+                with open(self._ids_path, "a") as f:
+                    f.write("".join(f"{resume_id}\n" for resume_id, _ in fresh))
+                for resume_id, _ in fresh:
+                    self._rows[resume_id] = len(self._ids)
+                    self._ids.append(resume_id)
+                self._remap()
+            return len(fresh)
+
+    def _search_sync(
+        self, embedding, top_k: int, model: Optional[str]
+    ) -> List[Tuple[str, float]]:
+        query = self._normalize(embedding)
+        with self._locked(exclusive=False):
+            if self._matrix is None or self._model != model or self._dim != query.shape[0]:
+                return []
+            matrix, ids = self._matrix, list(self._ids)
+
+        scores = matrix @ query
+        k = min(top_k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[row], float(scores[row])) for row in top]
+
+    async def _stored_vectors(self, model: Optional[str]) -> List[Tuple[str, np.ndarray]]:
+        async with self._engine.connect() as conn:
+            result = await conn.execute(
+                select(Resume.resume_id, Resume.embedding).where(
+                    Resume.embedding.is_not(None), Resume.embedding_model == model
+                )
+            )
+            return [
+                (resume_id, np.frombuffer(blob, dtype=np.float32))
+                for resume_id, blob in result.all()
+            ]
+
+    async def add(self, resume_id: str, embedding, model: Optional[str] = None) -> None:
+        """
+        Insert or replace the embedding of `resume_id`.
+        """
+        await run_in_threadpool(self._add_many_sync, [(resume_id, embedding)], model)
+
+    async def backfill(self, model: Optional[str]) -> int:
+        """
+        Adds the stored resume embeddings of `model` the index is missing.
+        Returns how many were added.
+        """
+        added = await run_in_threadpool(
+            self._add_many_sync, await self._stored_vectors(model), model, False
+        )
+        self._backfilled.add(model)
+        if added:
+            logger.info(f"Added {added} stored resume embedding(s) to the resume index")
+        return added
+
+    async def rebuild(self, model: Optional[str]) -> int:
+        """
+        Replaces the index with the stored resume embeddings of `model`.
+        Returns the number of resumes indexed.
+        """
+        indexed = await run_in_threadpool(
+            self._add_many_sync, await self._stored_vectors(model), model, True, True
+        )
+        self._backfilled.add(model)
+        return indexed
+
+    async def search(
+        self, embedding, top_k: int = 10, model: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Return up to `top_k` (resume_id, cosine similarity) pairs, best first.
+
+        Returns nothing when the index was built with a different model.
+        """
+        if self._engine is not None and model not in self._backfilled:
+            await self.backfill(model)
+        return await run_in_threadpool(self._search_sync, embedding, top_k, model)
+
+    def __len__(self) -> int:
+        with self._locked(exclusive=False):
+            return len(self._ids)
+
+
+class PgVectorResumeIndex:
+    """
+    Resume vector index kept in Postgres with the pgvector extension, for
+    deployments where several app processes share one database.
+
+    Embeddings live in `resume_vectors (resume_id, model, embedding vector(n))`
+    with an HNSW index on cosine distance, so similarity search runs inside
+    the database and every worker sees the same index. The table is created on
+    first use (the first add or search in a process) with the dimension of
+    the first embedding and filled with the embeddings stored on the resumes;
+    when the embedding model or dimension changes it is rebuilt and refilled
+    the same way.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        self._schema: Optional[Tuple[int, Optional[str]]] = None
+        self._version: Optional[Tuple[int, ...]] = None
+
+    @staticmethod
+    def _literal(embedding) -> str:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        return "[" + ",".join(repr(float(value)) for value in vector) + "]"
+
+    @staticmethod
+    async def _stored_dim(conn: AsyncConnection) -> Optional[int]:
+        """
+        Dimension of the `resume_vectors.embedding` column, None if the table
+        does not exist yet.
+        """
+        return await conn.scalar(
+            text(
+                "SELECT atttypmod FROM pg_attribute"
+                " WHERE attrelid = to_regclass('resume_vectors') AND attname = 'embedding'"
+            )
+        )
+
+    async def _ensure_schema(
+        self, conn: AsyncConnection, dim: int, model: Optional[str]
+    ) -> None:
+        if self._schema == (dim, model):
+            return
+
+        # several workers may get here at once
+        await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('resume_vectors'))"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        stored_dim = await self._stored_dim(conn)
+        if stored_dim is not None and stored_dim != dim:
+            logger.info(
+                f"embedding dimension changed ({stored_dim} -> {dim}), rebuilding resume index"
+            )
+            await conn.execute(text("DROP TABLE resume_vectors"))
+            stored_dim = None
+
+        if stored_dim is None:
+            await conn.execute(
+                text(
+                    "CREATE TABLE resume_vectors ("
+                    " resume_id VARCHAR PRIMARY KEY"
+                    "   REFERENCES resumes (resume_id) ON DELETE CASCADE,"
+                    " model VARCHAR,"
+                    f" embedding VECTOR({int(dim)}) NOT NULL)"
+                )
+            )
+            await conn.execute(
+                text(
+                    "CREATE INDEX ix_resume_vectors_embedding ON resume_vectors"
+                    " USING hnsw (embedding vector_cosine_ops)"
+                )
+            )
+
+        stale = await conn.execute(
+            text("DELETE FROM resume_vectors WHERE model IS DISTINCT FROM :model"),
+            {"model": model},
+        )
+        if stale.rowcount:
+            logger.info(
+                f"embedding model changed, dropped {stale.rowcount} vector(s) from resume index"
+            )
+
+        stored = await conn.execute(
+            text(
+                "SELECT r.resume_id, r.embedding FROM resumes r"
+                " WHERE r.embedding IS NOT NULL AND r.embedding_model IS NOT DISTINCT FROM :model"
+                " AND NOT EXISTS (SELECT 1 FROM resume_vectors v WHERE v.resume_id = r.resume_id)"
+            ),
+            {"model": model},
+        )
+        backfill = [
+            {
+                "resume_id": resume_id,
+                "model": model,
+                "embedding": self._literal(np.frombuffer(blob, dtype=np.float32)),
+            }
+            for resume_id, blob in stored.all()
+            if len(blob) == 4 * dim
+        ]
+        if backfill:
+            await conn.execute(
+                text(
+                    "INSERT INTO resume_vectors (resume_id, model, embedding)"
+                    " VALUES (:resume_id, :model, CAST(CAST(:embedding AS TEXT) AS vector))"
+                    " ON CONFLICT (resume_id) DO NOTHING"
+                ),
+                backfill,
+            )
+        self._schema = (dim, model)
+
+    async def _tune_scan(self, conn: AsyncConnection, top_k: int) -> None:
+        """
+        Widens the HNSW candidate list for the rest of the transaction. An
+        index scan returns at most `hnsw.ef_search` rows (40 by default), and
+        the model filter is applied after it, so without this a search would
+        quietly return fewer than `top_k` resumes. From pgvector 0.8 the scan
+        also continues past the candidate list until enough rows pass the
+        filter.
+        """
+        if self._version is None:
+            version = await conn.scalar(
+                text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            )
+            self._version = tuple(int(part) for part in (version or "0").split(".")[:2])
+
+        ef_search = min(max(top_k, HNSW_DEFAULT_EF_SEARCH), HNSW_MAX_EF_SEARCH)
+        await conn.execute(
+            text("SELECT set_config('hnsw.ef_search', :value, true)"),
+            {"value": str(ef_search)},
+        )
+        if self._version >= (0, 8):
+            await conn.execute(
+                text("SELECT set_config('hnsw.iterative_scan', 'strict_order', true)")
+            )
+
+    async def add(self, resume_id: str, embedding, model: Optional[str] = None) -> None:
+        """
+        Insert or replace the embedding of `resume_id`.
+        """
+        literal = self._literal(embedding)
+        dim = literal.count(",") + 1
+        async with self._engine.begin() as conn:
+            await self._ensure_schema(conn, dim, model)
+            await conn.execute(
+                text(
+                    "INSERT INTO resume_vectors (resume_id, model, embedding)"
+                    " VALUES (:resume_id, :model, CAST(CAST(:embedding AS TEXT) AS vector))"
+                    " ON CONFLICT (resume_id) DO UPDATE"
+                    " SET model = EXCLUDED.model, embedding = EXCLUDED.embedding"
+                ),
+                {"resume_id": resume_id, "model": model, "embedding": literal},
+            )
+
+    async def rebuild(self, model: Optional[str]) -> int:
+        """
+        Replaces the index with the stored resume embeddings of `model`.
+        Returns the number of resumes indexed.
+        """
+        async with self._engine.begin() as conn:
+            blob = await conn.scalar(
+                select(Resume.embedding)
+                .where(Resume.embedding.is_not(None), Resume.embedding_model == model)
+                .limit(1)
+            )
+            self._schema = None
+            if await self._stored_dim(conn) is not None:
+                await conn.execute(text("DELETE FROM resume_vectors"))
+            if blob is None:
+                return 0
+            await self._ensure_schema(conn, len(blob) // 4, model)
+            return await conn.scalar(text("SELECT count(*) FROM resume_vectors"))
+
+    async def search(
+        self, embedding, top_k: int = 10, model: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Return up to `top_k` (resume_id, cosine similarity) pairs, best first,
+        from an approximate nearest-neighbour scan of the HNSW index.
+
+        Vectors of another embedding model are dropped and the index is filled
+        from the stored embeddings of `model` first.
+        """
+        literal = self._literal(embedding)
+        async with self._engine.begin() as conn:
+            await self._ensure_schema(conn, literal.count(",") + 1, model)
+            await self._tune_scan(conn, top_k)
+            result = await conn.execute(
+                text(
+                    "SELECT resume_id, 1 - (embedding <=> CAST(CAST(:embedding AS TEXT) AS vector)) AS score"
+                    " FROM resume_vectors WHERE model IS NOT DISTINCT FROM :model"
+                    " ORDER BY embedding <=> CAST(CAST(:embedding AS TEXT) AS vector)"
+                    " LIMIT :top_k"
+                ),
+                {"embedding": literal, "model": model, "top_k": top_k},
+            )
+            return [(resume_id, float(score)) for resume_id, score in result.all()]
+
+
+def _make_resume_index():
+    if async_engine.dialect.name == "postgresql":
+        return PgVectorResumeIndex(async_engine)
+    return ResumeVectorIndex(path=settings.RESUME_INDEX_PATH, engine=async_read_engine)
+
+
+resume_index = _make_resume_index()
@@ -0,0 +1,218 @@
+import re
+import logging
+
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# the FTS5 entry of a resume is keyed by its resumes.id
+_ROWID = "rowid = (SELECT id FROM resumes WHERE resume_id = :resume_id)"
+
+
+class ResumeSearchIndex:
+    """
+    Full-text index over resume filename, content and extracted keywords.
+
+    * SQLite: FTS5 virtual table `resume_fts`, ranked with `bm25()`. Each
+      entry's rowid is the resume's `resumes.id`, so replacing or dropping
+      one is a rowid lookup; `resume_id` is stored unindexed for results.
+    * Postgres: table `resume_search` holding a weighted `tsvector` with a GIN
+      index, ranked with `ts_rank_cd()`.
+
+    Both backends return a rank where lower is better, so results can be paged
+    with a (rank, resume_id) keyset. Every query term matches as a prefix and
+    all terms must be present.
+    """
+
+    @staticmethod
+    def _dialect(bind) -> str:
+        return bind.dialect.name
+
+    @staticmethod
+    def _terms(query: str) -> List[str]:
+        return _TOKEN.findall(query.lower())
+
+    async def ensure_schema(self, conn: AsyncConnection) -> None:
+        """
+        Creates the index if it is missing and backfills resumes stored
+        before it existed.
+        """
+        match self._dialect(conn):
+            case "sqlite":
+                await conn.execute(
+                    text(
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5("
+                        " resume_id UNINDEXED, filename, content, keywords,"
+                        " tokenize = 'unicode61 remove_diacritics 2')"
+                    )
+                )
+                await conn.execute(
+                    text(
+                        "INSERT INTO resume_fts (rowid, resume_id, filename, content, keywords)"
+                        " SELECT r.id, r.resume_id, COALESCE(r.filename, ''), r.content,"
+                        "        COALESCE(CAST(p.extracted_keywords AS TEXT), '')"
+                        " FROM resumes r"
+                        " LEFT JOIN processed_resumes p ON p.resume_id = r.resume_id"
+                        " WHERE r.id NOT IN (SELECT rowid FROM resume_fts)"
+                    )
+                )
+            case "postgresql":
+                await conn.execute(
+                    text(
+                        "CREATE TABLE IF NOT EXISTS resume_search ("
+                        " resume_id VARCHAR PRIMARY KEY"
+                        "   REFERENCES resumes (resume_id) ON DELETE CASCADE,"
+                        " document TSVECTOR NOT NULL)"
+                    )
+                )
+                await conn.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS ix_resume_search_document"
+                        " ON resume_search USING GIN (document)"
+                    )
+                )
+                await conn.execute(
+                    text(
+                        "INSERT INTO resume_search (resume_id, document)"
+                        " SELECT r.resume_id,"
+                        "   setweight(to_tsvector('simple', COALESCE(r.filename, '')), 'A')"
+                        "   || setweight(to_tsvector('simple', COALESCE(CAST(p.extracted_keywords AS TEXT), '')), 'A')"
+                        "   || setweight(to_tsvector('simple', r.content), 'B')"
+                        " FROM resumes r"
+                        " LEFT JOIN processed_resumes p ON p.resume_id = r.resume_id"
+                        " ON CONFLICT (resume_id) DO NOTHING"
+                    )
+                )
+            case dialect:
+                logger.warning(f"Full-text resume search is not supported on {dialect}")
+
+    async def index(
+        self,
+        db: AsyncSession,
+        resume_id: str,
+        content: str,
+        filename: Optional[str] = None,
+        keywords: Iterable[str] = (),
+    ) -> None:
+        """
+        Inserts or replaces the entry of one stored resume. The caller commits.
+        """
+        params = {
+            "resume_id": resume_id,
+            "filename": filename or "",
+            "content": content,
+            "keywords": " ".join(keywords),
+        }
+        match self._dialect(db.bind):
+            case "sqlite":
+                await db.execute(text(f"DELETE FROM resume_fts WHERE {_ROWID}"), params)
+                await db.execute(
+                    text(
+                        "INSERT INTO resume_fts (rowid, resume_id, filename, content, keywords)"
+                        " SELECT id, resume_id, :filename, :content, :keywords"
+                        " FROM resumes WHERE resume_id = :resume_id"
+                    ),
+                    params,
+                )
+            case "postgresql":
+                await db.execute(
+                    text(
+                        "INSERT INTO resume_search (resume_id, document) VALUES ("
+                        " :resume_id,"
+                        " setweight(to_tsvector('simple', :filename), 'A')"
+                        " || setweight(to_tsvector('simple', :keywords), 'A')"
+                        " || setweight(to_tsvector('simple', :content), 'B'))"
+                        " ON CONFLICT (resume_id) DO UPDATE SET document = EXCLUDED.document"
+                    ),
+                    params,
+                )
+
+    async def remove(self, db: AsyncSession, resume_id: str) -> None:
+        """
+        Drops the entry of one resume. Call it before deleting the resume row,
+        which the SQLite entry is keyed by. The caller commits.
+        """
+        if self._dialect(db.bind) == "sqlite":
+            await db.execute(
+                text(f"DELETE FROM resume_fts WHERE {_ROWID}"),
+                {"resume_id": resume_id},
+            )
+        # Postgres rows go with the resume through ON DELETE CASCADE
+
+    def _match_sql(self, dialect: str) -> Tuple[str, str]:
+        """
+        (ranked subquery, count query) for the dialect; both take :query.
+        """
+        if dialect == "sqlite":
+            return (
+                "SELECT resume_id, bm25(resume_fts, 0.0, 4.0, 1.0, 4.0) AS rank"
+                " FROM resume_fts WHERE resume_fts MATCH :query",
+                "SELECT COUNT(*) FROM resume_fts WHERE resume_fts MATCH :query",
+            )
+        return (
+            "SELECT resume_id, -ts_rank_cd(document, to_tsquery('simple', :query)) AS rank"
+            " FROM resume_search WHERE document @@ to_tsquery('simple', :query)",
+            "SELECT COUNT(*) FROM resume_search"
+            " WHERE document @@ to_tsquery('simple', :query)",
+        )
+
+    def _compile_query(self, dialect: str, terms: List[str]) -> str:
+        if dialect == "sqlite":
+            return " AND ".join(f'"{term}"*' for term in terms)
+        return " & ".join(f"{term}:*" for term in terms)
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        limit: int = 10,
+        after: Optional[Tuple[float, str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns up to `limit` (resume_id, rank) pairs, best match first,
+        starting after the (rank, resume_id) of the previous page's last row.
+        """
+        dialect = self._dialect(db.bind)
+        terms = self._terms(query)
+        if not terms or dialect not in ("sqlite", "postgresql"):
+            return []
+
+        ranked, _ = self._match_sql(dialect)
+        params = {"query": self._compile_query(dialect, terms), "limit": limit}
+        keyset = ""
+        if after is not None:
+            keyset = (
+                " WHERE m.rank > :after_rank"
+                " OR (m.rank = :after_rank AND m.resume_id > :after_id)"
+            )
+            params["after_rank"], params["after_id"] = after
+
+        result = await db.execute(
+            text(
+                f"SELECT m.resume_id, m.rank FROM ({ranked}) AS m{keyset}"
+                " ORDER BY m.rank, m.resume_id LIMIT :limit"
+            ),
+            params,
+        )
+        return [(resume_id, float(rank)) for resume_id, rank in result.all()]
+
+    async def count(self, db: AsyncSession, query: str) -> int:
+        """
+        Number of resumes matching `query`, answered from the index.
+        """
+        dialect = self._dialect(db.bind)
+        terms = self._terms(query)
+        if not terms or dialect not in ("sqlite", "postgresql"):
+            return 0
+
+        _, count_sql = self._match_sql(dialect)
+        return await db.scalar(
+            text(count_sql), {"query": self._compile_query(dialect, terms)}
+        )
+
+
+resume_search = ResumeSearchIndex()
@@ -1,22 +1,29 @@
-import os
 import uuid
 import json
-import tempfile
+import hashlib
 import logging
 
-from markitdown import MarkItDown
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import or_, func
+from sqlalchemy import String, and_, or_, func, delete, update, type_coerce
 from pydantic import ValidationError
-from typing import Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from app.models import Resume, ProcessedResume
-from app.agent import AgentManager
+from app.repositories import ResumeRepository
+from app.agent import AgentManager, EmbeddingManager
 from app.prompt import prompt_factory
 from app.schemas.json import json_schema_factory
 from app.schemas.pydantic import StructuredResumeModel
 from .exceptions import ResumeNotFoundError
+from .resume_index import resume_index
+from .document_converter import document_converter
+from .resume_search import resume_search
+from .pagination import encode_cursor, decode_cursor
+from .json_fields import load_json_field
+from .embedding_store import pack_vector
+from .task_queue import task_queue
 
 logger = logging.getLogger(__name__)
 
@@ -24,62 +31,145 @@ logger = logging.getLogger(__name__)
 class ResumeService:
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.md = MarkItDown(enable_plugins=False)
         self.json_agent_manager = AgentManager(model="gemma3:4b")
+        self.embedding_manager = EmbeddingManager()
 
     async def convert_and_store_resume(
-        self, file_bytes: bytes, file_type: str, filename: str, content_type: str = "md"
-    ):
+        self,
+        file_bytes: bytes,
+        file_type: str,
+        filename: str,
+        content_type: str = "md",
+        resume_id: Optional[str] = None,
+        on_progress: Optional[Callable[[str], Awaitable[None]]] = None,
+        dedupe: bool = True,
+        wait_for_converter: bool = False,
+    ) -> Tuple[str, bool]:
         """
         Converts resume file (PDF/DOCX) to text using MarkItDown and stores it in the database.
 
+        With `dedupe`, an upload whose bytes or normalized text match an already
+        processed resume is not stored again; the existing resume id is returned.
+
         Args:
             file_bytes: Raw bytes of the uploaded file
             file_type: MIME type of the file ("application/pdf" or "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
             filename: Original filename
             content_type: Output format ("md" for markdown or "html")
+            resume_id: Pre-allocated resume id, generated when omitted
+            on_progress: Awaited with the name of each stage as it starts
+            dedupe: Reuse an existing resume with the same file or text content
+            wait_for_converter: Queue for the document converter instead of
+                failing with `ConverterBusyError` when it is saturated
 
         Returns:
-            None
+            The resume id and whether it refers to an existing duplicate
         """
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=self._get_file_extension(file_type)
-        ) as temp_file:
-            temp_file.write(file_bytes)
-            temp_path = temp_file.name
+        async def report(stage: str) -> None:
+            if on_progress is not None:
+                await on_progress(stage)
 
-        try:
-            result = self.md.convert(temp_path)
-            text_content = result.text_content
-            resume_id = await self._store_resume_in_db(text_content, content_type)
+        file_hash = self.hash_file(file_bytes)
+        if dedupe:
+            existing_id = await self.find_duplicate(file_hash=file_hash)
+            if existing_id:
+                logger.info(f"Upload matches existing resume {existing_id} by file hash")
+                return existing_id, True
+            # end the read transaction so the connection is free during conversion
+            await self.db.commit()
 
-            await self._extract_and_store_structured_resume(
-                resume_id=resume_id, resume_text=text_content
-            )
+        await report("converting")
+        text_content = await document_converter.convert(
+            file_bytes, file_type, filename, wait=wait_for_converter
+        )
+        content_hash = self.hash_text(text_content)
+        if dedupe:
+            existing_id = await self.find_duplicate(content_hash=content_hash)
+            if existing_id:
+                logger.info(f"Upload matches existing resume {existing_id} by content hash")
+                return existing_id, True
+
+        resume_id = await self._store_resume_in_db(
+            text_content,
+            content_type,
+            resume_id=resume_id,
+            filename=filename,
+            file_hash=file_hash,
+            content_hash=content_hash,
+        )
+
+        await report("extracting")
+        structured_resume = await self._extract_and_store_structured_resume(
+            resume_id=resume_id, resume_text=text_content
+        )
+        await report("indexing")
+        await self._index_resume_text(
+            resume_id=resume_id,
+            resume_text=text_content,
+            filename=filename,
+            keywords=(structured_resume or {}).get("extracted_keywords") or [],
+        )
+        await self._index_resume(resume_id=resume_id, resume_text=text_content)
+
+        return resume_id, False
+
+    @staticmethod
+    def hash_file(file_bytes: bytes) -> str:
+        return hashlib.sha256(file_bytes).hexdigest()
+
+    @staticmethod
+    def hash_text(text_content: str) -> str:
+        """
+        SHA-256 of the text with whitespace collapsed, so re-exports of the same
+        document that only differ in layout hash the same.
+        """
+        return hashlib.sha256(" ".join(text_content.split()).encode("utf-8")).hexdigest()
+
+    async def find_duplicate(
+        self, file_hash: Optional[str] = None, content_hash: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Returns the id of a fully processed resume with the given file or content
+        hash. Resumes whose extraction failed are not considered duplicates so
+        that uploading them again retries the extraction.
+        """
+        conditions = []
+        if file_hash:
+            conditions.append(Resume.file_hash == file_hash)
+        if content_hash:
+            conditions.append(Resume.content_hash == content_hash)
+        if not conditions:
+            return None
+
+        query = (
+            select(Resume.resume_id)
+            .join(ProcessedResume, ProcessedResume.resume_id == Resume.resume_id)
+            .where(or_(*conditions))
+            .order_by(Resume.created_at)
+            .limit(1)
+        )
+        return await self.db.scalar(query)
 
-            return resume_id
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-
-    def _get_file_extension(self, file_type: str) -> str:
-        """Returns the appropriate file extension based on MIME type"""
-        if file_type == "application/pdf":
-            return ".pdf"
-        elif (
-            file_type
-            == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        ):
-            return ".docx"
-        return ""
-
-    async def _store_resume_in_db(self, text_content: str, content_type: str):
+    async def _store_resume_in_db(
+        self,
+        text_content: str,
+        content_type: str,
+        resume_id: Optional[str] = None,
+        filename: Optional[str] = None,
+        file_hash: Optional[str] = None,
+        content_hash: Optional[str] = None,
+    ):
         """
         Stores the parsed resume content in the database.
         """
-        resume_id = str(uuid.uuid4())
+        resume_id = resume_id or str(uuid.uuid4())
         resume = Resume(
-            resume_id=resume_id, content=text_content, content_type=content_type
+            resume_id=resume_id,
+            content=text_content,
+            content_type=content_type,
+            filename=filename,
+            file_hash=file_hash,
+            content_hash=content_hash,
         )
 
         self.db.add(resume)
@@ -90,53 +180,76 @@ class ResumeService:
 
     async def _extract_and_store_structured_resume(
         self, resume_id, resume_text: str
-    ) -> None:
+    ) -> Optional[Dict]:
         """
-        extract and store structured resume data in the database
+        extract and store structured resume data in the database, returning it
         """
         structured_resume = await self._extract_structured_json(resume_text)
         if not structured_resume:
             logger.info("Structured resume extraction failed.")
             return None
 
+        # JSON columns take native values; empty sections are stored as NULL
         processed_resume = ProcessedResume(
             resume_id=resume_id,
-            personal_data=json.dumps(structured_resume.get("personal_data", {}))
-            if structured_resume.get("personal_data")
-            else None,
-            experiences=json.dumps(
-                {"experiences": structured_resume.get("experiences", [])}
-            )
-            if structured_resume.get("experiences")
-            else None,
-            projects=json.dumps({"projects": structured_resume.get("projects", [])})
-            if structured_resume.get("projects")
-            else None,
-            skills=json.dumps({"skills": structured_resume.get("skills", [])})
-            if structured_resume.get("skills")
-            else None,
-            research_work=json.dumps(
-                {"research_work": structured_resume.get("research_work", [])}
-            )
-            if structured_resume.get("research_work")
-            else None,
-            achievements=json.dumps(
-                {"achievements": structured_resume.get("achievements", [])}
-            )
-            if structured_resume.get("achievements")
-            else None,
-            education=json.dumps({"education": structured_resume.get("education", [])})
-            if structured_resume.get("education")
-            else None,
-            extracted_keywords=json.dumps(
-                {"extracted_keywords": structured_resume.get("extracted_keywords", [])}
-                if structured_resume.get("extracted_keywords")
-                else None
-            ),
+            personal_data=structured_resume.get("personal_data") or None,
+            experiences=structured_resume.get("experiences") or None,
+            projects=structured_resume.get("projects") or None,
+            skills=structured_resume.get("skills") or None,
+            research_work=structured_resume.get("research_work") or None,
+            achievements=structured_resume.get("achievements") or None,
+            education=structured_resume.get("education") or None,
+            extracted_keywords=structured_resume.get("extracted_keywords") or None,
         )
 
         self.db.add(processed_resume)
         await self.db.commit()
+        return structured_resume
+
+    async def _index_resume_text(
+        self,
+        resume_id: str,
+        resume_text: str,
+        filename: Optional[str],
+        keywords: List[str],
+    ) -> None:
+        """
+        Adds the resume to the full-text search index. Failures are logged and
+        never fail the upload.
+        """
+        try:
+            await resume_search.index(
+                self.db,
+                resume_id=resume_id,
+                content=resume_text,
+                filename=filename,
+                keywords=keywords,
+            )
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Full-text indexing of resume {resume_id} failed: {e}")
+
+    async def _index_resume(self, resume_id: str, resume_text: str) -> None:
+        """
+        Computes the resume embedding once, stores it on the resume row for
+        scoring and adds it to the vector index used for job -> resume
+        matching. Failures are logged and never fail the upload; scoring then
+        computes the embedding on first use.
+        """
+        try:
+            embedding = await self.embedding_manager.embed(resume_text)
+            model = await self.embedding_manager.model_tag()
+            await self.db.execute(
+                update(Resume)
+                .where(Resume.resume_id == resume_id)
+                .values(embedding=pack_vector(embedding), embedding_model=model)
+            )
+            await self.db.commit()
+            await resume_index.add(resume_id, embedding, model=model)
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Indexing resume {resume_id} failed: {e}")
 
     async def _extract_structured_json(
         self, resume_text: str
@@ -151,7 +264,7 @@ class ResumeService:
             resume_text,
         )
         logger.info(f"Structured Resume Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        raw_output = await self.json_agent_manager.run(prompt=prompt, cache=True)
 
         try:
             structured_resume: StructuredResumeModel = (
@@ -175,17 +288,13 @@ class ResumeService:
         Raises:
             ResumeNotFoundError: If the resume is not found
         """
-        resume_query = select(Resume).where(Resume.resume_id == resume_id)
-        resume_result = await self.db.execute(resume_query)
-        resume = resume_result.scalars().first()
+        resume, processed_resume = await ResumeRepository(self.db).get_with_processed(
+            resume_id
+        )
 
         if not resume:
             raise ResumeNotFoundError(resume_id=resume_id)
 
-        processed_query = select(ProcessedResume).where(ProcessedResume.resume_id == resume_id)
-        processed_result = await self.db.execute(processed_query)
-        processed_resume = processed_result.scalars().first()
-
         combined_data = {
             "resume_id": resume.resume_id,
             "raw_resume": {
@@ -199,76 +308,206 @@ class ResumeService:
 
         if processed_resume:
             combined_data["processed_resume"] = {
-                "personal_data": json.loads(processed_resume.personal_data) if processed_resume.personal_data else None,
-                "experiences": json.loads(processed_resume.experiences).get("experiences", []) if processed_resume.experiences else None,
-                "projects": json.loads(processed_resume.projects).get("projects", []) if processed_resume.projects else None,
-                "skills": json.loads(processed_resume.skills).get("skills", []) if processed_resume.skills else None,
-                "research_work": json.loads(processed_resume.research_work).get("research_work", []) if processed_resume.research_work else None,
-                "achievements": json.loads(processed_resume.achievements).get("achievements", []) if processed_resume.achievements else None,
-                "education": json.loads(processed_resume.education).get("education", []) if processed_resume.education else None,
-                "extracted_keywords": json.loads(processed_resume.extracted_keywords).get("extracted_keywords", []) if processed_resume.extracted_keywords else None,
+                "personal_data": load_json_field(processed_resume.personal_data),
+                "experiences": load_json_field(processed_resume.experiences, "experiences"),
+                "projects": load_json_field(processed_resume.projects, "projects"),
+                "skills": load_json_field(processed_resume.skills, "skills"),
+                "research_work": load_json_field(processed_resume.research_work, "research_work"),
+                "achievements": load_json_field(processed_resume.achievements, "achievements"),
+                "education": load_json_field(processed_resume.education, "education"),
+                "extracted_keywords": load_json_field(processed_resume.extracted_keywords, "extracted_keywords"),
                 "processed_at": processed_resume.processed_at.isoformat() if processed_resume.processed_at else None,
             }
 
         return combined_data
 
+    @staticmethod
+    def _summary_columns() -> Tuple:
+        return (
+            Resume.id,
+            Resume.resume_id,
+            Resume.filename,
+            Resume.content_type,
+            Resume.created_at,
+            # the stored value, so a cursor compares exactly equal to it
+            type_coerce(Resume.created_at, String).label("created_at_key"),
+            # one character more than the preview to know whether it was cut
+            func.substr(Resume.content, 1, 101).label("content_head"),
+        )
+
+    @staticmethod
+    def _to_summary(row) -> Dict[str, Any]:
+        head = row.content_head
+        return {
+            "id": str(row.id),
+            "resume_id": row.resume_id,
+            "filename": row.filename,
+            "content_type": row.content_type,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "content_preview": head[:100] + "..." if head and len(head) > 100 else head,
+        }
+
+    def _created_before(self, created_at_key: str, id: int):
+        """
+        Keyset condition for rows after (created_at, id) in descending order.
+
+        SQLite stores timestamps as text whose format depends on how the row
+        was written, so the cursor is compared as the stored text there.
+        """
+        if self.db.bind.dialect.name == "sqlite":
+            created_at, value = type_coerce(Resume.created_at, String), created_at_key
+        else:
+            created_at, value = Resume.created_at, datetime.fromisoformat(created_at_key)
+        return or_(created_at < value, and_(created_at == value, Resume.id < id))
+
     async def get_resume_list(
         self, 
         offset: int = 0, 
         limit: int = 10, 
-        search: str = None
-    ) -> tuple[list[dict], int]:
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[int], Optional[str]]:
         """
-        获取简历列表
-        
+        获取简历列表，按创建时间倒序
+
+        Only the listed columns and the first characters of the content are
+        read. With `cursor` the page is located through the (created_at, id)
+        index instead of `offset`, so deep pages cost the same as the first,
+        and the total count is skipped.
+
         Args:
-            offset: 偏移量
+            offset: 偏移量 (ignored when `cursor` is given)
             limit: 限制数量
-            search: 搜索关键词
-            
+            cursor: `next_cursor` of the previous page
+
         Returns:
-            tuple: (简历列表, 总数量)
+            tuple: (简历列表, 总数量 or None in cursor mode, next_cursor)
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
         try:
-            # 构建基础查询
-            query = select(Resume)
-            
-            # 添加搜索条件
-            if search:
-                search_filter = or_(
-                    Resume.filename.ilike(f"%{search}%"),
-                    Resume.content.ilike(f"%{search}%")
-                )
-                query = query.where(search_filter)
-            
-            # 获取总数
-            count_query = select(func.count(Resume.id)).select_from(query.subquery())
-            total_count_result = await self.db.execute(count_query)
-            total_count = total_count_result.scalar()
-            
+            query = select(*self._summary_columns())
+            total_count = None
+            if cursor:
+                created_at_key, id = decode_cursor(cursor, 2)
+                query = query.where(self._created_before(str(created_at_key), int(id)))
+            else:
+                # 获取总数
+                total_count = await self.db.scalar(select(func.count(Resume.id)))
+                query = query.offset(offset)
+
             # 添加排序、分页
-            query = query.order_by(Resume.created_at.desc()).offset(offset).limit(limit)
+            query = query.order_by(Resume.created_at.desc(), Resume.id.desc()).limit(limit + 1)
             
             result = await self.db.execute(query)
-            resumes = result.scalars().all()
-            
-            # 转换为字典格式
-            resume_list = []
-            for resume in resumes:
-                resume_dict = {
-                    "id": str(resume.id),
-                    "filename": resume.filename,
-                    "content_type": resume.content_type,
-                    "file_size": getattr(resume, 'file_size', None),
-                    "created_at": resume.created_at.isoformat() if resume.created_at else None,
-                    "updated_at": resume.updated_at.isoformat() if resume.updated_at else None,
-                    # 可以添加内容预览（截取前100个字符）
-                    "content_preview": resume.content[:100] + "..." if resume.content and len(resume.content) > 100 else resume.content
-                }
-                resume_list.append(resume_dict)
-            
-            return resume_list, total_count
+            rows = result.all()
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1].created_at_key, rows[-1].id)
+
+            resume_list = [self._to_summary(row) for row in rows]
+            return resume_list, total_count, next_cursor
             
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Error fetching resume list: {str(e)}")
             raise e
+
+    async def search_resumes(
+        self,
+        search: str,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict], int, Optional[str]]:
+        """
+        Full-text search over resume filename, content and extracted keywords,
+        best match first.
+
+        Args:
+            search: Search terms; every term must match, each as a prefix
+            limit: Page size
+            cursor: `next_cursor` of the previous page
+
+        Returns:
+            The page of resumes, the total number of matches, and the cursor of
+            the next page (None on the last page)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = None
+        if cursor:
+            rank, resume_id = decode_cursor(cursor, 2)
+            after = (float(rank), str(resume_id))
+
+        matches = await resume_search.search(self.db, search, limit=limit + 1, after=after)
+        total_count = await resume_search.count(self.db, search)
+
+        next_cursor = None
+        if len(matches) > limit:
+            matches = matches[:limit]
+            next_cursor = encode_cursor(matches[-1][1], matches[-1][0])
+
+        if not matches:
+            return [], total_count, None
+
+        result = await self.db.execute(
+            select(*self._summary_columns()).where(
+                Resume.resume_id.in_([resume_id for resume_id, _ in matches])
+            )
+        )
+        rows = {row.resume_id: row for row in result.all()}
+        resume_list = []
+        for resume_id, rank in matches:
+            if resume_id in rows:
+                resume_list.append({**self._to_summary(rows[resume_id]), "rank": rank})
+
+        return resume_list, total_count, next_cursor
+
+
+@task_queue.handler("resume_upload")
+async def process_resume_upload(
+    db: AsyncSession,
+    payload: Dict[str, Any],
+    file_bytes: Optional[bytes],
+    report: Callable[[str], Awaitable[None]],
+) -> Dict[str, Any]:
+    """
+    Background counterpart of `POST /resumes/upload?background=true`.
+
+    When the upload turns out to duplicate an existing resume, the result
+    carries that resume's id instead of the one allocated at submission, which
+    is reported as `requested_resume_id` so pollers can map one to the other.
+    """
+    if not file_bytes:
+        raise ValueError("Upload task has no file content")
+
+    # a run interrupted by a restart may have stored part of the resume already
+    await resume_search.remove(db, payload["resume_id"])
+    await db.execute(delete(ProcessedResume).where(ProcessedResume.resume_id == payload["resume_id"]))
+    await db.execute(delete(Resume).where(Resume.resume_id == payload["resume_id"]))
+    await db.commit()
+
+    resume_id, duplicate = await ResumeService(db).convert_and_store_resume(
+        file_bytes=file_bytes,
+        file_type=payload["file_type"],
+        filename=payload["filename"],
+        content_type=payload.get("content_type", "md"),
+        resume_id=payload["resume_id"],
+        on_progress=report,
+        dedupe=payload.get("dedupe", True),
+        wait_for_converter=True,
+    )
+    if duplicate:
+        # the duplicate lookup left a read transaction open on the writer
+        # connection, which reporting needs
+        await db.commit()
+        await report("duplicate")
+    return {
+        "resume_id": resume_id,
+        "requested_resume_id": payload["resume_id"],
+        "duplicate": duplicate,
+    }
@@ -1,20 +1,27 @@
 import gc
 import json
 import asyncio
+import hashlib
 import logging
 import markdown
 import numpy as np
 
-from sqlalchemy.future import select
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
 from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Optional, Tuple, AsyncGenerator
+from typing import Dict, List, Optional, Tuple, AsyncGenerator, AsyncIterator
 
+from app.core.config import settings
 from app.prompt import prompt_factory
 from app.schemas.json import json_schema_factory
 from app.schemas.pydantic import ResumePreviewerModel
 from app.agent import EmbeddingManager, AgentManager
-from app.models import Resume, Job, ProcessedResume, ProcessedJob
+from app.models import Resume, Job, ProcessedResume, ProcessedJob, ImprovementResult
+from app.repositories import JobRepository, ResumeRepository
+from .embedding_store import ensure_embeddings, job_keywords, join_keywords
 from .exceptions import (
     ResumeNotFoundError,
     JobNotFoundError,
@@ -25,17 +32,54 @@ from .exceptions import (
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _prompt_version() -> str:
+    """
+    Digest of the prompts and schema that shape an improvement result.
+    """
+    digest = hashlib.sha256()
+    for part in (
+        prompt_factory.get("resume_improvement"),
+        prompt_factory.get("structured_resume"),
+        json.dumps(json_schema_factory.get("resume_preview"), sort_keys=True),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
 class ScoreImprovementService:
     """
     Service to handle scoring of resumes and jobs using embeddings.
     Fetches Resume and Job data from the database, computes embeddings,
     and calculates cosine similarity scores. Uses LLM for iteratively improving
     the scoring process.
+
+    With `candidates` > 1 the improvement step generates that many rewrites
+    concurrently (at most `max_concurrency` at a time) instead of retrying one
+    after another, and keeps the best. If `target_score` is set, generation
+    stops as soon as a candidate reaches it.
+
+    Results are stored per (resume, job, LLM model, embedding model, prompt
+    version) and returned for repeat requests while younger than
+    `result_ttl` seconds (None: never stale, 0: never reused).
     """
 
-    def __init__(self, db: AsyncSession, max_retries: int = 5):
+    def __init__(
+        self,
+        db: AsyncSession,
+        max_retries: int = 5,
+        candidates: int = settings.IMPROVEMENT_CANDIDATES,
+        max_concurrency: int = settings.IMPROVEMENT_CONCURRENCY,
+        target_score: Optional[float] = settings.IMPROVEMENT_TARGET_SCORE,
+        result_ttl: Optional[float] = settings.IMPROVEMENT_RESULT_TTL,
+    ):
         self.db = db
         self.max_retries = max_retries
+        self.candidates = candidates
+        self.max_concurrency = max_concurrency
+        self.target_score = target_score
+        self.result_ttl = result_ttl
         self.md_agent_manager = AgentManager(strategy="md")
         self.json_agent_manager = AgentManager()
         self.embedding_manager = EmbeddingManager()
@@ -46,17 +90,13 @@ class ScoreImprovementService:
         """
         Fetches the resume from the database.
         """
-        query = select(Resume).where(Resume.resume_id == resume_id)
-        result = await self.db.execute(query)
-        resume = result.scalars().first()
+        resume, processed_resume = await ResumeRepository(self.db).get_with_processed(
+            resume_id
+        )
 
         if not resume:
             raise ResumeNotFoundError(resume_id=resume_id)
 
-        query = select(ProcessedResume).where(ProcessedResume.resume_id == resume_id)
-        result = await self.db.execute(query)
-        processed_resume = result.scalars().first()
-
         if not processed_resume:
             ResumeParsingError(resume_id=resume_id)
 
@@ -66,22 +106,126 @@ class ScoreImprovementService:
         """
         Fetches the job from the database.
         """
-        query = select(Job).where(Job.job_id == job_id)
-        result = await self.db.execute(query)
-        job = result.scalars().first()
+        job, processed_job = await JobRepository(self.db).get_with_processed(job_id)
 
         if not job:
             raise JobNotFoundError(job_id=job_id)
 
-        query = select(ProcessedJob).where(ProcessedJob.job_id == job_id)
-        result = await self.db.execute(query)
-        processed_job = result.scalars().first()
-
         if not processed_job:
             JobParsingError(job_id=job_id)
 
         return job, processed_job
 
+    async def _get_jobs(
+        self, resume_id: str, job_ids: Optional[List[str]] = None
+    ) -> List[Tuple[Job, ProcessedJob | None]]:
+        """
+        Fetches the given jobs, or every job linked to the resume, together
+        with their processed rows in a single query.
+        """
+        repository = JobRepository(self.db)
+        if not job_ids:
+            return await repository.list_for_resume(resume_id)
+
+        found = await repository.get_many_with_processed(job_ids)
+        missing = [job_id for job_id in job_ids if job_id not in found]
+        if missing:
+            raise JobNotFoundError(
+                message=f"Jobs with ids {', '.join(missing)} not found."
+            )
+
+        return [found[job_id] for job_id in dict.fromkeys(job_ids)]
+
+    async def _result_key(self, resume_id: str, job_id: str) -> Dict[str, str]:
+        llm_model, embedding_model = await asyncio.gather(
+            self.md_agent_manager.model_tag(), self.embedding_manager.model_tag()
+        )
+        return {
+            "resume_id": resume_id,
+            "job_id": job_id,
+            "llm_model": llm_model,
+            "embedding_model": embedding_model,
+            "prompt_version": _prompt_version(),
+        }
+
+    def _select_result(self, key: Dict[str, str]):
+        return select(ImprovementResult).where(
+            *(getattr(ImprovementResult, column) == value for column, value in key.items())
+        )
+
+    async def _stored_result(self, key: Dict[str, str]) -> Optional[Dict]:
+        """
+        The stored result for `key`, None if there is none or it is stale.
+        """
+        if self.result_ttl == 0:
+            return None
+
+        stored = await self.db.scalar(self._select_result(key))
+        if stored is None:
+            return None
+        if self.result_ttl is not None:
+            computed_at = stored.computed_at
+            if computed_at.tzinfo is None:
+                # SQLite hands back CURRENT_TIMESTAMP (UTC) without a zone
+                computed_at = computed_at.replace(tzinfo=timezone.utc)
+            if datetime.now(timezone.utc) - computed_at > timedelta(seconds=self.result_ttl):
+                return None
+        return stored.result
+
+    async def _store_result(self, key: Dict[str, str], result: Dict) -> None:
+        """
+        Inserts or refreshes the stored result for `key`. Failures are logged
+        and never fail the request.
+        """
+        if self.result_ttl == 0:
+            return
+
+        try:
+            stored = await self.db.scalar(self._select_result(key))
+            if stored is None:
+                self.db.add(ImprovementResult(**key, result=result))
+            else:
+                stored.result = result
+                stored.computed_at = func.now()
+            await self.db.commit()
+        except IntegrityError:
+            # a concurrent run for the same key stored its result first
+            await self.db.rollback()
+        except Exception as e:
+            await self.db.rollback()
+            logger.warning(f"Storing improvement result for {key} failed: {e}")
+
+    async def _stored_embeddings(self, rows) -> List[np.ndarray]:
+        """
+        Looks up the embeddings stored at ingest time, computing and saving
+        any that are missing or were made by another embedding model.
+
+        Commits first, ending the read transaction, so neither the embedding
+        request nor the LLM generation that follows holds the connection;
+        computed vectors are then written in a short transaction of their own.
+        """
+        await self.db.commit()
+        vectors = await ensure_embeddings(self.embedding_manager, rows)
+        await self.db.commit()
+        return vectors
+
+    @staticmethod
+    def calculate_cosine_similarities(
+        job_embeddings: np.ndarray, resume_embedding: np.ndarray
+    ) -> np.ndarray:
+        """
+        Cosine similarity of one resume embedding against many job embeddings,
+        computed as a single normalized matrix-vector product.
+        """
+        matrix = np.asarray(job_embeddings, dtype=np.float32)
+        vector = np.asarray(resume_embedding, dtype=np.float32).reshape(-1)
+
+        row_norms = np.linalg.norm(matrix, axis=1)
+        row_norms[row_norms == 0] = 1.0
+        vector_norm = np.linalg.norm(vector) or 1.0
+
+        return (matrix / row_norms[:, None]) @ (vector / vector_norm)
+
     def calculate_cosine_similarity(
         self,
         extracted_job_keywords_embedding: np.ndarray,
@@ -98,7 +242,30 @@ class ScoreImprovementService:
 
         return float(np.dot(ejk, re) / (np.linalg.norm(ejk) * np.linalg.norm(re)))
 
-    async def improve_score_with_llm(
+    async def _generate(
+        self, prompt: str, stream: bool, label: Dict[str, int], **generation_args
+    ) -> AsyncIterator[Dict]:
+        """
+        Generates one rewrite. When streaming, yields a `suggestion` event per
+        token (tagged with `label`) as the model produces it; always ends with
+        a `generated` event carrying the parsed text.
+        """
+        if not stream:
+            improved = await self.md_agent_manager.run(prompt, **generation_args)
+            yield {"status": "generated", **label, "text": improved}
+            return
+
+        tokens: List[str] = []
+        async for token in self.md_agent_manager.stream(prompt, **generation_args):
+            tokens.append(token)
+            yield {"status": "suggestion", "index": len(tokens) - 1, "text": token, **label}
+        yield {
+            "status": "generated",
+            **label,
+            "text": self.md_agent_manager.strategy.parse("".join(tokens)),
+        }
+
+    async def _improve(
         self,
         resume: str,
         extracted_resume_keywords: str,
@@ -106,10 +273,38 @@ class ScoreImprovementService:
         extracted_job_keywords: str,
         previous_cosine_similarity_score: float,
         extracted_job_keywords_embedding: np.ndarray,
-    ) -> Tuple[str, float]:
+        stream: bool = False,
+    ) -> AsyncIterator[Dict]:
+        """
+        The improvement loop shared by `improve_score_with_llm` and
+        `run_and_stream`: sequential retries, or concurrent candidates when
+        `self.candidates` > 1.
+
+        Yields `suggestion` events (only when `stream` is set) and `retrying`
+        events while it works, and finally an `improved` event with the best
+        `resume` and its `score`.
+        """
         prompt_template = prompt_factory.get("resume_improvement")
         best_resume, best_score = resume, previous_cosine_similarity_score
 
+        if self.candidates > 1:
+            prompt = prompt_template.format(
+                raw_job_description=job,
+                extracted_job_keywords=extracted_job_keywords,
+                raw_resume=resume,
+                extracted_resume_keywords=extracted_resume_keywords,
+                current_cosine_similarity=previous_cosine_similarity_score,
+            )
+            async for event in self._improve_with_candidates(
+                prompt=prompt,
+                resume=resume,
+                previous_cosine_similarity_score=previous_cosine_similarity_score,
+                extracted_job_keywords_embedding=extracted_job_keywords_embedding,
+                stream=stream,
+            ):
+                yield event
+            return
+
         for attempt in range(1, self.max_retries + 1):
             logger.info(
                 f"Attempt {attempt}/{self.max_retries} to improve resume score."
@@ -121,20 +316,213 @@ class ScoreImprovementService:
                 extracted_resume_keywords=extracted_resume_keywords,
                 current_cosine_similarity=best_score,
             )
-            improved = await self.md_agent_manager.run(prompt)
+            async for event in self._generate(prompt, stream, {"attempt": attempt}):
+                if event["status"] == "generated":
+                    improved = event["text"]
+                else:
+                    yield event
+
             emb = await self.embedding_manager.embed(text=improved)
             score = self.calculate_cosine_similarity(
                 emb, extracted_job_keywords_embedding
             )
 
             if score > best_score:
-                return improved, score
+                best_resume, best_score = improved, score
+                break
 
             logger.info(
                 f"Attempt {attempt} resulted in score: {score}, best score so far: {best_score}"
             )
+            if attempt < self.max_retries:
+                yield {"status": "retrying", "attempt": attempt, "score": score}
+
+        yield {"status": "improved", "resume": best_resume, "score": best_score}
+
+    async def improve_score_with_llm(
+        self,
+        resume: str,
+        extracted_resume_keywords: str,
+        job: str,
+        extracted_job_keywords: str,
+        previous_cosine_similarity_score: float,
+        extracted_job_keywords_embedding: np.ndarray,
+    ) -> Tuple[str, float]:
+        async for event in self._improve(
+            resume=resume,
+            extracted_resume_keywords=extracted_resume_keywords,
+            job=job,
+            extracted_job_keywords=extracted_job_keywords,
+            previous_cosine_similarity_score=previous_cosine_similarity_score,
+            extracted_job_keywords_embedding=extracted_job_keywords_embedding,
+        ):
+            if event["status"] == "improved":
+                result = event["resume"], event["score"]
+        return result
+
+    async def score_jobs(
+        self, resume_id: str, job_ids: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Scores a resume against many jobs without any LLM rewrite.
+
+        When `job_ids` is empty, every job linked to the resume via
+        `Job.resume_id` is scored. Returns the jobs ranked by score; jobs without
+        extracted keywords cannot be scored and are listed last with a None score.
+        """
+        resume, _ = await self._get_resume(resume_id)
+        jobs = await self._get_jobs(resume_id, job_ids)
+
+        scorable = []
+        unscorable = []
+        for job, processed_job in jobs:
+            keywords = job_keywords(processed_job)
+            if keywords:
+                scorable.append((job, processed_job, keywords))
+            else:
+                unscorable.append((job, processed_job))
+
+        ranked = []
+        if scorable:
+            embeddings = await self._stored_embeddings(
+                [(resume, "embedding", resume.content)]
+                + [
+                    (processed_job, "keywords_embedding", keywords)
+                    for _, processed_job, keywords in scorable
+                ]
+            )
+            scores = self.calculate_cosine_similarities(embeddings[1:], embeddings[0])
+            ranked = sorted(
+                (
+                    {
+                        "job_id": job.job_id,
+                        "job_title": processed_job.job_title,
+                        "score": float(score),
+                    }
+                    for (job, processed_job, _), score in zip(scorable, scores)
+                ),
+                key=lambda item: item["score"],
+                reverse=True,
+            )
+
+        ranked.extend(
+            {
+                "job_id": job.job_id,
+                "job_title": processed_job.job_title if processed_job else None,
+                "score": None,
+            }
+            for job, processed_job in unscorable
+        )
+        for rank, item in enumerate(ranked, start=1):
+            item["rank"] = rank
+
+        return ranked
+
+    async def _improve_with_candidates(
+        self,
+        prompt: str,
+        resume: str,
+        previous_cosine_similarity_score: float,
+        extracted_job_keywords_embedding: np.ndarray,
+        stream: bool = False,
+    ) -> AsyncIterator[Dict]:
+        """
+        Generates `self.candidates` rewrites concurrently and keeps the best one.
+
+        Without a target score all candidates are embedded in one batch once
+        generated. With a target score candidates are scored as they finish,
+        those finishing together in one batch, and the remaining generations
+        are cancelled once the target is reached.
+        When streaming, the candidates' tokens are yielded as they arrive,
+        tagged with the candidate's index.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        events: asyncio.Queue[Dict] = asyncio.Queue()
+
+        async def generate(candidate: int) -> None:
+            try:
+                async with semaphore:
+                    async for event in self._generate(
+                        prompt,
+                        stream,
+                        {"candidate": candidate},
+                        temperature=settings.IMPROVEMENT_CANDIDATE_TEMPERATURE,
+                    ):
+                        await events.put(event)
+            except Exception as e:
+                await events.put({"status": "failed", "candidate": candidate, "error": e})
+
+        tasks = [asyncio.create_task(generate(candidate)) for candidate in range(self.candidates)]
+        best_resume, best_score = resume, previous_cosine_similarity_score
+        improved: List[str] = []
+        errors = []
+        loop = asyncio.get_running_loop()
+        window = settings.EMBEDDING_BATCH_WINDOW_MS / 1000
+
+        try:
+            unfinished = len(tasks)
+            while unfinished:
+                event = await events.get()
+                if event["status"] == "suggestion":
+                    yield event
+                    continue
+                unfinished -= 1
+                if event["status"] == "failed":
+                    errors.append(event["error"])
+                    continue
+                if self.target_score is None:
+                    improved.append(event["text"])
+                    continue
+
+                # candidates finishing within the batch window of this one,
+                # or while the previous batch was embedded, share one request
+                generated = [event["text"]]
+                deadline = loop.time() + window
+                while unfinished:
+                    try:
+                        async with asyncio.timeout_at(deadline):
+                            event = await events.get()
+                    except TimeoutError:
+                        break
+                    if event["status"] == "suggestion":
+                        yield event
+                        continue
+                    unfinished -= 1
+                    if event["status"] == "failed":
+                        errors.append(event["error"])
+                    else:
+                        generated.append(event["text"])
+
+                embeddings = await self.embedding_manager.embed_many(generated)
+                scores = self.calculate_cosine_similarities(
+                    embeddings, extracted_job_keywords_embedding
+                )
+                best = int(np.argmax(scores))
+                logger.info(f"Candidate scores: {scores.tolist()}, best score so far: {best_score}")
+                if scores[best] > best_score:
+                    best_resume, best_score = generated[best], float(scores[best])
+                if best_score >= self.target_score:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if improved:
+            embeddings = await self.embedding_manager.embed_many(improved)
+            scores = self.calculate_cosine_similarities(
+                embeddings, extracted_job_keywords_embedding
+            )
+            best = int(np.argmax(scores))
+            logger.info(f"Candidate scores: {scores.tolist()}")
+            if scores[best] > best_score:
+                best_resume, best_score = improved[best], float(scores[best])
 
-        return best_resume, best_score
+        if errors and len(errors) == len(tasks):
+            raise errors[0]
+        for error in errors:
+            logger.warning(f"Candidate generation failed: {error}")
+
+        yield {"status": "improved", "resume": best_resume, "score": best_score}
 
     async def get_resume_for_previewer(self, updated_resume: str) -> Dict:
         """
@@ -146,7 +534,7 @@ class ScoreImprovementService:
             updated_resume,
         )
         logger.info(f"Structured Resume Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        raw_output = await self.json_agent_manager.run(prompt=prompt, cache=True)
 
         try:
             resume_preview: ResumePreviewerModel = ResumePreviewerModel.model_validate(
@@ -157,35 +545,76 @@ class ScoreImprovementService:
             return None
         return resume_preview.model_dump()
 
-    async def run(self, resume_id: str, job_id: str) -> Dict:
+    async def _finish(
+        self,
+        result_key: Dict[str, str],
+        original_score: float,
+        updated_resume: str,
+        updated_score: float,
+    ) -> Dict:
+        """
+        Builds the final result shared by `run` and `run_and_stream` and
+        stores it if it improved the score and has a valid preview.
+        """
+        resume_preview = await self.get_resume_for_previewer(
+            updated_resume=updated_resume
+        )
+
+        logger.info(f"Resume Preview: {resume_preview}")
+
+        execution = {
+            "resume_id": result_key["resume_id"],
+            "job_id": result_key["job_id"],
+            "original_score": original_score,
+            "new_score": updated_score,
+            "updated_resume": markdown.markdown(text=updated_resume),
+            "resume_preview": resume_preview,
+        }
+
+        if resume_preview is not None and updated_score > original_score:
+            await self._store_result(result_key, execution)
+
+        gc.collect()
+
+        return execution
+
+    async def run(self, resume_id: str, job_id: str, force: bool = False) -> Dict:
         """
         Main method to run the scoring and improving process and return dict.
+
+        A fresh stored result for the same inputs is returned without any LLM
+        call unless `force` is set. A new result replaces the stored one only
+        if it improved the score and has a valid preview, so a failed run is
+        retried on the next request instead of being served until it expires.
         """
 
+        # resolving the model tags may call the provider, so it happens before
+        # the first read opens a transaction on the (single) writer connection
+        result_key = await self._result_key(resume_id, job_id)
+
         resume, processed_resume = await self._get_resume(resume_id)
         job, processed_job = await self._get_job(job_id)
 
-        extracted_job_keywords = ", ".join(
-            json.loads(processed_job.extracted_keywords).get("extracted_keywords", [])
-        )
+        if not force:
+            stored = await self._stored_result(result_key)
+            if stored is not None:
+                logger.info(f"Serving stored improvement of resume {resume_id} for job {job_id}")
+                return stored
+
+        extracted_job_keywords = job_keywords(processed_job)
 
-        if processed_resume is None or processed_resume.extracted_keywords is None:
+        if processed_resume is None:
             extracted_resume_keywords = ""
         else:
-            extracted_resume_keywords = ", ".join(
-                json.loads(processed_resume.extracted_keywords).get(
-                    "extracted_keywords", []
-                )
+            extracted_resume_keywords = join_keywords(
+                processed_resume.extracted_keywords
             )
 
-        resume_embedding_task = asyncio.create_task(
-            self.embedding_manager.embed(resume.content)
-        )
-        job_kw_embedding_task = asyncio.create_task(
-            self.embedding_manager.embed(extracted_job_keywords)
-        )
-        resume_embedding, extracted_job_keywords_embedding = await asyncio.gather(
-            resume_embedding_task, job_kw_embedding_task
+        resume_embedding, extracted_job_keywords_embedding = await self._stored_embeddings(
+            [
+                (resume, "embedding", resume.content),
+                (processed_job, "keywords_embedding", extracted_job_keywords),
+            ]
         )
 
         cosine_similarity_score = self.calculate_cosine_similarity(
@@ -200,56 +629,60 @@ class ScoreImprovementService:
             extracted_job_keywords_embedding=extracted_job_keywords_embedding,
         )
 
-        resume_preview = await self.get_resume_for_previewer(
-            updated_resume=updated_resume
+        return await self._finish(
+            result_key,
+            original_score=cosine_similarity_score,
+            updated_resume=updated_resume,
+            updated_score=updated_score,
         )
 
-        logger.info(f"Resume Preview: {resume_preview}")
-
-        execution = {
-            "resume_id": resume_id,
-            "job_id": job_id,
-            "original_score": cosine_similarity_score,
-            "new_score": updated_score,
-            "updated_resume": markdown.markdown(text=updated_resume),
-            "resume_preview": resume_preview,
-        }
-
-        gc.collect()
-
-        return execution
-
-    async def run_and_stream(self, resume_id: str, job_id: str) -> AsyncGenerator:
+    async def run_and_stream(
+        self, resume_id: str, job_id: str, force: bool = False
+    ) -> AsyncGenerator:
         """
-        Main method to run the scoring and improving process and return dict.
+        Runs the scoring and improving process as a stream of server-sent events.
+
+        Improvement tokens are forwarded as `suggestion` events the moment the
+        model produces them, so the time to first byte is the model's. The
+        improvement loop is the one `run` uses; with several candidates each
+        token carries its `candidate` index instead of an `attempt`. The
+        `completed` result is the one `run` returns and is stored the same
+        way; a fresh stored result is sent as the `completed` event right away
+        unless `force` is set.
         """
 
         yield f"data: {json.dumps({'status': 'starting', 'message': 'Analyzing resume and job description...'})}\n\n"
-        await asyncio.sleep(2)
+
+        result_key = await self._result_key(resume_id, job_id)
 
         resume, processed_resume = await self._get_resume(resume_id)
         job, processed_job = await self._get_job(job_id)
 
+        if not force:
+            stored = await self._stored_result(result_key)
+            if stored is not None:
+                yield f"data: {json.dumps({'status': 'completed', 'result': stored})}\n\n"
+                return
+
         yield f"data: {json.dumps({'status': 'parsing', 'message': 'Parsing resume content...'})}\n\n"
-        await asyncio.sleep(2)
 
-        extracted_job_keywords = ", ".join(
-            json.loads(processed_job.extracted_keywords).get("extracted_keywords", [])
-        )
+        extracted_job_keywords = job_keywords(processed_job)
 
-        extracted_resume_keywords = ", ".join(
-            json.loads(processed_resume.extracted_keywords).get(
-                "extracted_keywords", []
+        if processed_resume is None:
+            extracted_resume_keywords = ""
+        else:
+            extracted_resume_keywords = join_keywords(
+                processed_resume.extracted_keywords
             )
-        )
-
-        resume_embedding = await self.embedding_manager.embed(text=resume.content)
-        extracted_job_keywords_embedding = await self.embedding_manager.embed(
-            text=extracted_job_keywords
-        )
 
         yield f"data: {json.dumps({'status': 'scoring', 'message': 'Calculating compatibility score...'})}\n\n"
-        await asyncio.sleep(3)
+
+        resume_embedding, extracted_job_keywords_embedding = await self._stored_embeddings(
+            [
+                (resume, "embedding", resume.content),
+                (processed_job, "keywords_embedding", extracted_job_keywords),
+            ]
+        )
 
         cosine_similarity_score = self.calculate_cosine_similarity(
             extracted_job_keywords_embedding, resume_embedding
@@ -258,27 +691,28 @@ class ScoreImprovementService:
         yield f"data: {json.dumps({'status': 'scored', 'score': cosine_similarity_score})}\n\n"
 
         yield f"data: {json.dumps({'status': 'improving', 'message': 'Generating improvement suggestions...'})}\n\n"
-        await asyncio.sleep(3)
 
-        updated_resume, updated_score = await self.improve_score_with_llm(
+        async for event in self._improve(
             resume=resume.content,
             extracted_resume_keywords=extracted_resume_keywords,
             job=job.content,
             extracted_job_keywords=extracted_job_keywords,
             previous_cosine_similarity_score=cosine_similarity_score,
             extracted_job_keywords_embedding=extracted_job_keywords_embedding,
+            stream=True,
+        ):
+            if event["status"] == "improved":
+                updated_resume, updated_score = event["resume"], event["score"]
+            else:
+                yield f"data: {json.dumps(event)}\n\n"
+
+        yield f"data: {json.dumps({'status': 'previewing', 'message': 'Preparing resume preview...'})}\n\n"
+
+        final_result = await self._finish(
+            result_key,
+            original_score=cosine_similarity_score,
+            updated_resume=updated_resume,
+            updated_score=updated_score,
         )
 
-        for i, suggestion in enumerate(updated_resume):
-            yield f"data: {json.dumps({'status': 'suggestion', 'index': i, 'text': suggestion})}\n\n"
-            await asyncio.sleep(0.2)
-
-        final_result = {
-            "resume_id": resume_id,
-            "job_id": job_id,
-            "original_score": cosine_similarity_score,
-            "new_score": updated_score,
-            "updated_resume": markdown.markdown(text=updated_resume),
-        }
-
         yield f"data: {json.dumps({'status': 'completed', 'result': final_result})}\n\n"
@@ -0,0 +1,283 @@
+import os
+import uuid
+import socket
+import asyncio
+import logging
+import traceback
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import Task
+from .exceptions import TaskNotFoundError
+
+logger = logging.getLogger(__name__)
+
+ProgressReporter = Callable[[str], Awaitable[None]]
+TaskHandler = Callable[
+    [AsyncSession, Dict[str, Any], Optional[bytes], ProgressReporter],
+    Awaitable[Dict[str, Any]],
+]
+
+PENDING, RUNNING, SUCCEEDED, FAILED = "pending", "running", "succeeded", "failed"
+TERMINAL_STATUSES = (SUCCEEDED, FAILED)
+
+
+def task_to_dict(task: Task) -> Dict[str, Any]:
+    return {
+        "task_id": task.task_id,
+        "kind": task.kind,
+        "status": task.status,
+        "stage": task.stage,
+        "result": task.result,
+        "error": task.error,
+        "created_at": task.created_at.isoformat() if task.created_at else None,
+        "updated_at": task.updated_at.isoformat() if task.updated_at else None,
+    }
+
+
+class TaskQueue:
+    """
+    Database-backed background task queue with an in-process worker pool.
+
+    Tasks are persisted in the `tasks` table before they are queued, together
+    with their raw input, so work that was pending when the process stopped is
+    picked up again on the next start.
+
+    A worker claims a task by recording this queue's id in `claimed_by` and a
+    lease in `lease_expires_at`, which it keeps extending while the task runs.
+    Running tasks are only taken over once their lease has expired, so several
+    app processes can share the table without stealing each other's work.
+
+    Progress reports and lease renewals are written by a background loop in
+    a session of their own, so a handler's `report()` never waits for a
+    database connection, not even for the one the handler itself holds.
+    """
+
+    def __init__(self, workers: int = 2, lease_seconds: float = 60.0) -> None:
+        self._workers = workers
+        self._lease = timedelta(seconds=lease_seconds)
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, TaskHandler] = {}
+        self._queue: Optional[asyncio.Queue[str]] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    def handler(self, kind: str) -> Callable[[TaskHandler], TaskHandler]:
+        """
+        Decorator registering the coroutine that executes tasks of `kind`.
+        """
+
+        def register(func: TaskHandler) -> TaskHandler:
+            self._handlers[kind] = func
+            return func
+
+        return register
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def _claimable(self):
+        """
+        Pending tasks and running tasks whose worker stopped renewing the lease.
+        Tasks this queue is running itself are never taken over by it, even if
+        a renewal was late.
+        """
+        return or_(
+            Task.status == PENDING,
+            and_(
+                Task.status == RUNNING,
+                or_(Task.lease_expires_at.is_(None), Task.lease_expires_at < self._now()),
+                or_(Task.claimed_by.is_(None), Task.claimed_by != self._owner),
+            ),
+        )
+
+    async def _requeue_claimable(self) -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Task.task_id).where(self._claimable()).order_by(Task.created_at)
+            )
+            claimable = list(result.scalars().all())
+        for task_id in claimable:
+            self._queue.put_nowait(task_id)
+        return len(claimable)
+
+    async def start(self) -> None:
+        """
+        Start the workers and queue every pending or orphaned task.
+        """
+        self._queue = asyncio.Queue()
+        requeued = await self._requeue_claimable()
+        if requeued:
+            logger.info(f"Re-queued {requeued} unfinished task(s)")
+
+        self._worker_tasks = [
+            asyncio.create_task(self._work()) for _ in range(self._workers)
+        ]
+        self._worker_tasks.append(asyncio.create_task(self._reap()))
+
+    async def _reap(self) -> None:
+        """
+        Periodically queues running tasks orphaned by a worker that died after
+        this process started.
+        """
+        while True:
+            await asyncio.sleep(self._lease.total_seconds())
+            try:
+                expired = await self._requeue_claimable()
+                if expired:
+                    logger.info(f"Re-queued {expired} task(s) with an expired lease")
+            except Exception as e:
+                logger.warning(f"Looking for orphaned tasks failed: {e}")
+
+    async def stop(self) -> None:
+        for worker in self._worker_tasks:
+            worker.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def submit(
+        self,
+        db: AsyncSession,
+        kind: str,
+        payload: Dict[str, Any],
+        input_data: Optional[bytes] = None,
+    ) -> str:
+        """
+        Persist a new task and queue it for execution. Returns the task id.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for task kind '{kind}'")
+
+        task_id = str(uuid.uuid4())
+        db.add(
+            Task(
+                task_id=task_id,
+                kind=kind,
+                status=PENDING,
+                payload=payload,
+                input_data=input_data,
+            )
+        )
+        await db.commit()
+
+        if self._queue is not None:
+            self._queue.put_nowait(task_id)
+        return task_id
+
+    async def get(self, db: AsyncSession, task_id: str) -> Dict[str, Any]:
+        """
+        Current state of a task.
+
+        Raises:
+            TaskNotFoundError: If the task does not exist
+        """
+        task = await db.scalar(select(Task).where(Task.task_id == task_id))
+        if task is None:
+            raise TaskNotFoundError(task_id=task_id)
+        return task_to_dict(task)
+
+    async def _set(self, task_id: str, **values: Any) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Task)
+                .where(Task.task_id == task_id, Task.claimed_by == self._owner)
+                .values(**values)
+            )
+            await db.commit()
+
+    async def _heartbeat(
+        self,
+        task_id: str,
+        progress: Dict[str, Any],
+        changed: asyncio.Event,
+        finished: asyncio.Event,
+    ) -> None:
+        """
+        Renews the lease every third of its duration and writes the latest
+        reported `progress` as soon as it changes, until `finished` is set.
+
+        It is stopped through `finished` rather than cancelled, since
+        cancelling a session mid-commit can leave its connection unusable.
+        """
+        while True:
+            try:
+                async with asyncio.timeout(self._lease.total_seconds() / 3):
+                    await changed.wait()
+            except TimeoutError:
+                pass
+            if finished.is_set():
+                return
+            changed.clear()
+            try:
+                await self._set(
+                    task_id, **progress, lease_expires_at=self._now() + self._lease
+                )
+            except Exception as e:
+                logger.warning(f"Renewing the lease of task {task_id} failed: {e}")
+
+    async def _work(self) -> None:
+        while True:
+            task_id = await self._queue.get()
+            try:
+                await self._run(task_id)
+            except Exception as e:
+                logger.error(f"Task {task_id} crashed the worker loop: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, task_id: str) -> None:
+        async with AsyncSessionLocal() as db:
+            # claim atomically so a task is never executed twice
+            claimed = await db.execute(
+                update(Task)
+                .where(Task.task_id == task_id, self._claimable())
+                .values(
+                    status=RUNNING,
+                    claimed_by=self._owner,
+                    lease_expires_at=self._now() + self._lease,
+                )
+            )
+            await db.commit()
+            if claimed.rowcount != 1:
+                return
+            task = await db.scalar(select(Task).where(Task.task_id == task_id))
+            kind, payload, input_data = task.kind, task.payload or {}, task.input_data
+
+        progress: Dict[str, Any] = {}
+        changed, finished = asyncio.Event(), asyncio.Event()
+
+        async def report(stage: str) -> None:
+            progress["stage"] = stage
+            changed.set()
+
+        heartbeat = asyncio.create_task(
+            self._heartbeat(task_id, progress, changed, finished)
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await self._handlers[kind](db, payload, input_data, report)
+            outcome = {"status": SUCCEEDED, "result": result}
+        except Exception as e:
+            logger.error(
+                f"Task {task_id} ({kind}) failed: {e} - traceback: {traceback.format_exc()}"
+            )
+            outcome = {"status": FAILED, "error": str(e)}
+        finally:
+            # stop renewing before the final write so it cannot land after it
+            finished.set()
+            changed.set()
+            await heartbeat
+
+        await self._set(
+            task_id, **progress, **outcome, input_data=None, lease_expires_at=None
+        )
+
+
+task_queue = TaskQueue(
+    workers=settings.TASK_WORKERS, lease_seconds=settings.TASK_LEASE_SECONDS
+)
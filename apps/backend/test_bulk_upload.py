@@ -0,0 +1,171 @@
+"""
+Tests for the streaming bulk resume upload: a multipart body carrying a ZIP
+archive is answered with NDJSON, identical files in one request are
+processed once, and a client disconnecting mid-upload ends the response
+without an error escaping the app.
+
+Conversion and storage are replaced by a fake, so no converter, LLM or
+database is needed.
+
+    python -m pytest test_bulk_upload.py
+"""
+import io
+import os
+import sys
+import json
+import uuid
+import asyncio
+import zipfile
+import tempfile
+
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+# setdefault, and app is imported inside the tests, so that when collected
+# together with test_query_plans.py that module's database wins
+_TMP_DIR = tempfile.mkdtemp(prefix="bulk_upload_")
+_DB_PATH = os.path.join(_TMP_DIR, "app.db")
+for _name, _value in dict(
+    SYNC_DATABASE_URL=f"sqlite:///{_DB_PATH}",
+    ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{_DB_PATH}",
+    RESUME_INDEX_PATH=os.path.join(_TMP_DIR, "resume_index"),
+    LLM_CACHE_PATH=os.path.join(_TMP_DIR, "llm_cache.db"),
+    EMBEDDING_CACHE_PATH=os.path.join(_TMP_DIR, "embedding_cache.db"),
+    SESSION_SECRET_KEY="bulk-upload-test",
+).items():
+    os.environ.setdefault(_name, _value)
+
+URL = "/api/v1/resumes/upload/bulk"
+
+
+class FakeStore:
+    """
+    Stands in for ResumeService.convert_and_store_resume.
+    """
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, file_bytes, file_type, filename, **kwargs):
+        self.calls.append(filename)
+        await asyncio.sleep(self.delay)
+        return str(uuid.uuid4()), False
+
+
+def _app(store: FakeStore, monkeypatch):
+    from fastapi import FastAPI
+
+    from app.api.router.v1 import v1_router
+    from app.services import ResumeService
+
+    async def convert_and_store_resume(service, **kwargs):
+        return await store(**kwargs)
+
+    monkeypatch.setattr(ResumeService, "convert_and_store_resume", convert_and_store_resume)
+    app = FastAPI()
+    app.include_router(v1_router)
+    return app
+
+
+def _zip(files: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _multipart(files: list) -> tuple[bytes, str]:
+    import httpx
+
+    request = httpx.Request("POST", "http://test" + URL, files=files)
+    return request.read(), request.headers["content-type"]
+
+
+def test_zip_with_a_duplicate_pair_is_processed_once(monkeypatch):
+    import httpx
+
+    store = FakeStore()
+    app = _app(store, monkeypatch)
+    archive = _zip(
+        {
+            "cv/alice.pdf": b"%PDF alice",
+            "cv/alice-copy.pdf": b"%PDF alice",
+            "cv/bob.docx": b"PK bob",
+            "notes.txt": b"not a resume",
+        }
+    )
+    body, content_type = _multipart([("files", ("batch.zip", archive, "application/zip"))])
+
+    async def post() -> list:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(URL, content=body, headers={"content-type": content_type})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        return [json.loads(line) for line in response.text.splitlines()]
+
+    lines = asyncio.run(post())
+    *results, summary = lines
+    by_name = {result["filename"]: result for result in results}
+
+    assert sorted(store.calls) == ["batch.zip/cv/alice.pdf", "batch.zip/cv/bob.docx"]
+    assert by_name["batch.zip/cv/alice.pdf"]["status"] == "success"
+    assert by_name["batch.zip/cv/alice-copy.pdf"] == {
+        "index": by_name["batch.zip/cv/alice-copy.pdf"]["index"],
+        "filename": "batch.zip/cv/alice-copy.pdf",
+        "status": "duplicate",
+        "resume_id": by_name["batch.zip/cv/alice.pdf"]["resume_id"],
+    }
+    assert by_name["batch.zip/notes.txt"]["status"] == "failed"
+    assert summary == {"status": "completed", "total": 4, "success": 2, "duplicate": 1, "failed": 1}
+
+
+def test_client_disconnect_ends_the_response_quietly(monkeypatch):
+    store = FakeStore(delay=0.1)
+    app = _app(store, monkeypatch)
+    body, content_type = _multipart(
+        [
+            ("files", ("first.pdf", b"%PDF first", "application/pdf")),
+            ("files", ("second.pdf", b"%PDF second", "application/pdf")),
+        ]
+    )
+    # the client goes away after sending the first part
+    cut = body.index(b"second.pdf")
+    incoming = [
+        {"type": "http.request", "body": body[:cut], "more_body": True},
+        {"type": "http.disconnect"},
+    ]
+    sent = []
+
+    async def receive() -> dict:
+        if incoming:
+            return incoming.pop(0)
+        await asyncio.Event().wait()
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body" and not incoming:
+            raise OSError("connection reset by peer")
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": URL,
+        "raw_path": URL.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", content_type.encode()), (b"host", b"test")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+
+    asyncio.run(asyncio.wait_for(app(scope, receive, send), timeout=10))
+
+    assert store.calls == ["first.pdf"]
+    assert [message["type"] for message in sent] == ["http.response.start"]
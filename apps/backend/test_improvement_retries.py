@@ -0,0 +1,133 @@
+"""
+Tests for the improvement loop's provider traffic.
+
+Retries re-send an unchanged prompt when a rewrite does not beat the current
+score, so they must reach the provider every time instead of replaying the
+cached response; structured extraction opts in to the cache. Candidates that
+finish together are embedded in one request even with a target score.
+
+    python -m pytest test_improvement_retries.py
+"""
+import os
+import sys
+import asyncio
+import tempfile
+
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+
+# setdefault, and app is imported inside the tests, so that when collected
+# together with test_query_plans.py that module's database wins
+_TMP_DIR = tempfile.mkdtemp(prefix="improvement_retries_")
+_DB_PATH = os.path.join(_TMP_DIR, "app.db")
+for _name, _value in dict(
+    SYNC_DATABASE_URL=f"sqlite:///{_DB_PATH}",
+    ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{_DB_PATH}",
+    RESUME_INDEX_PATH=os.path.join(_TMP_DIR, "resume_index"),
+    LLM_CACHE_PATH=os.path.join(_TMP_DIR, "llm_cache.db"),
+    EMBEDDING_CACHE_PATH=os.path.join(_TMP_DIR, "embedding_cache.db"),
+    SESSION_SECRET_KEY="improvement-retries-test",
+).items():
+    os.environ.setdefault(_name, _value)
+
+
+class CountingProvider:
+    model = "counting"
+
+    def __init__(self, response: str) -> None:
+        self.response = response
+        self.calls = 0
+
+    @staticmethod
+    def _options(generation_args):
+        return {"temperature": generation_args.get("temperature", 0)}
+
+    async def __call__(self, prompt: str, **generation_args) -> str:
+        self.calls += 1
+        return self.response
+
+
+def _patch_provider(manager, provider: CountingProvider) -> None:
+    async def get_provider(**kwargs):
+        return provider
+
+    manager._get_provider = get_provider
+
+
+async def _improve(max_retries: int) -> int:
+    from app.services import ScoreImprovementService
+
+    provider = CountingProvider("rewritten resume")
+    service = ScoreImprovementService(
+        db=None, max_retries=max_retries, candidates=1, target_score=None
+    )
+    _patch_provider(service.md_agent_manager, provider)
+
+    async def embed(text: str):
+        # orthogonal to the job, so no rewrite ever improves the score
+        return np.array([0.0, 1.0], dtype=np.float32)
+
+    service.embedding_manager.embed = embed
+
+    await service.improve_score_with_llm(
+        resume="resume",
+        extracted_resume_keywords="python",
+        job="job",
+        extracted_job_keywords="python",
+        previous_cosine_similarity_score=0.5,
+        extracted_job_keywords_embedding=np.array([1.0, 0.0], dtype=np.float32),
+    )
+    return provider.calls
+
+
+async def _extract_twice() -> int:
+    from app.agent import AgentManager
+
+    provider = CountingProvider('{"name": "cached"}')
+    manager = AgentManager()
+    _patch_provider(manager, provider)
+
+    for _ in range(2):
+        assert await manager.run(prompt="extract cached", cache=True) == {"name": "cached"}
+    return provider.calls
+
+
+async def _embedding_batches(candidates: int) -> list[int]:
+    from app.services import ScoreImprovementService
+
+    service = ScoreImprovementService(
+        db=None, candidates=candidates, max_concurrency=candidates, target_score=1.5
+    )
+    _patch_provider(service.md_agent_manager, CountingProvider("rewritten resume"))
+    batches = []
+
+    async def embed_many(texts: list[str]):
+        batches.append(len(texts))
+        return [[0.0, 1.0] for _ in texts]
+
+    service.embedding_manager.embed_many = embed_many
+
+    await service.improve_score_with_llm(
+        resume="resume",
+        extracted_resume_keywords="python",
+        job="job",
+        extracted_job_keywords="python",
+        previous_cosine_similarity_score=0.5,
+        extracted_job_keywords_embedding=np.array([1.0, 0.0], dtype=np.float32),
+    )
+    return batches
+
+
+def test_retries_reach_the_provider_every_time():
+    assert asyncio.run(_improve(max_retries=2)) == 2
+
+
+def test_structured_extraction_is_cached():
+    assert asyncio.run(_extract_twice()) == 1
+
+
+def test_candidates_finishing_together_share_one_embedding_request():
+    assert asyncio.run(_embedding_batches(candidates=3)) == [3]
@@ -0,0 +1,188 @@
+"""
+Query-plan regression test for the service read paths.
+
+Runs the lookups of ResumeService, JobService, ScoreImprovementService and the
+task queue against a migrated SQLite database, records every SELECT they issue
+and fails if EXPLAIN QUERY PLAN shows a full table scan or a sort of all
+matching rows.
+
+    python -m pytest test_query_plans.py
+    python test_query_plans.py
+"""
+import os
+import sys
+import uuid
+import asyncio
+import sqlite3
+import tempfile
+
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="query_plans_"), "app.db")
+os.environ.update(
+    SYNC_DATABASE_URL=f"sqlite:///{_DB_PATH}",
+    ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{_DB_PATH}",
+    RESUME_INDEX_PATH=os.path.join(os.path.dirname(_DB_PATH), "resume_index"),
+    LLM_CACHE_PATH=os.path.join(os.path.dirname(_DB_PATH), "llm_cache.db"),
+    EMBEDDING_CACHE_PATH=os.path.join(os.path.dirname(_DB_PATH), "embedding_cache.db"),
+)
+os.environ.setdefault("SESSION_SECRET_KEY", "query-plan-test")
+
+from sqlalchemy import event  # noqa: E402
+
+from app.core.database import (  # noqa: E402
+    AsyncSessionLocal,
+    async_engine,
+    async_read_engine,
+)
+from app.migrations import migrate  # noqa: E402
+from app.models import Job, ProcessedJob, ProcessedResume, Resume, Task  # noqa: E402
+from app.services import JobService, ResumeService, ScoreImprovementService, task_queue  # noqa: E402
+
+RESUMES = 50
+JOBS_PER_RESUME = 20
+
+
+async def _seed() -> tuple[list[str], list[str], str]:
+    async with async_engine.begin() as conn:
+        await migrate(conn)
+
+    resume_ids, job_ids = [], []
+    async with AsyncSessionLocal() as db:
+        for r in range(RESUMES):
+            resume_id = str(uuid.uuid4())
+            resume_ids.append(resume_id)
+            db.add(
+                Resume(
+                    resume_id=resume_id,
+                    content=f"resume {r} python sql",
+                    content_type="md",
+                    filename=f"resume-{r}.pdf",
+                    file_hash=f"{r:064x}",
+                    content_hash=f"{r + RESUMES:064x}",
+                )
+            )
+            db.add(ProcessedResume(resume_id=resume_id, personal_data={"name": f"R{r}"}))
+            for j in range(JOBS_PER_RESUME):
+                job_id = str(uuid.uuid4())
+                job_ids.append(job_id)
+                db.add(Job(job_id=job_id, resume_id=resume_id, content=f"job {j}"))
+                db.add(
+                    ProcessedJob(
+                        job_id=job_id,
+                        job_title=f"Job {j}",
+                        employment_type="Full-time",
+                        job_summary=f"Summary {j}",
+                        extracted_keywords=["python"],
+                    )
+                )
+        task_id = str(uuid.uuid4())
+        db.add(Task(task_id=task_id, kind="resume_upload", status="succeeded"))
+        await db.commit()
+
+    return resume_ids, job_ids, task_id
+
+
+async def _exercise(resume_ids: list[str], job_ids: list[str], task_id: str) -> None:
+    resume_id = resume_ids[len(resume_ids) // 2]
+    job_id = job_ids[len(job_ids) // 2]
+
+    async with AsyncSessionLocal() as db:
+        resumes = ResumeService(db)
+        await resumes.get_resume_with_processed_data(resume_id)
+        await resumes.find_duplicate(file_hash=f"{7:064x}", content_hash=f"{8:064x}")
+        _, _, next_cursor = await resumes.get_resume_list(offset=0, limit=10)
+        await resumes.get_resume_list(offset=10, limit=10)
+        await resumes.get_resume_list(offset=0, limit=10, cursor=next_cursor)
+
+        jobs = JobService(db)
+        await jobs.get_job_with_processed_data(job_id)
+        await jobs._is_resume_available(resume_id)
+
+        scoring = ScoreImprovementService(db)
+        await scoring._get_resume(resume_id)
+        await scoring._get_job(job_id)
+        await scoring._get_jobs(resume_id)
+        await scoring._get_jobs(resume_id, job_ids[:5])
+
+        await task_queue.get(db, task_id)
+
+
+# queries whose ORDER BY only sorts the handful of rows an index lookup found
+SMALL_SORTS = (
+    "WHERE resumes.file_hash = ? OR resumes.content_hash = ?",  # find_duplicate
+)
+
+
+def _is_bad_step(statement: str, detail: str) -> bool:
+    if detail.startswith("SCAN ") and "USING" not in detail and "VIRTUAL TABLE" not in detail:
+        return True
+    if detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+        return not any(marker in statement for marker in SMALL_SORTS)
+    return False
+
+
+def collect_plans() -> list[tuple[str, list[str]]]:
+    """
+    Returns (statement, plan steps) for every SELECT the services issued.
+    """
+    statements: list[tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, tuple(parameters or ())))
+
+    engines = {async_engine.sync_engine, async_read_engine.sync_engine}
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+
+    async def run() -> None:
+        try:
+            ids = await _seed()
+            statements.clear()
+            await _exercise(*ids)
+        finally:
+            await async_engine.dispose()
+            await async_read_engine.dispose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", record)
+
+    conn = sqlite3.connect(_DB_PATH)
+    try:
+        return [
+            (
+                statement,
+                [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)],
+            )
+            for statement, parameters in statements
+        ]
+    finally:
+        conn.close()
+
+
+def test_service_queries_use_indexes():
+    plans = collect_plans()
+    assert plans, "no queries were recorded"
+
+    offenders = [
+        (statement, steps)
+        for statement, steps in plans
+        if any(_is_bad_step(statement, step) for step in steps)
+    ]
+    assert not offenders, "\n\n".join(
+        f"{statement}\n  -> " + "\n  -> ".join(steps) for statement, steps in offenders
+    )
+
+
+if __name__ == "__main__":
+    for statement, steps in collect_plans():
+        marker = "❌" if any(_is_bad_step(statement, step) for step in steps) else "✅"
+        print(f"{marker} {' '.join(statement.split())[:120]}")
+        for step in steps:
+            print(f"     {step}")
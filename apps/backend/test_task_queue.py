@@ -0,0 +1,207 @@
+"""
+SQLite tests for the database-backed task queue: claiming, lease renewal,
+taking over tasks whose lease expired, and progress reported while the
+handler holds the single writer connection.
+
+    python -m pytest test_task_queue.py
+"""
+import os
+import sys
+import uuid
+import asyncio
+import tempfile
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+# setdefault, and app is imported inside the tests, so that when collected
+# together with test_query_plans.py that module's database wins
+_TMP_DIR = tempfile.mkdtemp(prefix="task_queue_")
+_DB_PATH = os.path.join(_TMP_DIR, "app.db")
+for _name, _value in dict(
+    SYNC_DATABASE_URL=f"sqlite:///{_DB_PATH}",
+    ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{_DB_PATH}",
+    RESUME_INDEX_PATH=os.path.join(_TMP_DIR, "resume_index"),
+    LLM_CACHE_PATH=os.path.join(_TMP_DIR, "llm_cache.db"),
+    EMBEDDING_CACHE_PATH=os.path.join(_TMP_DIR, "embedding_cache.db"),
+    SESSION_SECRET_KEY="task-queue-test",
+).items():
+    os.environ.setdefault(_name, _value)
+
+KIND = "test_task"
+
+
+def _run(scenario) -> None:
+    """
+    Runs `scenario` on a migrated database and releases the engines after,
+    since every test gets its own event loop.
+    """
+    from app.core.database import async_engine, async_read_engine
+    from app.migrations import migrate
+
+    async def run() -> None:
+        try:
+            async with async_engine.begin() as conn:
+                await migrate(conn)
+            await scenario()
+        finally:
+            await async_engine.dispose()
+            await async_read_engine.dispose()
+
+    asyncio.run(run())
+
+
+def _queue(handler, lease_seconds: float = 60.0):
+    from app.services.task_queue import TaskQueue
+
+    queue = TaskQueue(workers=1, lease_seconds=lease_seconds)
+    queue.handler(KIND)(handler)
+    return queue
+
+
+async def _submit(queue) -> str:
+    from app.core.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        return await queue.submit(db, KIND, {"n": 1})
+
+
+async def _task(task_id: str):
+    from sqlalchemy import select
+
+    from app.core.database import AsyncReadSessionLocal
+    from app.models import Task
+
+    async with AsyncReadSessionLocal() as db:
+        return await db.scalar(select(Task).where(Task.task_id == task_id))
+
+
+def test_task_is_claimed_by_one_queue_only():
+    calls = []
+
+    async def handler(db, payload, input_data, report):
+        calls.append(payload)
+        await asyncio.sleep(0.1)
+        return {"ok": True}
+
+    async def scenario() -> None:
+        first, second = _queue(handler), _queue(handler)
+        task_id = await _submit(first)
+
+        await asyncio.gather(first._run(task_id), second._run(task_id))
+
+        task = await _task(task_id)
+        assert calls == [{"n": 1}]
+        assert task.status == "succeeded"
+        assert task.result == {"ok": True}
+        assert task.claimed_by in (first._owner, second._owner)
+        assert task.lease_expires_at is None
+
+    _run(scenario)
+
+
+def test_heartbeat_renews_the_lease_while_the_handler_runs():
+    leases = []
+    release = asyncio.Event()
+
+    async def handler(db, payload, input_data, report):
+        await release.wait()
+        return {}
+
+    async def scenario() -> None:
+        queue = _queue(handler, lease_seconds=0.6)
+        other = _queue(handler, lease_seconds=0.6)
+        task_id = await _submit(queue)
+        running = asyncio.create_task(queue._run(task_id))
+
+        for _ in range(5):
+            await asyncio.sleep(0.25)
+            leases.append((await _task(task_id)).lease_expires_at)
+
+        # the lease outlived its first 0.6s, so another queue cannot take over
+        await other._run(task_id)
+        assert (await _task(task_id)).claimed_by == queue._owner
+
+        release.set()
+        await running
+
+        assert len(set(leases)) > 1
+        assert leases == sorted(leases)
+        assert (await _task(task_id)).status == "succeeded"
+
+    _run(scenario)
+
+
+def test_task_with_an_expired_lease_is_requeued():
+    from app.core.database import AsyncSessionLocal
+    from app.models import Task
+
+    async def handler(db, payload, input_data, report):
+        return {"resumed": True}
+
+    async def scenario() -> None:
+        queue = _queue(handler)
+        task_id = str(uuid.uuid4())
+        async with AsyncSessionLocal() as db:
+            db.add(
+                Task(
+                    task_id=task_id,
+                    kind=KIND,
+                    status="running",
+                    claimed_by="dead-worker",
+                    lease_expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+                )
+            )
+            await db.commit()
+
+        await queue.start()
+        try:
+            await asyncio.wait_for(queue._queue.join(), timeout=10)
+        finally:
+            await queue.stop()
+
+        task = await _task(task_id)
+        assert task.status == "succeeded"
+        assert task.result == {"resumed": True}
+        assert task.claimed_by == queue._owner
+
+    _run(scenario)
+
+
+def test_progress_is_reported_while_the_handler_holds_the_writer():
+    from sqlalchemy import update
+
+    from app.models import Task
+
+    seen = asyncio.Event()
+
+    async def handler(db, payload, input_data, report):
+        # an open write transaction holds the only SQLite writer connection
+        await db.execute(
+            update(Task).where(Task.kind == "unrelated").values(stage="held")
+        )
+        await asyncio.wait_for(report("converting"), timeout=1)
+        await db.commit()
+
+        # the stage becomes visible while the handler is still running
+        await asyncio.wait_for(seen.wait(), timeout=10)
+        await report("storing")
+        return {}
+
+    async def scenario() -> None:
+        queue = _queue(handler)
+        task_id = await _submit(queue)
+        running = asyncio.create_task(queue._run(task_id))
+
+        while (await _task(task_id)).stage != "converting":
+            await asyncio.sleep(0.05)
+        seen.set()
+        await running
+
+        task = await _task(task_id)
+        assert task.status == "succeeded"
+        assert task.stage == "storing"
+
+    _run(scenario)
@@ -161,6 +161,10 @@ info "Setting up backend (apps/backend)…"
   info "Syncing Python deps via uv…"
   uv sync
   success "Backend dependencies ready."
+
+  info "Applying database migrations…"
+  uv run python -m app.migrate
+  success "Database schema up to date."
 )
 
 #–– 6. Setup frontend ––#